@@ -0,0 +1,30 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Kafka Configuration
+KAFKA_BROKER: str = os.getenv("KAFKA_BROKER")
+KAFKA_AGGREGATES_TOPIC: str = os.getenv("KAFKA_AGGREGATES_TOPIC", "kpi-aggregates")  # Stream processor output
+KAFKA_ALERTS_TOPIC: str = os.getenv("KAFKA_ALERTS_TOPIC", "kpi-alerts")
+KAFKA_GROUP_ID: str = os.getenv("KAFKA_GROUP_ID", "anomaly-detector")
+
+# Window of the aggregates scored, one tick per window
+SCORED_WINDOW: str = os.getenv("SCORED_WINDOW", "5min")
+
+# Incremental statistics
+EWMA_ALPHA: float = float(os.getenv("EWMA_ALPHA", 0.1))
+SEASONAL_ALPHA: float = float(os.getenv("SEASONAL_ALPHA", 0.2))
+SEASON_SLOT_SECONDS: int = int(os.getenv("SEASON_SLOT_SECONDS", 3600))  # 168 hourly slots per week
+Z_THRESHOLD: float = float(os.getenv("Z_THRESHOLD", 4.0))
+MIN_SAMPLES: int = int(os.getenv("MIN_SAMPLES", 12))  # Samples needed before an indicator is scored
+
+# Optional IsolationForest over the statistical features, retrained periodically
+ISOLATION_FOREST: bool = os.getenv("ISOLATION_FOREST", "false").lower() == "true"
+FOREST_RETRAIN_TICKS: int = int(os.getenv("FOREST_RETRAIN_TICKS", 288))  # Once a day of 5-minute ticks
+FOREST_SAMPLES: int = int(os.getenv("FOREST_SAMPLES", 100000))
+FOREST_CONTAMINATION: float = float(os.getenv("FOREST_CONTAMINATION", 0.001))  # Share of samples seen as outliers
+
+# Port of the Prometheus metrics endpoint
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", 8000))
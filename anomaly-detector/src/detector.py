@@ -0,0 +1,135 @@
+import numpy as np
+from itertools import repeat
+from typing import Dict, Hashable, List, Sequence
+
+SECONDS_PER_WEEK = 7 * 24 * 3600
+
+class AnomalyDetector:
+    """Online per-indicator anomaly scoring with NumPy state arrays.
+
+    Each indicator keeps an EWMA mean/variance and a seasonal mean/variance per
+    time-of-week slot. A tick (all indicators of one window) is scored in a single
+    vectorized pass, then folded into the statistics.
+    """
+
+    def __init__(self, ewma_alpha: float, seasonal_alpha: float, slot_seconds: int,
+                 z_threshold: float, min_samples: int, initial_indicators: int = 1024):
+        self.ewma_alpha = ewma_alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.slot_seconds = slot_seconds
+        self.slots_per_week = SECONDS_PER_WEEK // slot_seconds
+        self.z_threshold = z_threshold
+        self.min_samples = min_samples
+        self.index: Dict[Hashable, int] = {}
+        self.keys: List[Hashable] = []
+        self._allocate(initial_indicators)
+        self.forest = None
+
+    def _allocate(self, size: int):
+        """Create or grow the state arrays to hold `size` indicators."""
+        weekly = (size, self.slots_per_week)
+        # Seasonal state is indicators x slots, kept in 32 bits to stay small
+        layout = {
+            "mean": ((size,), np.float64), "var": ((size,), np.float64), "count": ((size,), np.int64),
+            "season_mean": (weekly, np.float32), "season_var": (weekly, np.float32),
+            "season_weeks": (weekly, np.int32), "season_last_week": (weekly, np.int32),
+        }
+        for name, (shape, dtype) in layout.items():
+            array = np.zeros(shape, dtype=dtype)
+            current = getattr(self, name, None)
+            if current is not None:
+                array[:len(current)] = current
+            setattr(self, name, array)
+
+    def indices(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Map indicator keys to their state row, registering new indicators."""
+        rows = np.fromiter(map(self.index.get, keys, repeat(-1)), dtype=np.int64, count=len(keys))
+        for i in np.flatnonzero(rows < 0):
+            key = keys[i]
+            row = self.index.get(key)
+            if row is None:
+                row = self.index[key] = len(self.keys)
+                self.keys.append(key)
+            rows[i] = row
+        if len(self.keys) > len(self.mean):
+            size = len(self.mean)
+            while size < len(self.keys):
+                size *= 2
+            self._allocate(size)
+        return rows
+
+    def features(self, rows: np.ndarray, slots: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Return the (EWMA z-score, seasonal z-score) of each value against the current state."""
+        ewma_std = np.sqrt(self.var[rows]) + 1e-9
+        ewma_z = (values - self.mean[rows]) / ewma_std
+        season_std = np.sqrt(self.season_var[rows, slots]) + 1e-9
+        season_z = (values - self.season_mean[rows, slots]) / season_std
+        # Seasonal baselines only count once the slot has been seen in a few different weeks
+        season_z = np.where(self.season_weeks[rows, slots] >= 3, season_z, 0.0)
+        return np.column_stack([ewma_z, season_z])
+
+    def update(self, rows: np.ndarray, slots: np.ndarray, weeks: np.ndarray, values: np.ndarray):
+        """Fold the tick's values into the EWMA and seasonal statistics."""
+        first = self.count[rows] == 0
+        alpha = self.ewma_alpha
+        delta = values - self.mean[rows]
+        self.mean[rows] = np.where(first, values, self.mean[rows] + alpha * delta)
+        self.var[rows] = np.where(first, 0.0, (1 - alpha) * (self.var[rows] + alpha * delta ** 2))
+        self.count[rows] += 1
+
+        seen = self.season_weeks[rows, slots] > 0
+        alpha = self.seasonal_alpha
+        delta = values - self.season_mean[rows, slots]
+        self.season_mean[rows, slots] = np.where(seen, self.season_mean[rows, slots] + alpha * delta, values)
+        self.season_var[rows, slots] = np.where(
+            seen, (1 - alpha) * (self.season_var[rows, slots] + alpha * delta ** 2), 0.0
+        )
+        new_week = self.season_last_week[rows, slots] != weeks
+        self.season_weeks[rows, slots] += new_week
+        self.season_last_week[rows, slots] = weeks
+
+    def score(self, keys: Sequence[Hashable], times: np.ndarray, values: np.ndarray):
+        """Score one tick and update the state; return (features, anomaly mask, forest scores)."""
+        rows = self.indices(keys)
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        # Epoch 0 was a Thursday, shift so slot 0 starts on Monday 00:00
+        shifted = times + 3 * 24 * 3600
+        slots = (shifted % SECONDS_PER_WEEK) // self.slot_seconds
+        weeks = (shifted // SECONDS_PER_WEEK).astype(np.int32)
+        features = self.features(rows, slots, values)
+        warm = self.count[rows] >= self.min_samples
+        z = np.abs(features).max(axis=1)
+        anomalies = warm & (z > self.z_threshold)
+        forest_scores = None
+        if self.forest is not None:
+            # The forest only looks at values already unusual for one of the baselines,
+            # so a tick of tens of thousands of indicators stays cheap to score
+            forest_scores = np.zeros(len(values))
+            candidates = np.flatnonzero(warm & (z > 0.75 * self.z_threshold))
+            if len(candidates):
+                forest_scores[candidates] = self.forest.decision_function(features[candidates])
+                anomalies[candidates] |= forest_scores[candidates] < 0
+        self.update(rows, slots, weeks, values)
+        return features, anomalies, forest_scores
+
+class ForestTrainer:
+    """Keep a bounded reservoir of feature vectors and retrain an IsolationForest on it."""
+
+    def __init__(self, max_samples: int, retrain_ticks: int, contamination: float = 0.001):
+        self.max_samples = max_samples
+        self.contamination = contamination
+        self.retrain_ticks = retrain_ticks
+        self.samples = np.empty((0, 2))
+        self.ticks = 0
+
+    def observe(self, detector: AnomalyDetector, features: np.ndarray):
+        """Add a tick's features and retrain the detector's forest when it is due."""
+        self.samples = np.vstack([self.samples, features])[-self.max_samples:]
+        self.ticks += 1
+        if self.ticks % self.retrain_ticks == 0 and len(self.samples) >= 1000:
+            from sklearn.ensemble import IsolationForest
+            forest = IsolationForest(n_estimators=100, contamination=self.contamination)
+            forest.fit(self.samples)
+            detector.forest = forest
+            print(f"✅ IsolationForest retrained on {len(self.samples)} samples")
@@ -0,0 +1,146 @@
+import json
+import time
+import numpy as np
+from kafka import KafkaConsumer, KafkaProducer
+from kafka.structs import OffsetAndMetadata
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from detector import AnomalyDetector, ForestTrainer
+from config import (
+    KAFKA_BROKER, KAFKA_AGGREGATES_TOPIC, KAFKA_ALERTS_TOPIC, KAFKA_GROUP_ID, SCORED_WINDOW,
+    EWMA_ALPHA, SEASONAL_ALPHA, SEASON_SLOT_SECONDS, Z_THRESHOLD, MIN_SAMPLES,
+    ISOLATION_FOREST, FOREST_RETRAIN_TICKS, FOREST_SAMPLES, FOREST_CONTAMINATION, METRICS_PORT
+)
+
+# Metrics
+SCORING_SECONDS = Histogram("anomaly_scoring_seconds", "Time to score one tick of every indicator",
+                            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+TICK_INDICATORS = Gauge("anomaly_tick_indicators", "Indicators scored in the last tick")
+INDICATORS = Gauge("anomaly_indicators", "Indicators tracked by the detector")
+ALERTS = Counter("anomaly_alerts_total", "Alerts published")
+LATE_AGGREGATES = Counter("anomaly_late_aggregates_total", "Aggregates dropped because their tick was already scored")
+
+class TickBuffer:
+    """Collect the aggregates of one window end so a whole tick is scored at once.
+
+    An aggregate of an earlier window end arrives after its tick was scored and is dropped;
+    one emitted again for the same window replaces the first. The offset of the first record
+    of each partition in the tick is kept, offsets are committed up to there only.
+    """
+
+    def __init__(self):
+        self.end = None
+        self.keys, self.times, self.values = [], [], []
+        self.positions = {}  # indicator -> index in the tick
+        self.offsets = {}  # partition -> offset of its first record in the tick
+
+    def add(self, aggregate, partition=None, offset=None):
+        """Add an aggregate, returning the previous tick when this one starts a new window."""
+        if self.end is not None and aggregate["end"] < self.end:
+            LATE_AGGREGATES.inc()
+            return None
+        completed = None
+        if self.end is not None and aggregate["end"] > self.end:
+            completed = self.drain()
+        self.end = aggregate["end"]
+        position = self.positions.get(aggregate["indicator"])
+        if position is None:
+            self.positions[aggregate["indicator"]] = len(self.keys)
+            self.keys.append(aggregate["indicator"])
+            self.times.append(aggregate["start"])
+            self.values.append(aggregate["avg"])
+        else:
+            self.times[position] = aggregate["start"]
+            self.values[position] = aggregate["avg"]
+        if partition is not None:
+            self.offsets.setdefault(partition, offset)
+        return completed
+
+    def drain(self):
+        tick = (self.keys, np.array(self.times, dtype=np.int64), np.array(self.values, dtype=np.float64))
+        self.keys, self.times, self.values = [], [], []
+        self.positions, self.offsets = {}, {}
+        return tick
+
+def score_tick(detector, trainer, producer, tick):
+    """Score every indicator of a tick and publish an alert for each anomaly."""
+    keys, times, values = tick
+    if not keys:
+        return 0
+    start = time.perf_counter()
+    features, anomalies, forest_scores = detector.score(keys, times, values)
+    SCORING_SECONDS.observe(time.perf_counter() - start)
+    TICK_INDICATORS.set(len(keys))
+    INDICATORS.set(len(detector.keys))
+    if trainer:
+        trainer.observe(detector, features)
+
+    alerts = np.flatnonzero(anomalies)
+    for i in alerts:
+        alert = {
+            "indicator": keys[i], "time": int(times[i]), "value": float(values[i]),
+            "ewma_z": float(features[i, 0]), "seasonal_z": float(features[i, 1]),
+        }
+        if forest_scores is not None:
+            alert["forest_score"] = float(forest_scores[i])
+        producer.send(KAFKA_ALERTS_TOPIC, value=alert, key=alert["indicator"])
+    producer.flush()
+    ALERTS.inc(len(alerts))
+    return len(alerts)
+
+def commit_scored(consumer, consumed, buffer):
+    """Commit the offsets of the records read, up to the first one of the tick not scored yet."""
+    if consumed:
+        consumer.commit({partition: OffsetAndMetadata(buffer.offsets.get(partition, offset), "", -1)
+                         for partition, offset in consumed.items()})
+
+def run(consumer, detector, trainer, producer, max_polls=None):
+    """Read aggregates, score each completed tick, commit once its alerts are published.
+
+    A crash loses no tick: the records of the one being collected are read again on restart.
+    """
+    buffer = TickBuffer()
+    consumed = {}  # partition -> offset after the last record read
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        batches = consumer.poll(timeout_ms=1000, max_records=5000)
+        polls += 1
+        if not batches:
+            # No new window for a while: score what we have rather than wait for the next one
+            tick = buffer.drain()
+            if tick[0]:
+                score_tick(detector, trainer, producer, tick)
+                commit_scored(consumer, consumed, buffer)
+            continue
+        for partition, records in batches.items():
+            for record in records:
+                consumed[partition] = record.offset + 1
+                aggregate = record.value
+                if aggregate.get("window") != SCORED_WINDOW:
+                    continue
+                completed = buffer.add(aggregate, partition, record.offset)
+                if completed:
+                    score_tick(detector, trainer, producer, completed)
+        commit_scored(consumer, consumed, buffer)
+
+def main():
+    print("🚀 Anomaly detector started...")
+    start_http_server(METRICS_PORT)
+    consumer = KafkaConsumer(
+        KAFKA_AGGREGATES_TOPIC,
+        bootstrap_servers=KAFKA_BROKER,
+        group_id=KAFKA_GROUP_ID,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+        value_deserializer=lambda v: json.loads(v),
+    )
+    producer = KafkaProducer(
+        bootstrap_servers=KAFKA_BROKER,
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        key_serializer=lambda k: k.encode("utf-8"),
+    )
+    detector = AnomalyDetector(EWMA_ALPHA, SEASONAL_ALPHA, SEASON_SLOT_SECONDS, Z_THRESHOLD, MIN_SAMPLES)
+    trainer = ForestTrainer(FOREST_SAMPLES, FOREST_RETRAIN_TICKS, FOREST_CONTAMINATION) if ISOLATION_FOREST else None
+    run(consumer, detector, trainer, producer)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import sqlite3
+import tempfile
+from typing import NamedTuple
+import numpy as np
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from batch_sizing import BatchSizer
+from streaming import ResultStream
+
+FIXED = 5000
+TARGET_SECONDS = 1.0
+MAX_BYTES = 8 * 1024 * 1024
+
+class TableModel(NamedTuple):
+    name: str
+    rows: int
+    row_bytes: int
+    round_trip: float  # Fixed cost of a batch (query, commit), seconds
+    fetch_per_row: float
+    insert_per_row: float
+
+# Narrow MGW rows against the wide 5-minute APG43 rows joined with their indicator names. The per-row
+# costs are the order of magnitude of a streaming read and a LOAD DATA insert on a loaded server
+TABLES = [
+    TableModel("CALIS1MGW_S12_A2024", 2000000, 60, 0.02, 1e-6, 3e-6),
+    TableModel("CALIS_APG43_5_S12_A2024", 300000, 4096, 0.02, 20e-6, 60e-6),
+]
+
+def copy(table, size, observe, rng):
+    """Simulate copying a table batch by batch: (round trips, seconds, slowest batch, largest batch in bytes)."""
+    done = round_trips = 0
+    total = slowest = largest = 0.0
+    while done < table.rows:
+        rows = min(size('fetch'), table.rows - done)
+        fetch = (table.round_trip + rows * table.fetch_per_row) * rng.lognormal(0, 0.1)
+        observe('fetch', rows, fetch, rows * table.row_bytes)
+        insert = 0.0
+        remaining = rows
+        while remaining:
+            chunk = min(size('insert'), remaining)
+            seconds = (table.round_trip + chunk * table.insert_per_row) * rng.lognormal(0, 0.1)
+            observe('insert', chunk, seconds, None)
+            insert += seconds
+            remaining -= chunk
+            round_trips += 1
+        round_trips += 1
+        done += rows
+        total += fetch + insert
+        slowest = max(slowest, fetch, insert)
+        largest = max(largest, rows * table.row_bytes)
+    return round_trips, total, slowest, largest
+
+def check_streaming():
+    """A streaming read asks for the size of every chunk, so sizes change within one query."""
+    with tempfile.TemporaryDirectory() as directory:
+        conn = sqlite3.connect(os.path.join(directory, "source.db"))
+        conn.execute("CREATE TABLE t (id INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", ((i,) for i in range(10000)))
+        sizes = iter([100, 400, 1600])
+        with ResultStream(conn, "SELECT id FROM t ORDER BY id", chunk_size=lambda: next(sizes, 6400)) as stream:
+            chunks = [len(rows) for rows in stream]
+        conn.close()
+    assert chunks == [100, 400, 1600, 6400, 1500], chunks
+    print("✅ Streaming reads follow the size asked for each chunk")
+
+def check_persistence(sizer, tables):
+    with tempfile.TemporaryDirectory() as directory:
+        sizer.path = os.path.join(directory, "batch_sizes.json")
+        sizer.save()
+        restored = BatchSizer(sizer.path)
+    for table in tables:
+        for operation in ('fetch', 'insert'):
+            assert restored.size(table.name, operation) == sizer.size(table.name, operation)
+    print("✅ Sizes restored from the saved file")
+
+def main():
+    check_streaming()
+    sizer = BatchSizer(initial_rows=FIXED, target_seconds=TARGET_SECONDS, max_bytes=MAX_BYTES)
+    print(f"🔄 Fixed batches of {FIXED} rows against adaptive ones "
+          f"(target {TARGET_SECONDS} s, at most {MAX_BYTES // 1024 // 1024} MB)")
+    print(f"  {'table':<26} {'sizing':<10} {'round trips':>11} {'seconds':>9} {'slowest':>9} {'largest':>9}")
+    for table in TABLES:
+        results = {}
+        # The second adaptive copy starts from the sizes the first one saved, as the next run would
+        for sizing in ('fixed', 'adaptive', 'next run'):
+            if sizing == 'fixed':
+                size, observe = (lambda operation: FIXED), (lambda *batch: None)
+            else:
+                size = lambda operation, table=table: sizer.size(table.name, operation)
+                observe = lambda operation, rows, seconds, nbytes, table=table: sizer.observe(
+                    table.name, operation, rows, seconds, nbytes)
+            results[sizing] = round_trips, total, slowest, largest = copy(table, size, observe,
+                                                                          np.random.default_rng(42))
+            print(f"  {table.name:<26} {sizing:<10} {round_trips:>11} {total:>8.1f}s {slowest:>8.2f}s "
+                  f"{largest / 1024 / 1024:>7.1f}MB")
+        print(f"    settled at {sizer.size(table.name, 'fetch')} rows per fetch, "
+              f"{sizer.size(table.name, 'insert')} per insert")
+        fixed, adaptive, rerun = results['fixed'], results['adaptive'], results['next run']
+        assert rerun[3] <= MAX_BYTES * 1.1, "byte budget exceeded"
+        if table.row_bytes * FIXED < MAX_BYTES:
+            assert adaptive[0] < fixed[0] and adaptive[1] < fixed[1], "narrow table not sped up"
+    check_persistence(sizer, TABLES)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+import mysql.connector
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from config import DESTINATION_CONFIG
+from bulk_loader import bulk_load
+
+# Needs a local MySQL reachable with the DEST_MYSQL_* settings and local_infile=ON
+TABLE = "bench_bulk_load"
+ROWS = 200000
+BATCH_SIZE = 5000
+
+def make_rows():
+    """Rows shaped like a 5-minute fact table joined with its indicator."""
+    start = datetime(2024, 3, 18)
+    return [
+        (start + timedelta(minutes=5 * (i // 2000)), i % 2000, random.random() * 100,
+         i % 2000, f"pmRtpReceivedPktsHi.10.160.{i % 256}.0", "O")
+        for i in range(ROWS)
+    ]
+
+def reset_table(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            time DATETIME, id_indicateur INT, value DOUBLE,
+            id INT, nom_indicateur VARCHAR(255), type CHAR(1),
+            KEY idx_time_indicator (time, id_indicateur)
+        ) ENGINE=InnoDB
+    """)
+    cursor.close()
+
+def main():
+    conn = mysql.connector.connect(allow_local_infile=True, **DESTINATION_CONFIG)
+    rows = make_rows()
+    columns = ["time", "id_indicateur", "value", "id", "nom_indicateur", "type"]
+    print(f"🚀 Loading {ROWS} rows in batches of {BATCH_SIZE}...")
+    for mode in ("executemany", "multirow", "infile"):
+        reset_table(conn)
+        start = time.perf_counter()
+        for i in range(0, ROWS, BATCH_SIZE):
+            bulk_load(conn, TABLE, columns, rows[i:i + BATCH_SIZE], mode)
+            conn.commit()
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<12} {ROWS / elapsed:>12.0f} rows/s")
+    reset_table(conn)
+    conn.close()
+    print("✅ Benchmark completed!")
+
+if __name__ == "__main__":
+    main()
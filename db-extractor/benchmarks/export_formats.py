@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime, timedelta
+
+# last.py runs from db-extractor/src/utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils"))
+import last
+from proj.dimensions import DimensionCache, DatabaseDimensions
+
+# SQLite stand-in for a weekly 5-minute table
+TABLE = "RAIND_APG43_5_S12_A2024"
+INDICATORS = 2000
+INTERVALS = 250  # 250 x 5 minutes, 500k rows
+CHUNK_SIZE = 50000
+
+def create_tables(conn):
+    """Create a fact table and its indicator dimension filled with synthetic rows."""
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE TABLE {TABLE} (time TIMESTAMP, indicator_id INTEGER, value REAL)")
+    cursor.execute("CREATE TABLE indicateur_RAIND_APG43_5 (id INTEGER PRIMARY KEY, nom_indicateur TEXT, type TEXT)")
+    cursor.executemany(
+        "INSERT INTO indicateur_RAIND_APG43_5 VALUES (?, ?, ?)",
+        [(i, f"pmRtpReceivedPktsHi.10.160.{i // 256}.{i % 256}", "O") for i in range(INDICATORS)]
+    )
+    start = datetime(2024, 3, 18)
+    for step in range(INTERVALS):
+        ts = start + timedelta(minutes=5 * step)
+        cursor.executemany(
+            f"INSERT INTO {TABLE} VALUES (?, ?, ?)",
+            [(ts, i, random.random() * 100) for i in range(INDICATORS)]
+        )
+    conn.commit()
+
+def measure(func):
+    """Return the duration of func and its peak traced memory in MB, from two runs (tracing slows it down)."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "source.db"), detect_types=sqlite3.PARSE_DECLTYPES)
+        create_tables(conn)
+        dimensions = DimensionCache(DatabaseDimensions(lambda: contextlib.nullcontext(conn)))
+        dimensions.get(TABLE)  # Loaded once, outside the measurements
+
+        tables_file = os.path.join(tmp, "tables.txt")
+        with open(tables_file, "w") as f:
+            f.write(TABLE)
+        csv_file = os.path.join(tmp, "extracted.csv")
+
+        rows = INDICATORS * INTERVALS
+        elapsed, peak = measure(lambda: last.process_table_data(tables_file, csv_file, conn, dimensions))
+        size = os.path.getsize(csv_file) / 1e6
+        print(f"csv      {elapsed:6.2f} s  {rows / elapsed:9.0f} rows/s  peak {peak:7.1f} MB  file {size:6.1f} MB")
+
+        root = os.path.join(tmp, "parquet")
+        elapsed, peak = measure(lambda: last.export_table_parquet(TABLE, "5min", conn, dimensions, root, CHUNK_SIZE))
+        size = os.path.getsize(last.partition_path(root, "5min", TABLE)) / 1e6
+        print(f"parquet  {elapsed:6.2f} s  {rows / elapsed:9.0f} rows/s  peak {peak:7.1f} MB  file {size:6.1f} MB"
+              f"  (chunks of {CHUNK_SIZE})")
+        conn.close()
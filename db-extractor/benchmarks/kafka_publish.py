@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+import random
+import contextlib
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Run with db-extractor/src on the path, like main.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from utils import kafka_utils
+from utils.config import KAFKA_BATCH_SIZE, KAFKA_COMPRESSION, KAFKA_SERIALIZER
+
+BATCHES = 20
+BATCH_SIZE = 5000
+
+class MockFuture:
+    """Future returned by the mock producer, resolved as soon as the message is accepted."""
+
+    def add_callback(self, callback):
+        callback(None)
+        return self
+
+    def add_errback(self, errback):
+        return self
+
+class MockProducer:
+    """Stand-in for KafkaProducer that serializes, batches and compresses like a real producer."""
+
+    def __init__(self, batch_size, compression=None):
+        self.batch_size = batch_size
+        self.compress = self.get_compressor(compression)
+        self.buffer = []
+        self.buffered = 0
+        self.requests = 0
+        self.wire_bytes = 0
+
+    @staticmethod
+    def get_compressor(compression):
+        if compression == "lz4":
+            import lz4.frame
+            return lz4.frame.compress
+        if compression == "zstd":
+            import zstandard
+            return zstandard.ZstdCompressor().compress
+        return None
+
+    def send(self, topic, value, key=None, headers=None):
+        payload = value if isinstance(value, bytes) else json.dumps(value, default=str).encode("utf-8")
+        self.buffer.append(payload)
+        self.buffered += len(payload) + (len(key) if key else 0)
+        if self.buffered >= self.batch_size:
+            self.flush()
+        return MockFuture()
+
+    def flush(self, timeout=None):
+        if not self.buffer:
+            return
+        data = b"".join(self.buffer)
+        self.wire_bytes += len(self.compress(data)) if self.compress else len(data)
+        self.requests += 1
+        self.buffer, self.buffered = [], 0
+
+def make_batch(start):
+    """Build a batch of rows shaped like the dictionaries returned by fetch_new_data."""
+    return [
+        {"date": start + timedelta(minutes=5 * (i // 1000)), "id_indicateur": i % 1000,
+         "value": Decimal(f"{random.random() * 100:.4f}")}
+        for i in range(BATCH_SIZE)
+    ]
+
+def legacy_send(producer, database, table, data):
+    """The previous per-row path: one send and one print of the full message per record."""
+    message = {"database": database, "table": table, "data": data}
+    producer.send("topic", message)
+    print(f"Sent to Kafka: {message}")
+
+def run(name, publish, producer, batches):
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for batch in batches:
+            publish(producer, batch)
+            producer.flush()
+    elapsed = time.perf_counter() - start
+    rows = len(batches) * BATCH_SIZE
+    print(f"{name:<28} {rows / elapsed:>12.0f} rows/s {producer.requests:>8} requests "
+          f"{producer.wire_bytes / 1024 / 1024:>10.2f} MB sent")
+
+def main():
+    print("🚀 Building batches...")
+    batches = [make_batch(datetime(2024, 3, 18) + timedelta(hours=i)) for i in range(BATCHES)]
+
+    run("Per-row send + print", lambda p, batch: [legacy_send(p, "db", "CALIS2MGW_S12_A2024", r) for r in batch],
+        MockProducer(16384), batches)
+    run(f"Batch send ({KAFKA_SERIALIZER}, {KAFKA_COMPRESSION})",
+        lambda p, batch: kafka_utils.send_batch_to_kafka("db", "CALIS2MGW_S12_A2024", batch, kafka_producer=p),
+        MockProducer(KAFKA_BATCH_SIZE, KAFKA_COMPRESSION), batches)
+    print("✅ Benchmark completed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import sqlite3
+import random
+from datetime import datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from tools import build_keyset_query
+
+# Benchmark parameters (SQLite stand-in for a weekly 5-minute table)
+TABLE = "RAIND_APG43_5_S12_A2024"
+INDICATORS = 2000
+INTERVALS = 1000  # 1000 x 5 minutes, 2M rows
+BATCH_SIZE = 5000
+SAMPLE_EVERY = 40  # Time one batch out of every N
+
+def create_tables(conn):
+    """Create a fact table and its indicator dimension filled with synthetic rows."""
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE TABLE {TABLE} (time TEXT, id_indicateur INTEGER, value REAL)")
+    cursor.execute(f"CREATE TABLE indicateur_RAIND_APG43_5 (id INTEGER PRIMARY KEY, nom_indicateur TEXT, type TEXT)")
+    cursor.executemany(
+        "INSERT INTO indicateur_RAIND_APG43_5 VALUES (?, ?, ?)",
+        [(i, f"PktLoss.10.160.{i // 256}.{i % 256}", "O") for i in range(INDICATORS)]
+    )
+    start = datetime(2024, 3, 18)
+    for step in range(INTERVALS):
+        ts = (start + timedelta(minutes=5 * step)).strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany(
+            f"INSERT INTO {TABLE} VALUES (?, ?, ?)",
+            [(ts, i, random.random()) for i in range(INDICATORS)]
+        )
+    cursor.execute(f"CREATE UNIQUE INDEX idx_time_indicator ON {TABLE} (time, id_indicateur)")
+    conn.commit()
+
+def bench_offset(conn):
+    """Page through the table with LIMIT/OFFSET and time sampled batches."""
+    cursor = conn.cursor()
+    samples, offset, batch_no = [], 0, 0
+    while True:
+        start = time.perf_counter()
+        cursor.execute(f"""
+            SELECT * FROM {TABLE} t1 JOIN indicateur_RAIND_APG43_5 t2 ON t1.id_indicateur = t2.id
+            ORDER BY t1.time, t1.id_indicateur LIMIT {BATCH_SIZE} OFFSET {offset}
+        """)
+        batch = cursor.fetchall()
+        elapsed = time.perf_counter() - start
+        if not batch:
+            return samples
+        if batch_no % SAMPLE_EVERY == 0:
+            samples.append((offset, elapsed))
+        offset += len(batch)
+        batch_no += 1
+
+def bench_keyset(conn):
+    """Page through the table with the keyset query used by the extractor."""
+    cursor = conn.cursor()
+    samples, last_key, rows, batch_no = [], None, 0, 0
+    while True:
+        start = time.perf_counter()
+        query, params = build_keyset_query(TABLE, ("time", "id_indicateur"), last_key, BATCH_SIZE)
+        cursor.execute(query.replace("%s", "?"), params)
+        batch = cursor.fetchall()
+        elapsed = time.perf_counter() - start
+        if not batch:
+            return samples
+        if batch_no % SAMPLE_EVERY == 0:
+            samples.append((rows, elapsed))
+        last_key = (batch[-1][0], batch[-1][1])
+        rows += len(batch)
+        batch_no += 1
+
+def main():
+    print("🚀 Building synthetic table...")
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+
+    print("🔄 Running LIMIT/OFFSET pagination...")
+    offset_samples = bench_offset(conn)
+    print("🔄 Running keyset pagination...")
+    keyset_samples = bench_keyset(conn)
+
+    print(f"{'Rows read':>12} {'OFFSET (ms)':>12} {'Keyset (ms)':>12}")
+    for (rows, offset_time), (_, keyset_time) in zip(offset_samples, keyset_samples):
+        print(f"{rows:>12} {offset_time * 1000:>12.2f} {keyset_time * 1000:>12.2f}")
+    conn.close()
+    print("✅ Benchmark completed!")
+
+if __name__ == "__main__":
+    main()
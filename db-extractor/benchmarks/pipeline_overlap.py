@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+
+# Run with db-extractor/src on the path, like main.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from utils.proj.pipeline import Pipeline
+
+BATCHES = 50
+
+# Simulated round trip of each step of a batch, in seconds
+FETCH = 0.020
+PUBLISH = 0.010
+INSERT = 0.015
+
+def batches():
+    for i in range(BATCHES):
+        time.sleep(FETCH)
+        yield i
+
+def publish(batch):
+    time.sleep(PUBLISH)
+    return batch
+
+def insert(batch):
+    time.sleep(INSERT)
+
+def serial():
+    for batch in batches():
+        insert(publish(batch))
+
+def pipelined(queue_size):
+    pipeline = Pipeline(batches(), [("publish", publish), ("insert", insert)], queue_size)
+    return pipeline.run(), pipeline.bottleneck()
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    serial()
+    print(f"serial          {time.perf_counter() - start:6.2f} s")
+
+    for queue_size in (1, 2, 8):
+        start = time.perf_counter()
+        stats, bottleneck = pipelined(queue_size)
+        elapsed = time.perf_counter() - start
+        utilization = ", ".join(f"{stage} {values['utilization']:.0%}" for stage, values in stats.items())
+        print(f"pipelined (q={queue_size}) {elapsed:6.2f} s  bottleneck {bottleneck}: {utilization}")
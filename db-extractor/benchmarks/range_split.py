@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from range_split import RangeReader, split_range
+from pipeline import Pipeline
+
+# SQLite stand-in for a large weekly 5-minute table: INDICATORS series over a week and a half
+TABLE = "CALIS_APG43_5_S23_A2024"
+KEY = ("time", "id_indicateur")
+INDICATORS = 1000
+STEPS = 3000
+START = datetime(2024, 6, 3)
+BATCH = 5000
+# A MySQL connection streams a few hundred thousand rows per second and the destination loads at a
+# similar rate per connection; both are simulated per row, so they do not hold the GIL
+READ_SECONDS_PER_ROW = 2e-6
+LOAD_SECONDS_PER_ROW = 2e-6
+
+class ServerCursor:
+    """sqlite3 cursor with MySQL placeholders and a per-row streaming cost."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, query, params=()):
+        return self.cursor.execute(query.replace("%s", "?"), params)
+
+    def fetchmany(self, size):
+        rows = self.cursor.fetchmany(size)
+        time.sleep(len(rows) * READ_SECONDS_PER_ROW)
+        return rows
+
+    def close(self):
+        self.cursor.close()
+
+class ServerConnection:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+
+    def cursor(self):
+        return ServerCursor(self.conn.cursor())
+
+def create_table(path):
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {TABLE} (time TEXT, id_indicateur INTEGER, value REAL, "
+                 "PRIMARY KEY (time, id_indicateur))")
+    conn.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?)", (
+        ((START + timedelta(minutes=5 * step)).strftime("%Y-%m-%d %H:%M:%S"), i, (step * i) % 97 / 7)
+        for step in range(STEPS) for i in range(INDICATORS)))
+    conn.commit()
+    conn.close()
+
+def load(batch):
+    time.sleep(len(batch) * LOAD_SECONDS_PER_ROW)
+
+def single_stream(reader):
+    """One query stream, loads overlapped with reads by a two-stage pipeline."""
+    rows = 0
+
+    def load_stage(item):
+        nonlocal rows
+        batch, _, _ = item
+        load(batch)
+        rows += len(batch)
+
+    Pipeline(reader.read((None, None), None), [("load", load_stage)], 2).run()
+    return rows
+
+def split_parallel(reader, ranges):
+    """Every range read and loaded by its own worker, as copy_table_split does."""
+    counts = [0] * len(ranges)
+
+    def copy_range(i):
+        for batch, _, _ in reader.read(ranges[i], None):
+            load(batch)
+            counts[i] += len(batch)
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        for future in [executor.submit(copy_range, i) for i in range(len(ranges))]:
+            future.result()
+    return sum(counts)
+
+def split_ordered(reader, ranges):
+    """Ranges read ahead concurrently, rows handed over in key order to a single loader."""
+    rows, last = 0, None
+    for _, batch, _, _ in reader.stream(ranges):
+        assert last is None or batch[0][:2] > last, "key order broken"
+        last = batch[-1][:2]
+        load(batch)
+        rows += len(batch)
+    return rows
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "source.db")
+        start = time.perf_counter()
+        create_table(path)
+        total = INDICATORS * STEPS
+        print(f"🚀 {total} rows generated in {time.perf_counter() - start:.1f} s")
+
+        @contextlib.contextmanager
+        def connection():
+            conn = ServerConnection(path)
+            try:
+                yield conn
+            finally:
+                conn.conn.close()
+
+        reader = RangeReader(connection, TABLE, KEY, BATCH)
+        with connection() as conn:
+            low, high = conn.cursor().execute(f"SELECT MIN(time), MAX(time) FROM {TABLE}").fetchone()
+        low, high = datetime.fromisoformat(low), datetime.fromisoformat(high)
+
+        def timed(label, run):
+            start = time.perf_counter()
+            rows = run()
+            elapsed = time.perf_counter() - start
+            assert rows == total, (label, rows, total)
+            print(f"  {label:<30} {elapsed:6.2f} s  {rows / elapsed / 1000:7.0f}k rows/s")
+            return elapsed
+
+        baseline = timed("single stream, pipelined", lambda: single_stream(reader))
+        for parts in (2, 4, 8):
+            ranges = [tuple(str(bound) if bound else None for bound in r) for r in split_range(low, high, parts)]
+            elapsed = timed(f"{parts} ranges, parallel load", lambda: split_parallel(reader, ranges))
+            print(f"    {baseline / elapsed:.1f}x")
+        ranges = [tuple(str(bound) if bound else None for bound in r) for r in split_range(low, high, 4)]
+        timed("4 ranges, ordered, one loader", lambda: split_ordered(reader, ranges))
+
+        # Every row read exactly once across the ranges
+        seen = set()
+        for r in ranges:
+            for batch, _, _ in reader.read(r, None):
+                keys = {row[:2] for row in batch}
+                assert not keys & seen, "ranges overlap"
+                seen |= keys
+        assert len(seen) == total
+        print("✅ Ranges are disjoint and cover the table")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import math
+import time
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from rollups import GRANULARITIES, create_rollup_tables, update_rollups, read_rollup
+
+# SQLite stand-in for four weeks of a 5-minute table, loaded in time order as the extractor does,
+# then in shuffled batches so that every batch touches many old buckets
+TABLE = "CALIS_APG43_5_S23_A2024"
+BASE = "CALIS_APG43_5"
+START = datetime(2024, 6, 3)
+DAYS = 28
+INDICATORS = 50
+BATCH = 5000
+NULL_RATE = 0.02
+BUCKET_FORMAT = {'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d 00:00:00'}
+
+def generate_rows():
+    return [
+        ((START + timedelta(minutes=5 * step)).strftime("%Y-%m-%d %H:%M:%S"), i,
+         None if random.random() < NULL_RATE else round(random.uniform(-100, 100), 3))
+        for step in range(DAYS * 288) for i in range(INDICATORS)
+    ]
+
+def open_database():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE TABLE {TABLE} (time TEXT, id_indicateur INTEGER, value REAL)")
+    conn.execute(f"CREATE UNIQUE INDEX idx_time ON {TABLE} (time, id_indicateur)")
+    create_rollup_tables(conn)
+    return conn
+
+def load(conn, rows):
+    """Insert the raw rows batch by batch, each batch committed with its rollup update."""
+    columns = ["time", "id_indicateur", "value"]
+    raw_seconds = rollup_seconds = 0.0
+    for i in range(0, len(rows), BATCH):
+        batch = rows[i:i + BATCH]
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        cursor.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?)", batch)
+        middle = time.perf_counter()
+        update_rollups(cursor, TABLE, columns, batch, dialect='sqlite')
+        conn.commit()
+        raw_seconds += middle - start
+        rollup_seconds += time.perf_counter() - middle
+    return raw_seconds, rollup_seconds
+
+def recompute(conn, granularity, start, end):
+    """Aggregates of the raw rows computed from scratch, the reference for the rollups."""
+    return conn.execute(f"""
+        SELECT id_indicateur, strftime('{BUCKET_FORMAT[granularity]}', time) AS bucket,
+               min(value), max(value), sum(value), count(*)
+        FROM {TABLE} WHERE time >= ? AND time < ?
+        GROUP BY bucket, id_indicateur ORDER BY bucket, id_indicateur""", (str(start), str(end))).fetchall()
+
+def close(a, b):
+    return a is None and b is None or a is not None and b is not None and math.isclose(a, b, abs_tol=1e-6)
+
+def check(conn):
+    """Every rollup bucket equals the aggregate recomputed from the raw rows."""
+    end = START + timedelta(days=DAYS)
+    for granularity in GRANULARITIES:
+        expected = recompute(conn, granularity, START, end)
+        actual = read_rollup(conn, BASE, str(START), str(end), granularity, placeholder='?')
+        assert len(actual) == len(expected), (granularity, len(actual), len(expected))
+        for row, (indicator, bucket, low, high, total, count) in zip(actual, expected):
+            assert (row['indicator_id'], str(row['bucket'])) == (indicator, bucket), (row, bucket)
+            assert row['count'] == count and close(row['min'], low) and close(row['max'], high) \
+                and close(row['sum'], total), (row, low, high, total, count)
+        print(f"✅ {granularity}: {len(actual)} buckets match the recomputation")
+
+def latency(conn, label, query, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<32} {best * 1000:8.1f} ms")
+
+def main():
+    random.seed(0)
+    rows = generate_rows()
+    for order in ("time order", "shuffled"):
+        if order == "shuffled":
+            random.shuffle(rows)
+        conn = open_database()
+        raw_seconds, rollup_seconds = load(conn, rows)
+        print(f"🚀 {len(rows)} rows in batches of {BATCH}, {order}: "
+              f"insert {raw_seconds:.2f} s, rollup update {rollup_seconds:.2f} s")
+        check(conn)
+
+    # Update a loaded bucket again, as a late batch would
+    late = [(str(START + timedelta(minutes=1)), 0, 1000.0)]
+    conn.execute(f"INSERT INTO {TABLE} VALUES (?, ?, ?)", late[0])
+    update_rollups(conn.cursor(), TABLE, ["time", "id_indicateur", "value"], late, dialect='sqlite')
+    conn.commit()
+    check(conn)
+
+    # Replay a day of rows, half of them still missing from the table: INSERT OR IGNORE skips the
+    # others, the rollups of that day are recomputed rather than counted twice
+    replayed = sorted(rows)[:288 * INDICATORS]
+    conn.executemany(f"DELETE FROM {TABLE} WHERE time = ? AND id_indicateur = ?", [row[:2] for row in replayed[::2]])
+    cursor = conn.cursor()
+    cursor.executemany(f"INSERT OR IGNORE INTO {TABLE} VALUES (?, ?, ?)", replayed)
+    assert cursor.rowcount == len(replayed[::2]), cursor.rowcount
+    update_rollups(cursor, TABLE, ["time", "id_indicateur", "value"], replayed, dialect='sqlite',
+                   inserted=cursor.rowcount)
+    conn.commit()
+    check(conn)
+
+    # Rows without the rollup columns are loaded without rollups
+    assert update_rollups(conn.cursor(), TABLE, ["date", "id_indicateur", "value"], replayed, dialect='sqlite') == 0
+
+    week = (START, START + timedelta(days=7))
+    month = (START, START + timedelta(days=DAYS))
+    print("🔄 Query latency, all indicators")
+    latency(conn, "hourly, a week, raw", lambda: recompute(conn, 'hour', *week))
+    latency(conn, "hourly, a week, rollup", lambda: read_rollup(conn, BASE, str(week[0]), str(week[1]), 'hour', placeholder='?'))
+    latency(conn, "daily, a month, raw", lambda: recompute(conn, 'day', *month))
+    latency(conn, "daily, a month, rollup", lambda: read_rollup(conn, BASE, str(month[0]), str(month[1]), 'day', placeholder='?'))
+
+if __name__ == "__main__":
+    main()
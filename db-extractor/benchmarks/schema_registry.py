@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from schema_registry import SchemaRegistry, SchemaMismatch, ColumnInfo
+from dimensions import DIMENSION_COLUMNS
+
+# SQLite stand-in for a destination fact table, the source rows carrying the indicator columns
+TABLE = "CALIS_APG43_5_S23_A2024"
+SOURCE_COLUMNS = ["id", "time", "value", "id_indicateur", *DIMENSION_COLUMNS]
+BATCHES = 200
+BATCH = 5000
+LATENCY = 0.001  # Simulated round trip to the MySQL server, per statement
+
+class RemoteCursor:
+    """sqlite3 cursor paying a round trip on every statement, like a server would."""
+
+    def __init__(self, cursor, connection):
+        self.cursor = cursor
+        self.connection = connection
+
+    def execute(self, *args):
+        time.sleep(LATENCY)
+        self.connection.round_trips += 1
+        return self.cursor.execute(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+class RemoteConnection:
+    """Connection paying a round trip per statement; like mysql-connector's, its `database` runs SELECT DATABASE()."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.round_trips = 0
+
+    def cursor(self):
+        return RemoteCursor(self.conn.cursor(), self)
+
+    @property
+    def database(self):
+        cursor = self.cursor()
+        cursor.execute("SELECT 'main'")
+        return cursor.fetchone()[0]
+
+def pragma_columns(conn, table):
+    """ColumnInfo of a SQLite table, in place of information_schema."""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [ColumnInfo(name, kind.lower() or 'text', not notnull, default is not None or not notnull or bool(pk))
+            for _, name, kind, notnull, default, pk in cursor.fetchall()]
+
+def create_destination(conn):
+    conn.execute(f"""CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, time datetime NOT NULL, id_indicateur int NOT NULL,
+                     value double, nom_indicateur varchar, type varchar)""")
+
+def source_batch(start_id):
+    t0 = datetime(2024, 6, 3)
+    return [(start_id + i, t0 + timedelta(minutes=5 * i), random.random(), i % 50, i % 50, f"kpi_{i % 50}", "gauge")
+            for i in range(BATCH)]
+
+def insert(conn, columns, rows):
+    conn.executemany(f"INSERT INTO {TABLE} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                     [tuple(str(v) if isinstance(v, datetime) else v for v in row) for row in rows])
+
+def per_batch_introspection(conn, batches):
+    """The previous path: learn the columns with SELECT * LIMIT 0 before every batch, rows taken as they come."""
+    remote = RemoteConnection(conn)
+    for batch in batches:
+        cursor = remote.cursor()
+        cursor.execute(f"SELECT * FROM {TABLE} LIMIT 0")
+        columns = [col[0] for col in cursor.description]
+        cursor.fetchall()
+    return remote.round_trips
+
+def registry(conn, batches, schemas, columns):
+    """Plan read from the registry and rows aligned with it."""
+    remote = RemoteConnection(conn)
+    for batch in batches:
+        plan = schemas.plan(remote, TABLE, columns)
+        plan.align(batch)
+    return remote.round_trips
+
+def check_alignment():
+    """Rows land in the right columns whatever the source order, mismatches fail before any insert."""
+    conn = sqlite3.connect(":memory:")
+    create_destination(conn)
+    schemas = SchemaRegistry(ttl=3600, reader=pragma_columns)
+    row = source_batch(1)[0]
+    plan = schemas.plan(conn, TABLE, SOURCE_COLUMNS)
+    insert(conn, plan.columns, plan.align([row]))
+    stored = conn.execute(f"SELECT id, time, value, id_indicateur, nom_indicateur, type FROM {TABLE}").fetchone()
+    assert stored == (row[0], str(row[1]), row[2], row[3], row[5], row[6]), stored  # The indicator id is dropped
+    assert plan.columns == ('id', 'time', 'id_indicateur', 'value', 'nom_indicateur', 'type')
+
+    # The previous path inserted by position: value and id_indicateur swap places
+    conn.execute(f"DELETE FROM {TABLE}")
+    insert(conn, [c[1] for c in conn.execute(f"PRAGMA table_info({TABLE})")], [row[:6]])
+    swapped = conn.execute(f"SELECT id_indicateur, value FROM {TABLE}").fetchone()
+    assert swapped == (row[2], row[3]), swapped
+
+    for columns, rows, reason in (
+        (SOURCE_COLUMNS + ["extra"], [row + (1,)], "unknown column"),
+        (["id", "value", "id_indicateur"], [(1, 0.5, 3)], "time has no default"),
+        (SOURCE_COLUMNS, [(1, "not a date", 0.5, 3, 3, "a", "b")], None),
+        (SOURCE_COLUMNS, [(1, datetime.now(), "high", 3, 3, "a", "b")], "value is not a number"),
+        (SOURCE_COLUMNS, [row[:5]], "short row"),
+    ):
+        try:
+            schemas.plan(conn, TABLE, columns).align(rows)
+            assert reason is None, reason
+        except SchemaMismatch as e:
+            assert reason is not None, e
+
+    # A new destination column is picked up once the cached schema expires
+    conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN site varchar NOT NULL DEFAULT 'CALIS'")
+    assert 'site' not in [c.name for c in schemas.columns(conn, TABLE)]
+    schemas.invalidate(conn, TABLE)
+    assert 'site' in [c.name for c in schemas.columns(conn, TABLE)]
+    print("✅ Alignment, mismatch and invalidation checks passed")
+
+def main():
+    random.seed(0)
+    check_alignment()
+    batches = [source_batch(i * BATCH) for i in range(BATCHES)]
+    conn = sqlite3.connect(":memory:")
+    create_destination(conn)
+    print(f"🔄 Work before each insert, {BATCHES} batches of {BATCH} rows, {LATENCY * 1000:.0f} ms round trips")
+
+    start = time.perf_counter()
+    round_trips = per_batch_introspection(conn, batches)
+    print(f"  {'SELECT * LIMIT 0 per batch':<28} {time.perf_counter() - start:6.3f} s, {BATCHES} schema reads, "
+          f"{round_trips} round trips")
+
+    in_order = [tuple(row[i] for i in (0, 1, 3, 2, 5, 6)) for row in batches[0]]
+    for label, columns, rows in (
+        ("registry, same column order", ["id", "time", "id_indicateur", "value", "nom_indicateur", "type"],
+         [in_order] * BATCHES),
+        ("registry, rows reordered", SOURCE_COLUMNS, batches),
+    ):
+        schemas = SchemaRegistry(ttl=3600, reader=pragma_columns)
+        start = time.perf_counter()
+        round_trips = registry(conn, rows, schemas, columns)
+        print(f"  {label:<28} {time.perf_counter() - start:6.3f} s, {schemas.reads} schema reads, "
+              f"{round_trips} round trips")
+        assert round_trips == schemas.reads == 1, "the registry went to the server for a cached plan"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Run with db-extractor/src on the path, like main.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from utils.serializers import get_serializer
+
+# The stream processor decodes with its own module, check it reads what the extractor writes
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "stream-processor", "src"))
+from serializers import decode_message
+
+BATCH_SIZE = 5000
+ROUNDS = 10
+
+def make_batch():
+    """Build a batch of rows shaped like the dictionaries returned by fetch_new_data."""
+    start = datetime(2024, 3, 18)
+    return [
+        {"date": start + timedelta(minutes=5 * (i // 1000)), "id_indicateur": i % 1000,
+         "value": Decimal(f"{random.random() * 100:.4f}")}
+        for i in range(BATCH_SIZE)
+    ]
+
+def check_schema_widening():
+    """NULL-only, int and float columns take the type of the values of later batches."""
+    # Schemas are cached per table family, so each serializer starts from one of its own
+    for name, table in (("msgpack", "RAIND_APG43_5_S12_A2024"), ("arrow", "RAIND_APG43_15_S12_A2024")):
+        serializer = get_serializer(name)
+        headers = [("content-type", serializer.content_type.encode())]
+        serializer.encode("db", table, [{"id_indicateur": 1, "value": 3, "note": None}])
+        payloads = serializer.encode("db", table, [{"id_indicateur": 2, "value": Decimal("2.75"), "note": "x"}])
+        rows = decode_message(payloads[0], headers)[2]
+        assert rows == [{"id_indicateur": 2, "value": 2.75, "note": "x"}], (name, rows)
+        payloads = serializer.encode("db", table, [{"id_indicateur": 3, "value": "n/a", "note": "y"}])
+        rows = decode_message(payloads[0], headers)[2]
+        assert rows == [{"id_indicateur": 3, "value": "n/a", "note": "y"}], (name, rows)
+    print("✅ Cached schemas widened for NULL-only, int and float columns")
+
+def main():
+    check_schema_widening()
+    batch = make_batch()
+    headers_for = lambda s: [("content-type", s.content_type.encode())]
+    print(f"{'Format':<10} {'Bytes/row':>10} {'Encode rows/s':>14} {'Decode rows/s':>14}")
+    for name in ("json", "msgpack", "arrow"):
+        serializer = get_serializer(name)
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            payloads = serializer.encode("db", "CALIS_APG43_5_S12_A2024", batch)
+        encode_time = (time.perf_counter() - start) / ROUNDS
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            rows = [row for p in payloads for row in decode_message(p, headers_for(serializer))[2]]
+        decode_time = (time.perf_counter() - start) / ROUNDS
+
+        assert len(rows) == BATCH_SIZE and rows[-1]["id_indicateur"] == batch[-1]["id_indicateur"]
+        size = sum(len(p) for p in payloads)
+        print(f"{name:<10} {size / BATCH_SIZE:>10.1f} {BATCH_SIZE / encode_time:>14.0f} "
+              f"{BATCH_SIZE / decode_time:>14.0f}")
+    print("✅ Benchmark completed!")
+
+if __name__ == "__main__":
+    main()
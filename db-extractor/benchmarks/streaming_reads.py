@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from streaming import ResultStream
+
+# SQLite stand-in for weekly tables of growing size
+TABLE = "RAIND_APG43_5_S12_A2024"
+INDICATORS = 2000
+SIZES = (100_000, 400_000, 1_600_000)
+CHUNK_SIZE = 5000
+
+def fill_table(conn, rows):
+    """(Re)create the fact table with the given number of synthetic rows."""
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"CREATE TABLE {TABLE} (time TIMESTAMP, id_indicateur INTEGER, value REAL)")
+    start = datetime(2024, 3, 18)
+    for step in range(rows // INDICATORS):
+        ts = (start + timedelta(minutes=5 * step)).strftime("%Y-%m-%d %H:%M:%S")
+        cursor.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?)",
+                           [(ts, i, random.random()) for i in range(INDICATORS)])
+    conn.commit()
+
+def read_fetchall(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT * FROM {TABLE}")
+    rows = cursor.fetchall()
+    cursor.close()
+    return len(rows)
+
+def read_stream(conn):
+    with ResultStream(conn, f"SELECT * FROM {TABLE}", chunk_size=CHUNK_SIZE) as stream:
+        return sum(len(rows) for rows in stream)
+
+def read_numpy(conn):
+    with ResultStream(conn, f"SELECT * FROM {TABLE}", chunk_size=CHUNK_SIZE) as stream:
+        return sum(len(batch["value"]) for batch in stream.numpy_batches())
+
+def read_arrow(conn):
+    with ResultStream(conn, f"SELECT * FROM {TABLE}", chunk_size=CHUNK_SIZE) as stream:
+        return sum(batch.num_rows for batch in stream.arrow_batches())
+
+def measure(func, conn):
+    """Return rows per second (untraced run) and peak traced memory in MB."""
+    start = time.perf_counter()
+    rows = func(conn)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(conn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows / elapsed, peak / 1e6
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "source.db"))
+        for size in SIZES:
+            fill_table(conn, size)
+            for name, func in (("fetchall", read_fetchall), ("stream", read_stream),
+                               ("numpy", read_numpy), ("arrow", read_arrow)):
+                rate, peak = measure(func, conn)
+                print(f"{size:>9} rows  {name:<9} {rate:10.0f} rows/s  peak {peak:7.1f} MB")
+        conn.close()
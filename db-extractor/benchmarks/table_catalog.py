@@ -0,0 +1,63 @@
+import os
+import re
+import sys
+import time
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from table_catalog import TableCatalog, parse_table_name
+
+TABLES_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "data", "our_data", "our_tables.txt")
+START_YEAR = 2024
+LOOKUPS = 100_000
+
+# The per-family patterns and sort key the scripts used before the catalog
+patterns = {
+    '5min': re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]5_S\d+_A\d{4}$'),
+    '15min': re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]15_S\d+_A\d{4}$'),
+    'mgw': re.compile(r'^([A-Za-z0-9]+)MGW_S\d+_A\d{4}$')
+}
+
+def classify_regex_passes(names):
+    result = {}
+    for family, pattern in patterns.items():
+        tables = [table for table in names if re.match(pattern, table)]
+        tables = [table for table in tables if int(re.search(r'_A(\d{4})$', table).group(1)) >= START_YEAR]
+        result[family] = sorted(tables, key=lambda x: (int(re.search(r'_A(\d{4})$', x).group(1)),
+                                                       int(re.search(r'_S(\d+)_', x).group(1))))
+    return result
+
+def classify_catalog(names):
+    parse_table_name.cache_clear()  # Measure the parsing too
+    catalog = TableCatalog(names)
+    return {family: [table.name for table in catalog.family(family, START_YEAR)] for family in patterns}
+
+def timed(func, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+if __name__ == "__main__":
+    with open(TABLES_FILE) as f:
+        names = f.read().split()
+
+    regex_seconds, expected = timed(classify_regex_passes, names)
+    catalog_seconds, result = timed(classify_catalog, names)
+    assert result == expected
+    print(f"{len(names)} tables")
+    print(f"regex passes  {regex_seconds * 1000:8.2f} ms")
+    print(f"catalog       {catalog_seconds * 1000:8.2f} ms")
+
+    catalog = TableCatalog(names)
+    year, week = catalog.weeks()[len(catalog.weeks()) // 2]
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        catalog.week(year, week, '5min')
+    print(f"week lookup   {(time.perf_counter() - start) / LOOKUPS * 1e6:8.2f} us")
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        catalog.base('CALIS2MGW')
+    print(f"base lookup   {(time.perf_counter() - start) / LOOKUPS * 1e6:8.2f} us")
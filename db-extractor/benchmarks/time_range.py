@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import contextlib
+from datetime import date, datetime, timedelta
+
+# The proj modules use flat imports, so put their directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils", "proj"))
+from table_catalog import TableCatalog
+from timerange import RangeQuery, iso_weeks, week_bounds, resolve_tables
+
+# SQLite stand-in for a year of weekly 5-minute tables of three sites
+SITES = ("CALIS", "MEIND", "RAIND")
+YEAR = 2024
+WEEKS = 52
+INDICATORS = 10
+RANGES = (
+    (datetime(2024, 6, 9, 18), datetime(2024, 6, 10, 6)),  # Sunday evening to Monday morning
+    (datetime(2024, 6, 1), datetime(2024, 7, 1)),  # A month
+)
+LATENCY = 0.001  # Simulated round trip to the MySQL server, per query
+
+def check_week_boundaries():
+    """ISO week arithmetic at week and year boundaries."""
+    assert iso_weeks(date(2024, 12, 30), date(2024, 12, 31)) == [(2025, 1)]  # Monday of ISO week 2025-01
+    assert iso_weeks(datetime(2020, 12, 31, 12), datetime(2021, 1, 1)) == [(2020, 53)]  # 53-week year
+    assert iso_weeks(datetime(2024, 12, 29, 23), datetime(2024, 12, 30, 1)) == [(2024, 52), (2025, 1)]
+    assert iso_weeks(datetime(2024, 6, 3), datetime(2024, 6, 10)) == [(2024, 23)]  # End is exclusive
+    assert iso_weeks(datetime(2024, 6, 10), datetime(2024, 6, 10)) == []
+    assert iso_weeks(datetime(2024, 6, 9, 23, 59, 59), datetime(2024, 6, 10, 0, 0, 1)) == [(2024, 23), (2024, 24)]
+    assert week_bounds(2025, 1) == (datetime(2024, 12, 30), datetime(2025, 1, 6))
+    for year, week in iso_weeks(date(2019, 1, 1), date(2027, 1, 1)):
+        monday, next_monday = week_bounds(year, week)
+        assert monday.isocalendar()[:2] == (year, week)
+        assert (next_monday - timedelta(microseconds=1)).isocalendar()[:2] == (year, week)
+    catalog = TableCatalog(["CALIS_APG43_5_S52_A2024", "CALIS_APG43_5_S01_A2025", "CALIS2MGW_S01_A2025"])
+    assert [t.name for t in resolve_tables(catalog, datetime(2024, 12, 29), datetime(2024, 12, 31), "5min")] == \
+        ["CALIS_APG43_5_S52_A2024", "CALIS_APG43_5_S01_A2025"]
+
+def create_tables(path):
+    """One table per site and ISO week, rows every 5 minutes stamped inside their week."""
+    conn = sqlite3.connect(path)
+    names = []
+    for week in range(1, WEEKS + 1):
+        monday, next_monday = week_bounds(YEAR, week)
+        steps = int((next_monday - monday).total_seconds() // 300)
+        for site in SITES:
+            table = f"{site}_APG43_5_S{week:02d}_A{YEAR}"
+            conn.execute(f"CREATE TABLE {table} (time TEXT, id_indicateur INTEGER, value REAL)")
+            conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?)", (
+                ((monday + timedelta(minutes=5 * step)).strftime("%Y-%m-%d %H:%M:%S"), i, random.random())
+                for step in range(steps) for i in range(INDICATORS)))
+            conn.execute(f"CREATE INDEX idx_{table} ON {table} (time)")
+            names.append(table)
+    conn.commit()
+    conn.close()
+    return names
+
+class RemoteConnection:
+    """SQLite connection paying a network round trip on every query."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+
+    def cursor(self):
+        cursor = self.conn.cursor()
+        execute = cursor.execute
+
+        class Cursor:
+            description = property(lambda _: cursor.description)
+            fetchmany = cursor.fetchmany
+            close = cursor.close
+
+            def execute(self, query, params=()):
+                time.sleep(LATENCY)
+                return execute(query, params)
+        return Cursor()
+
+    def close(self):
+        self.conn.close()
+
+def scan_everything(path, names, start, end):
+    """What callers do today: query every table and sort the rows afterwards."""
+    conn = RemoteConnection(path)
+    rows = []
+    for table in names:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {table} WHERE time >= ? AND time < ? ORDER BY time", (start, end))
+        rows += [(table, row) for row in iter(lambda: cursor.fetchmany(1000), []) for row in row]
+    conn.close()
+    return sorted(rows, key=lambda item: item[1][0])
+
+def main():
+    check_week_boundaries()
+    print("✅ Week boundary checks passed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "source.db")
+        names = create_tables(path)
+
+        @contextlib.contextmanager
+        def connection():
+            conn = RemoteConnection(path)
+            try:
+                yield conn
+            finally:
+                conn.close()
+
+        query = RangeQuery(connection, TableCatalog(names), chunk_size=1000, placeholder="?")
+        for start, end in RANGES:
+            began = time.perf_counter()
+            expected = scan_everything(path, names, str(start), str(end))
+            scan_seconds = time.perf_counter() - began
+
+            began = time.perf_counter()
+            tables = query.tables(start, end, family="5min")
+            rows = list(query.stream(str(start), str(end), family="5min"))
+            pruned_seconds = time.perf_counter() - began
+
+            assert [row for _, row in rows] == [row for _, row in sorted(rows, key=lambda item: item[1][0])]
+            assert sorted(rows) == sorted(expected), "pruned query returned different rows"
+            print(f"{start} to {end}: {len(rows)} rows from {len(tables)} of {len(names)} tables")
+            print(f"  scan everything  {scan_seconds * 1000:8.1f} ms")
+            print(f"  partition pruned {pruned_seconds * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
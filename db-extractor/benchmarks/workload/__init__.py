@@ -0,0 +1,10 @@
+"""Synthetic weekly KPI tables and repeatable benchmarks of the extraction paths.
+
+Run from db-extractor/benchmarks:
+
+    python -m workload --scale 0.01 --output results.json --compare previous.json
+
+Tables named like the production ones (<SITE>_APG43_<5|15>_S<ww>_A<yyyy> and
+<SITE><n>MGW_S<ww>_A<yyyy>) are filled with counters and gauges of the indicators of
+data/indicators/indicateur_*.csv, in SQLite files or a local MySQL (BENCH_MYSQL_*).
+"""
@@ -0,0 +1,101 @@
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import platform
+from datetime import datetime
+from .backend import get_backend
+from .generator import FAMILY_INTERVALS, LAYOUTS, Workload, create_destination, generate, table_names, write_snapshots
+from .harness import compare, git_commit, run_isolated, store_results
+from .scenarios import SCENARIOS
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m workload",
+                                     description="Benchmark the extraction paths on synthetic weekly tables.")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--sites", default="CALIS", help="comma-separated APG43 sites (CALIS, MEIND, RAIND)")
+    parser.add_argument("--families", default=",".join(FAMILY_INTERVALS), help="comma-separated table families")
+    parser.add_argument("--year", type=int, default=2024)
+    parser.add_argument("--weeks", default="12", help="comma-separated ISO weeks")
+    parser.add_argument("--scale", type=float, default=0.01, help="share of the indicators of each snapshot")
+    parser.add_argument("--days", type=int, default=7, help="days of samples per weekly table")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated benchmarks to run")
+    parser.add_argument("--workdir", help="keep the generated databases and outputs here instead of a temporary directory")
+    parser.add_argument("--output", default="results.json")
+    parser.add_argument("--compare", help="previous results file to compare with")
+    return parser.parse_args(argv)
+
+def environment(backend, source, destination):
+    """Settings of the pipeline's config modules for one benchmark process."""
+    src, dst = backend.config(source), backend.config(destination)
+    env = {
+        'SOURCE_MYSQL_HOST': src['host'], 'SOURCE_MYSQL_PORT': str(src['port']), 'SOURCE_MYSQL_USER': src['user'],
+        'SOURCE_MYSQL_PASSWORD': src['password'], 'SOURCE_MYSQL_DB': source, 'FIRST_MYSQL_DB': source,
+        'DEST_MYSQL_HOST': dst['host'], 'DEST_MYSQL_PORT': str(dst['port']), 'DEST_MYSQL_USER': dst['user'],
+        'DEST_MYSQL_PASSWORD': dst['password'], 'DEST_MYSQL_DB': destination,
+        'CHECKPOINT_STORE': 'sqlite', 'INDICATORS_SOURCE': 'snapshot', 'METRICS_PORT': '0',
+    }
+    env.update(backend.environment())
+    return env
+
+def run(args, directory):
+    workload = Workload(tuple(args.sites.split(",")), tuple(args.families.split(",")), args.year,
+                        tuple(int(week) for week in args.weeks.split(",")), args.scale, args.days, args.seed)
+    scenarios = [SCENARIOS[name] for name in args.scenarios.split(",")]
+    backend = get_backend(args.backend, directory)
+    tables = [(table, family) for table, _, family, _ in table_names(workload)]
+
+    print(f"🚀 Generating {len(tables)} tables per layout ({args.backend}, scale {args.scale})...")
+    rows = {}
+    for layout in sorted({scenario.layout for scenario in scenarios}):
+        counts = generate(backend, f"bench_source_{layout}", workload, LAYOUTS[layout],
+                          dimension_tables=layout != 'time')
+        rows[layout] = sum(counts.values())
+        print(f"✅ {rows[layout]} rows in bench_source_{layout}")
+
+    results = {}
+    for scenario in scenarios:
+        workdir = os.path.join(directory, scenario.name)
+        shutil.rmtree(workdir, ignore_errors=True)
+        for path in ("data/our_data", "data/our_tables"):
+            os.makedirs(os.path.join(workdir, path))
+        write_snapshots(os.path.join(workdir, "data", "indicators"), workload)
+        source, destination = f"bench_source_{scenario.layout}", f"bench_destination_{scenario.name}"
+        if scenario.destination:
+            create_destination(backend, destination, [table for table, _ in tables], LAYOUTS[scenario.layout],
+                               scenario.destination == 'indicators')
+        settings = {'backend': args.backend, 'directory': directory, 'workdir': workdir, 'source': source,
+                    'tables': tables, 'environment': environment(backend, source, destination)}
+        print(f"🔄 {scenario.name}...")
+        results[scenario.name] = result = run_isolated(scenario.name, settings)
+        if 'error' in result:
+            print(f"❌ {scenario.name}: {result['error']}")
+        else:
+            print(f"✅ {scenario.name}: {result['rows_per_s']:.0f} rows/s, p50 {result['p50_ms']} ms, "
+                  f"p99 {result['p99_ms']} ms, peak RSS {result['peak_rss_mb']} MB")
+
+    return {
+        'run': {'started': datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(),
+                'python': platform.python_version(), 'backend': args.backend},
+        'workload': dict(workload._asdict(), tables=len(tables), rows=rows),
+        'results': results,
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        report = run(args, os.path.abspath(args.workdir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="workload_") as directory:
+            report = run(args, directory)
+    store_results(report, args.output)
+    print(f"✅ Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+# Local MySQL server of the benchmarks, its databases created and dropped by the suite
+BENCH_MYSQL_HOST: str = os.getenv("BENCH_MYSQL_HOST", "127.0.0.1")
+BENCH_MYSQL_PORT: int = int(os.getenv("BENCH_MYSQL_PORT", 3306))
+BENCH_MYSQL_USER: str = os.getenv("BENCH_MYSQL_USER", "root")
+BENCH_MYSQL_PASSWORD: str = os.getenv("BENCH_MYSQL_PASSWORD", "")
+
+# SQLite stores datetimes as MySQL prints them and gives DATETIME columns back as datetimes
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+MAX_ALLOWED_PACKET = 64 * 1024 * 1024
+INFORMATION_SCHEMA_COLUMNS = re.compile(r"FROM\s+information_schema\.columns", re.IGNORECASE)
+INFORMATION_SCHEMA_TABLES = re.compile(r"FROM\s+information_schema\.tables", re.IGNORECASE)
+
+class SQLiteCursor:
+    """sqlite3 cursor speaking the MySQL dialect used by the pipeline.
+
+    Placeholders are translated, dictionary rows supported, and the few server statements
+    the pipeline issues (SHOW TABLES, SET SESSION, @@max_allowed_packet, information_schema
+    lookups) answered from SQLite's own catalog.
+    """
+
+    def __init__(self, conn: 'SQLiteConnection', dictionary: bool = False):
+        self.conn = conn
+        self.cursor = conn.conn.cursor()
+        self.dictionary = dictionary
+        self.rows: Optional[List[tuple]] = None  # Result of an emulated statement
+        self.description = None
+        self.rowcount = -1
+
+    def _emulate(self, rows: List[tuple], names: Sequence[str]):
+        self.rows = rows
+        self.description = [(name, None, None, None, None, None, None) for name in names]
+
+    def execute(self, query: str, params: Sequence[Any] = ()):
+        statement = query.strip()
+        self.rows = None
+        if statement.upper().startswith("SET "):
+            return self._emulate([], [])
+        if statement.upper() == "SHOW TABLES":
+            query = "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        elif statement == "SELECT @@max_allowed_packet":
+            return self._emulate([(MAX_ALLOWED_PACKET,)], ["@@max_allowed_packet"])
+        elif INFORMATION_SCHEMA_COLUMNS.search(statement):
+            return self._emulate(self.conn.columns(params[0]),
+                                 ["COLUMN_NAME", "DATA_TYPE", "IS_NULLABLE", "COLUMN_DEFAULT", "EXTRA"])
+        elif INFORMATION_SCHEMA_TABLES.search(statement):
+            count = self.conn.conn.execute(f"SELECT COUNT(*) FROM {params[0]}").fetchone()[0]
+            return self._emulate([(count,)], ["TABLE_ROWS"])
+        self.cursor.execute(query.replace("%s", "?"), tuple(params or ()))
+        self.description = self.cursor.description
+        self.rowcount = self.cursor.rowcount
+
+    def executemany(self, query: str, rows: Sequence[Sequence[Any]]):
+        self.cursor.executemany(query.replace("%s", "?"), rows)
+        self.rowcount = self.cursor.rowcount
+
+    def _shape(self, rows: List[tuple]) -> List[Any]:
+        if not self.dictionary:
+            return rows
+        names = [column[0] for column in self.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchmany(self, size: int) -> List[Any]:
+        if self.rows is not None:
+            rows, self.rows = self.rows[:size], self.rows[size:]
+            return self._shape(rows)
+        return self._shape(self.cursor.fetchmany(size))
+
+    def fetchall(self) -> List[Any]:
+        if self.rows is not None:
+            rows, self.rows = self.rows, []
+            return self._shape(rows)
+        return self._shape(self.cursor.fetchall())
+
+    def fetchone(self) -> Optional[Any]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self.cursor.close()
+
+class SQLiteConnection:
+    """SQLite database file behind the interface of a mysql.connector connection."""
+
+    def __init__(self, path: str, database: str):
+        self.database = database
+        self.server_host, self.server_port = 'sqlite', path
+        # Pooled connections move between threads, writers wait on each other's transactions
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+
+    def cursor(self, buffered: Optional[bool] = None, dictionary: bool = False) -> SQLiteCursor:
+        return SQLiteCursor(self, dictionary)
+
+    def columns(self, table: str) -> List[tuple]:
+        """information_schema.columns rows of a table."""
+        return [(name, re.sub(r"\(.*\)", "", kind).lower() or 'text', 'NO' if notnull else 'YES', default,
+                 'auto_increment' if pk and kind.upper() == 'INTEGER' else '')
+                for _, name, kind, notnull, default, pk in self.conn.execute(f"PRAGMA table_info({table})")]
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.conn.in_transaction
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def ping(self, reconnect: bool = False):
+        pass
+
+    def reconnect(self, attempts: int = 1, delay: int = 0):
+        pass
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self):
+        self.conn.close()
+
+class SQLiteBackend:
+    """One SQLite file per database in a working directory."""
+
+    name = 'sqlite'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, database: str) -> str:
+        return os.path.join(self.directory, f"{database}.db")
+
+    def config(self, database: str) -> Dict[str, Any]:
+        return {'host': 'sqlite', 'port': 0, 'user': 'bench', 'password': '', 'database': database}
+
+    def create_database(self, database: str):
+        """Start a database from scratch."""
+        if os.path.exists(self.path(database)):
+            os.remove(self.path(database))
+
+    def connect(self, database: str) -> SQLiteConnection:
+        return SQLiteConnection(self.path(database), database)
+
+    def install(self, pool_module):
+        """Make the pools of a pool module (proj/pool.py, imported under any name) open SQLite connections."""
+        backend = self
+
+        class SQLitePool(pool_module.ConnectionPool):
+            def _connect(self):
+                return backend.connect(self.config['database'])
+
+        pool_module.ConnectionPool = SQLitePool
+
+    def environment(self) -> Dict[str, str]:
+        """Settings of the pipeline's config modules: SQLite has neither LOAD DATA nor ON DUPLICATE KEY."""
+        return {'LOAD_MODE': 'executemany', 'ROLLUP_FAMILIES': ''}
+
+class MySQLBackend:
+    """Databases of a local MySQL server."""
+
+    name = 'mysql'
+
+    def config(self, database: str) -> Dict[str, Any]:
+        return {'host': BENCH_MYSQL_HOST, 'port': BENCH_MYSQL_PORT, 'user': BENCH_MYSQL_USER,
+                'password': BENCH_MYSQL_PASSWORD, 'database': database}
+
+    def _server(self):
+        import mysql.connector
+        config = dict(self.config(None))
+        del config['database']
+        return mysql.connector.connect(**config)
+
+    def create_database(self, database: str):
+        """Start a database from scratch."""
+        conn = self._server()
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        cursor.execute(f"CREATE DATABASE {database}")
+        cursor.close()
+        conn.close()
+
+    def connect(self, database: str):
+        import mysql.connector
+        return mysql.connector.connect(**self.config(database), allow_local_infile=True)
+
+    def install(self, pool_module):
+        pass
+
+    def environment(self) -> Dict[str, str]:
+        return {}
+
+def get_backend(name: str, directory: str):
+    if name == 'sqlite':
+        return SQLiteBackend(directory)
+    if name == 'mysql':
+        return MySQLBackend()
+    raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,178 @@
+import os
+import csv
+import glob
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+INDICATORS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "indicators")
+
+# Minutes between two samples of a table, per family
+FAMILY_INTERVALS = {'5min': 5, '15min': 15, 'mgw': 15}
+
+# Indicator types and names stored as cumulative counters (32-bit, wrapping and reset on node restarts),
+# every other indicator as a gauge
+COUNTER_TYPES = {'D', 'A'}
+COUNTER_NAMES = {'pmRtpReceivedPkts', 'pmRtpReceivedPktsHi', 'pmRtpReceivedPktsLo'}
+COUNTER_WRAP = 2 ** 32
+RESET_PROBABILITY = 1e-4
+NULL_PROBABILITY = 1e-3
+
+INSERT_CHUNK = 50000
+
+class Workload(NamedTuple):
+    """Weekly tables to generate and their size."""
+    sites: Tuple[str, ...]  # CALIS, MEIND, RAIND
+    families: Tuple[str, ...]  # 5min, 15min, mgw
+    year: int
+    weeks: Tuple[int, ...]
+    scale: float  # Share of each indicateur_*.csv used, 1.0 for every indicator of the snapshot
+    days: int  # Days of samples per weekly table, 7 for full weeks
+    seed: int
+
+class Layout(NamedTuple):
+    """Column names of the fact tables, which differ between the scripts reading them."""
+    name: str
+    time: str
+    indicator: str
+    value: str = 'value'
+
+# db_utils and main.py read `date`, proj reads `time` and `id_indicateur`, last.py `indicator_id`
+LAYOUTS = {
+    'date': Layout('date', 'date', 'id_indicateur'),
+    'time': Layout('time', 'time', 'id_indicateur'),
+    'export': Layout('export', 'time', 'indicator_id'),
+}
+
+def bases(site: str, family: str) -> List[str]:
+    """Base names of a site's tables in a family: <SITE>_APG43_<5|15>, or every <SITE><n>MGW node."""
+    if family in ('5min', '15min'):
+        return [f"{site}_APG43_{FAMILY_INTERVALS[family]}"]
+    paths = glob.glob(os.path.join(INDICATORS_DIR, f"indicateur_{site}*MGW.csv"))
+    return sorted(os.path.basename(path)[len("indicateur_"):-len(".csv")] for path in paths)
+
+def table_names(workload: Workload) -> List[Tuple[str, str, str, int]]:
+    """(table, base, family, week) of every weekly table of a workload."""
+    return [(f"{base}_S{week:02d}_A{workload.year}", base, family, week)
+            for week in workload.weeks for family in workload.families
+            for site in workload.sites for base in bases(site, family)]
+
+def read_indicators(base: str, scale: float) -> List[Tuple[int, str, Optional[str]]]:
+    """The first `scale` share of the indicators of a base, by id, from its CSV snapshot."""
+    with open(os.path.join(INDICATORS_DIR, f"indicateur_{base}.csv"), newline='') as f:
+        rows = sorted((int(row[0]), row[1], None if row[2] in ('', 'NULL') else row[2])
+                      for row in csv.reader(f) if len(row) == 3)
+    return rows[:max(1, round(len(rows) * scale))]
+
+def week_start(year: int, week: int) -> datetime:
+    """Monday 00:00 of an ISO week."""
+    return datetime.fromisocalendar(year, week, 1)
+
+def sample_table(indicators: Sequence[tuple], start: datetime, interval: int, days: int,
+                 rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Times, indicator ids and values of a table, in insertion order (by time then indicator).
+
+    Gauges wander around a level of their own; counters grow by Poisson increments,
+    wrap at 2^32 and restart from zero now and then. A few values are NULL (NaN).
+    """
+    steps = days * 24 * 60 // interval
+    ids = np.array([row[0] for row in indicators], dtype=np.int64)
+    counter = np.array([row[2] in COUNTER_TYPES or str(row[1]).split('.', 1)[0] in COUNTER_NAMES for row in indicators])
+
+    gauges = rng.uniform(0, 100, len(ids)) + rng.normal(0, 5, (steps, len(ids))).cumsum(axis=0) / np.sqrt(steps)
+    increments = rng.poisson(rng.uniform(1, 5000, len(ids)), (steps, len(ids))).astype(np.float64)
+    totals = increments.cumsum(axis=0)
+    resets = rng.random((steps, len(ids))) < RESET_PROBABILITY
+    # Totals never decrease, so the running maximum of the totals at resets is the last reset's
+    since_reset = totals - np.maximum.accumulate(np.where(resets, totals, 0), axis=0)
+    restarted = np.maximum.accumulate(resets, axis=0)
+    counters = np.where(restarted, since_reset, rng.uniform(0, COUNTER_WRAP, len(ids)) + totals) % COUNTER_WRAP
+    values = np.where(counter, counters, gauges)
+    values[rng.random(values.shape) < NULL_PROBABILITY] = np.nan
+
+    times = np.datetime64(start, 's') + np.arange(steps) * np.timedelta64(interval * 60, 's')
+    return np.repeat(times, len(ids)), np.tile(ids, steps), values.ravel()
+
+def rows(times: np.ndarray, ids: np.ndarray, values: np.ndarray) -> Iterator[List[tuple]]:
+    """Python rows of the sampled arrays, INSERT_CHUNK at a time."""
+    for start in range(0, len(times), INSERT_CHUNK):
+        part = slice(start, start + INSERT_CHUNK)
+        chunk_values = values[part].astype(object)
+        chunk_values[np.isnan(values[part])] = None
+        yield list(zip(times[part].astype(object), ids[part].tolist(), chunk_values.tolist()))
+
+def fact_table_sql(table: str, layout: Layout, indicator_columns: bool = False) -> str:
+    """Fact table in the layout, with the indicator columns appended by the proj extractor for destinations."""
+    extra = ", id INT, nom_indicateur VARCHAR(255), type VARCHAR(8)" if indicator_columns else ""
+    return (f"CREATE TABLE {table} ({layout.time} DATETIME NOT NULL, {layout.indicator} INT NOT NULL, "
+            f"{layout.value} DOUBLE{extra}, PRIMARY KEY ({layout.time}, {layout.indicator}))")
+
+def dimension_table_sql(base: str) -> str:
+    return f"CREATE TABLE indicateur_{base} (id INT PRIMARY KEY, nom_indicateur VARCHAR(255), type VARCHAR(8))"
+
+def placeholders(conn, width: int) -> str:
+    mark = '?' if conn.__class__.__module__.startswith('sqlite3') else '%s'
+    return ', '.join([mark] * width)
+
+def insert(conn, table: str, chunks) -> int:
+    """Insert rows with plain executemany, committing every chunk."""
+    count = 0
+    cursor = conn.cursor()
+    for chunk in chunks:
+        if chunk:
+            cursor.executemany(f"INSERT INTO {table} VALUES ({placeholders(conn, len(chunk[0]))})", chunk)
+            conn.commit()
+            count += len(chunk)
+    cursor.close()
+    return count
+
+def raw_connection(backend, database: str):
+    """Driver connection of a database, without the MySQL dialect layer of the SQLite backend."""
+    conn = backend.connect(database)
+    return getattr(conn, 'conn', conn)
+
+def generate(backend, database: str, workload: Workload, layout: Layout, dimension_tables: bool = True) -> Dict[str, int]:
+    """Create a source database holding the workload's weekly tables, and their indicator tables
+    unless the indicators are read from snapshots.
+
+    Returns the number of rows of every fact table. The same workload always produces the
+    same rows.
+    """
+    backend.create_database(database)
+    conn = raw_connection(backend, database)
+    rng = np.random.default_rng(workload.seed)
+    counts = {}
+    indicators = {}
+    cursor = conn.cursor()
+    for table, base, family, week in table_names(workload):
+        if base not in indicators:
+            indicators[base] = read_indicators(base, workload.scale)
+            if dimension_tables:
+                cursor.execute(dimension_table_sql(base))
+                insert(conn, f"indicateur_{base}", [indicators[base]])
+        cursor.execute(fact_table_sql(table, layout))
+        sampled = sample_table(indicators[base], week_start(workload.year, week), FAMILY_INTERVALS[family],
+                               workload.days, rng)
+        counts[table] = insert(conn, table, rows(*sampled))
+    cursor.close()
+    conn.close()
+    return counts
+
+def create_destination(backend, database: str, tables: Sequence[str], layout: Layout, indicator_columns: bool = False):
+    """Create an empty destination database with the fact tables of a workload."""
+    backend.create_database(database)
+    conn = raw_connection(backend, database)
+    cursor = conn.cursor()
+    for table in tables:
+        cursor.execute(fact_table_sql(table, layout, indicator_columns))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+def write_snapshots(directory: str, workload: Workload):
+    """Write the indicator subset of a workload as indicateur_*.csv snapshots (INDICATORS_SOURCE=snapshot)."""
+    os.makedirs(directory, exist_ok=True)
+    for base in {table[1] for table in table_names(workload)}:
+        with open(os.path.join(directory, f"indicateur_{base}.csv"), 'w', newline='') as f:
+            csv.writer(f, quoting=csv.QUOTE_ALL).writerows(
+                (id_, name, 'NULL' if kind is None else kind) for id_, name, kind in read_indicators(base, workload.scale))
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import queue
+import resource
+import contextlib
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+BENCHMARKS = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(BENCHMARKS, "..", "src")
+
+# Figures compared between two result files, and whether higher is better
+METRICS = {'rows_per_s': True, 'p50_ms': False, 'p99_ms': False, 'peak_rss_mb': False}
+
+class Recorder:
+    """Rows and batch latencies seen by the sink of a benchmark.
+
+    The latency of a batch is the time since the previous batch was done, so it covers
+    everything the pipeline did for it: fetch, transform, insert or publish.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.latencies: List[float] = []
+        self.start = self.last = time.perf_counter()
+
+    def batch(self, rows: int):
+        """Record a batch done with."""
+        now = time.perf_counter()
+        self.latencies.append(now - self.last)
+        self.last = now
+        self.rows += rows
+
+    def track(self, batches: Iterable[Any], size: Callable[[Any], int] = len) -> Iterator[Any]:
+        """Yield the batches, each recorded once the consumer asks for the next one."""
+        for batch in batches:
+            yield batch
+            self.batch(size(batch))
+
+    def result(self) -> Dict[str, float]:
+        seconds = time.perf_counter() - self.start
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        return {
+            'rows': self.rows,
+            'batches': len(self.latencies),
+            'seconds': round(seconds, 3),
+            'rows_per_s': round(self.rows / seconds, 1) if seconds else 0.0,
+            'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+            # ru_maxrss is in KB on Linux, the high-water mark of this benchmark's own process
+            'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        }
+
+def _run_child(name: str, settings: Dict[str, Any], results):
+    from .scenarios import SCENARIOS
+    os.environ.update(settings['environment'])
+    os.chdir(settings['workdir'])
+    try:
+        recorder = Recorder()
+        # The pipeline prints a line per batch, which would time the terminal
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            extra = SCENARIOS[name].run(settings, recorder) or {}
+        results.put(dict(recorder.result(), **extra))
+    except BaseException as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+
+def run_isolated(name: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a scenario in a fresh interpreter, so its modules read their settings from scratch and
+    its peak RSS is its own."""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_run_child, args=(name, settings, results))
+    process.start()
+    try:
+        while True:
+            try:
+                return results.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    return {'error': f"benchmark process exited with code {process.exitcode}"}
+    finally:
+        process.join()
+
+def git_commit() -> Optional[str]:
+    """Commit the benchmarked tree is at, None outside a git checkout."""
+    import subprocess
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def store_results(report: Dict[str, Any], path: str):
+    """Write a report as JSON, replacing the previous file only once complete."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(report, f, indent=4, default=str)
+    os.replace(tmp_path, path)
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]):
+    """Print how every figure moved between two reports."""
+    print(f"🔄 Compared with {previous['run'].get('commit')} of {previous['run'].get('started')}")
+    if previous['workload'] != json.loads(json.dumps(current['workload'])):
+        print("⚠️ The two runs did not benchmark the same workload")
+    for name, result in current['results'].items():
+        before = previous['results'].get(name)
+        if not before or 'error' in before or 'error' in result:
+            continue
+        changes = []
+        for metric, higher_is_better in METRICS.items():
+            old, new = before[metric], result[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            mark = "✅" if better or abs(change) < 5 else "⚠️"
+            changes.append(f"{metric} {old:g} → {new:g} ({change:+.1f}% {mark})")
+        print(f"  {name:<14} " + ", ".join(changes))
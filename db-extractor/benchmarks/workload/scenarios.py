@@ -0,0 +1,105 @@
+import os
+import csv
+import sys
+import importlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+from .backend import get_backend
+from .harness import BENCHMARKS, SRC, Recorder
+
+class Scenario(NamedTuple):
+    name: str
+    layout: str  # Layout of the source tables (generator.LAYOUTS)
+    destination: Optional[str]  # None, 'plain' (the source layout) or 'indicators' (plus the indicator columns)
+    run: Callable[[Dict[str, Any], Recorder], Optional[Dict[str, Any]]]
+
+SCENARIOS: Dict[str, Scenario] = {}
+
+def scenario(name: str, layout: str, destination: Optional[str] = None):
+    def register(run):
+        SCENARIOS[name] = Scenario(name, layout, destination, run)
+        return run
+    return register
+
+def open_pools(settings: Dict[str, Any], module: str):
+    """Import the pool module under the name the benchmarked code uses and point it at the backend."""
+    pool = importlib.import_module(module)
+    get_backend(settings['backend'], settings['directory']).install(pool)
+    return pool
+
+def batch_rows(batch) -> int:
+    return len(batch[0])
+
+@scenario('db_utils', 'date', 'plain')
+def run_db_utils(settings, recorder):
+    """main.py's copy without Kafka: stream_new_data batches bulk-inserted into the destination."""
+    sys.path.insert(0, SRC)
+    open_pools(settings, 'utils.proj.pool')
+    from utils import db_utils
+    db_utils.create_destination_rollups()
+    for table, _ in settings['tables']:
+        for data, _ in recorder.track(db_utils.stream_new_data(settings['source'], table, "2000-01-01"), batch_rows):
+            db_utils.bulk_insert_into_destination(table, data)
+
+@scenario('kafka', 'date')
+def run_kafka(settings, recorder):
+    """main.py's publish_batch on every stream_new_data batch, against a mock producer."""
+    sys.path[:0] = [SRC, BENCHMARKS]
+    open_pools(settings, 'utils.proj.pool')
+    from utils import db_utils, kafka_utils
+    from utils.config import KAFKA_BATCH_SIZE, KAFKA_COMPRESSION
+    from kafka_publish import MockProducer
+    producer = MockProducer(KAFKA_BATCH_SIZE, KAFKA_COMPRESSION)
+    for table, _ in settings['tables']:
+        for data, _ in recorder.track(db_utils.stream_new_data(settings['source'], table, "2000-01-01"), batch_rows):
+            kafka_utils.send_batch_to_kafka(settings['source'], table, data, kafka_producer=producer)
+            kafka_utils.flush_kafka(kafka_producer=producer)
+    return {'requests': producer.requests, 'wire_mb': round(producer.wire_bytes / 1024 / 1024, 2)}
+
+@scenario('orchestrator', 'time', 'indicators')
+def run_orchestrator(settings, recorder):
+    """proj.Orchestrator copying every table, indicator names joined from the CSV snapshots."""
+    sys.path.insert(0, os.path.join(SRC, "utils", "proj"))
+    open_pools(settings, 'pool')
+    from orchestrator import Orchestrator
+    orchestrator = Orchestrator()
+    load = orchestrator.loader.load_batch_into_database
+
+    def recorded_load(table, data, columns=None):
+        load(table, data, columns)
+        recorder.batch(len(data))
+
+    orchestrator.loader.load_batch_into_database = recorded_load
+    orchestrator.process_orchestration()
+
+def open_export(settings):
+    """Connection and indicator cache of last.py's Mysql_process."""
+    sys.path.insert(0, os.path.join(SRC, "utils"))
+    pool = open_pools(settings, 'proj.pool')
+    from proj.dimensions import database_cache
+    import last
+    source = pool.get_pool({'host': last.DB_HOST, 'user': last.DB_USER, 'password': last.DB_PASSWORD,
+                            'port': last.DB_PORT, 'database': last.DB_NAME})
+    return last, source.acquire(), database_cache(source)
+
+@scenario('last_csv', 'export')
+def run_last_csv(settings, recorder):
+    """last.py's CSV export of every table."""
+    last, conn, dimensions = open_export(settings)
+    with open("export.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Indicator Name", "Value"])
+        for table, _ in settings['tables']:
+            for chunk in recorder.track(last.extract_table_data(table, conn, dimensions)):
+                writer.writerows(chunk)
+    return {'output_mb': round(os.path.getsize("export.csv") / 1024 / 1024, 2)}
+
+@scenario('last_parquet', 'export')
+def run_last_parquet(settings, recorder):
+    """last.py's Parquet export of every table into its partition."""
+    last, conn, dimensions = open_export(settings)
+    extract = last.extract_table_data
+    last.extract_table_data = lambda *args, **kwargs: recorder.track(extract(*args, **kwargs))
+    for table, family in settings['tables']:
+        last.export_table_parquet(table, family, conn, dimensions, root="parquet")
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk("parquet") for name in names)
+    return {'output_mb': round(size / 1024 / 1024, 2)}
@@ -1,38 +1,172 @@
 import time
 import os
-from utils.db_utils import get_table_names, fetch_new_data, bulk_insert_into_destination, load_last_dates, save_last_dates
-from utils.kafka_utils import send_to_kafka
-from utils.config import FIRST_MYSQL_DB, SECOND_MYSQL_DB
+from utils.db_utils import (
+    get_table_names, stream_new_data, bulk_insert_into_destination, open_checkpoint_store,
+    get_binlog_settings, create_destination_rollups, transform_batch, commit_rates,
+    discard_rates, batch_size, save_batch_sizes, checkpoint_date
+)
+from utils.kafka_utils import send_batch_to_kafka, send_rates_to_kafka, flush_kafka
+from utils.cdc import TableRegistry, BinlogCapture
+from utils.proj.pool import pool_stats
+from utils.proj.pipeline import Pipeline
+from utils.proj.metrics import (
+    start_metrics_server, set_table_lag, table_family, observe_pipeline, KAFKA_SEND_SECONDS, CYCLE_SECONDS
+)
+from utils.config import (
+    FIRST_MYSQL_DB, SECOND_MYSQL_DB, METRICS_PORT, CAPTURE_MODE, BINLOG_SERVER_ID, TABLES_REFRESH_SECONDS,
+    PIPELINE_QUEUE_SIZE, KAFKA_RATES_TOPIC
+)
 
-# Initialize last extracted timestamps
-last_dates = load_last_dates()
+databases = [FIRST_MYSQL_DB, SECOND_MYSQL_DB]
 
-def extract_and_load():
-    databases = [FIRST_MYSQL_DB, SECOND_MYSQL_DB]
+# Key (date, id_indicateur) of the last row loaded from every table, and the binlog position under BINLOG_KEY
+checkpoints = open_checkpoint_store()
+BINLOG_KEY = "__binlog__"
+
+# Binlog position up to which the events of a (database, table) are inserted
+def applied_key(key):
+    return f"{BINLOG_KEY}{key[0]}.{key[1]}"
+
+# Tables worth polling in watermark mode
+registry = TableRegistry(get_table_names, refresh_seconds=TABLES_REFRESH_SECONDS)
+
+# Deltas and rates of a batch when they are published, None otherwise
+def transform(db_name, table, data):
+    return transform_batch(db_name, table, data) if KAFKA_RATES_TOPIC else None
+
+# Publish a batch (and its rates) and wait for Kafka to acknowledge it, return the messages that failed
+def publish_batch(db_name, table, data, rates=None):
+    start = time.perf_counter()
+    send_batch_to_kafka(db_name, table, data)
+    if rates is not None:
+        send_rates_to_kafka(db_name, table, rates)
+    errors = flush_kafka()
+    KAFKA_SEND_SECONDS.labels(table_family(table)).observe(time.perf_counter() - start)
+    return errors
+
+# Publish a batch then insert it along with its checkpoint; return False if Kafka did not acknowledge it.
+# A crash between the two may publish a batch twice, but never inserts or skips rows twice. The rates of a
+# batch that is not inserted are forgotten, the batch fetched again is diffed against the one before it.
+def load_batch(db_name, table, data, checkpoint=None):
+    rates = transform(db_name, table, data)
+    try:
+        errors = publish_batch(db_name, table, data, rates)
+        if errors:
+            print(f"❌ {len(errors)} messages of {table} were not delivered to Kafka: {errors[0][1]}")
+            discard_rates(table)
+            return False
+
+        bulk_insert_into_destination(table, data, checkpoint)
+    except Exception:
+        discard_rates(table)
+        raise
+    if rates is not None:
+        commit_rates(table, rates)
+    return True
+
+def copy_table(db_name, table):
+    position = checkpoints.get(table, "2000-01-01")  # Default to old date
 
+    for data, position in stream_new_data(db_name, table, position):
+        if not load_batch(db_name, table, data, (checkpoints, table, position)):
+            return False
+    return True
+
+# Same as copy_table, but the next batches are fetched and transformed while the current one is published and inserted
+def copy_table_pipelined(db_name, table):
+    def batches():
+        return stream_new_data(db_name, table, checkpoints.get(table, "2000-01-01"))
+
+    def transform_rates(batch):
+        return (*batch, transform(db_name, table, batch[0]))
+
+    def publish(batch):
+        errors = publish_batch(db_name, table, batch[0], batch[2] if len(batch) > 2 else None)
+        if errors:
+            raise RuntimeError(f"{len(errors)} messages of {table} were not delivered to Kafka: {errors[0][1]}")
+        return batch
+
+    def insert(batch):
+        data, position = batch[:2]
+        bulk_insert_into_destination(table, data, (checkpoints, table, position))
+        if len(batch) > 2:
+            commit_rates(table, batch[2])
+
+    stages = [("transform", transform_rates)] if KAFKA_RATES_TOPIC else []
+    pipeline = Pipeline(batches(), stages + [("publish", publish), ("insert", insert)], PIPELINE_QUEUE_SIZE)
+    try:
+        observe_pipeline(pipeline.run())
+        return True
+    except RuntimeError as e:
+        # Batches already inserted keep their checkpoint, the rest is fetched again next cycle
+        print(f"❌ {e}")
+        return False
+    finally:
+        # Rates of the batches transformed but not inserted
+        discard_rates(table)
+
+def extract_and_load():
     for db_name in databases:
-        tables = get_table_names(db_name)
+        if CAPTURE_MODE == "watermark":
+            tables = registry.active_tables(db_name)
+        else:
+            tables = get_table_names(db_name)
 
         for table in tables:
-            last_date = last_dates.get(table, "2000-01-01")  # Default to old date
-
-            while True:
-                data, last_date = fetch_new_data(db_name, table, last_date)
-                if not data:
-                    break  # No more data, exit loop
+            if PIPELINE_QUEUE_SIZE > 0:
+                caught_up = copy_table_pipelined(db_name, table)
+            else:
+                caught_up = copy_table(db_name, table)
+            if caught_up and CAPTURE_MODE == "watermark":
+                registry.caught_up(db_name, table)
+            set_table_lag(table, checkpoint_date(checkpoints.get(table)))
+    checkpoints.flush()
 
-                bulk_insert_into_destination(table, data)
+# Load the rows inserted since the last binlog position (or replayed from a RecordedBinlog)
+def capture_changes(capture=None):
+    position = checkpoints.get(BINLOG_KEY)
+    capture = capture or BinlogCapture(get_binlog_settings(), databases, BINLOG_SERVER_ID,
+                                       tuple(position) if position else None)
+    pending = {}
 
-                # Send to Kafka
-                for record in data:
-                    send_to_kafka(db_name, table, record)
+    def flush(key, position):
+        db_name, table = key
+        rows = pending.pop(key)
+        # The table's position is committed with its rows, so that its events are not inserted twice
+        # when they are read again from an older binlog position
+        if not load_batch(db_name, table, rows, (checkpoints, applied_key(key), position)):
+            raise RuntimeError(f"Kafka delivery failed for {table}")
+        # The binlog position only moves once no other table has rows waiting before it
+        if not pending:
+            checkpoints.set(BINLOG_KEY, position)
+        set_table_lag(table, rows[-1].get("date"))
 
-                last_dates[table] = last_date  # Update last processed date
-                save_last_dates(last_dates)  # Save progress
+    try:
+        for change in capture.events():
+            key = (change.database, change.table)
+            applied = checkpoints.get(applied_key(key))
+            if applied and tuple(change.position) <= tuple(applied):
+                continue
+            pending.setdefault(key, []).extend(change.rows)
+            if len(pending[key]) >= batch_size(change.table):
+                flush(key, change.position)
+        for key in list(pending):
+            flush(key, capture.position)
+    except RuntimeError as e:
+        print(f"❌ {e}, resuming from the last saved position")
+    checkpoints.flush()
 
 def main():
+    start_metrics_server(pool_stats, METRICS_PORT)
+    create_destination_rollups()
     while True:
-        extract_and_load()
+        start = time.perf_counter()
+        if CAPTURE_MODE == "binlog":
+            capture_changes()
+        else:
+            extract_and_load()
+        CYCLE_SECONDS.set(time.perf_counter() - start)
+        save_batch_sizes()
         time.sleep(30)  # Poll every 30 seconds
 
 if __name__ == "__main__":
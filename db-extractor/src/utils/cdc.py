@@ -0,0 +1,132 @@
+import json
+import time
+from datetime import date, timedelta
+from utils.proj.table_catalog import parse_table_name
+
+# Weekly tables are named <BASE>_S<week>_A<year>, with ISO week numbers
+
+# Weeks (ISO year, ISO week) still receiving rows: the current one and the ones before it
+def active_weeks(today=None, weeks_back=1):
+    today = today or date.today()
+    weeks = set()
+    for back in range(weeks_back + 1):
+        year, week, _ = (today - timedelta(weeks=back)).isocalendar()
+        weeks.add((year, week))
+    return weeks
+
+# Keep only the weekly tables of the given weeks
+def select_active_tables(tables, weeks):
+    active = []
+    for table in tables:
+        parsed = parse_table_name(table)
+        if parsed and parsed.year_week in weeks:
+            active.append(table)
+    return active
+
+class TableRegistry:
+    """High-watermark polling registry: which tables of a database are worth polling.
+
+    The current and previous week's tables are always polled. A table of a closed week is
+    polled until one copy of it runs to the end (caught_up()), then left alone: closed weeks
+    never change, but their rows may not have been loaded yet (a fresh checkpoint store, an
+    outage of more than a week). The table list itself is refreshed every `refresh_seconds`
+    instead of running SHOW TABLES on every cycle.
+    """
+
+    def __init__(self, list_tables, refresh_seconds=600, weeks_back=1):
+        self.list_tables = list_tables
+        self.refresh_seconds = refresh_seconds
+        self.weeks_back = weeks_back
+        self.tables = {}
+        self.refreshed_at = {}
+        self.retired = {}  # database -> tables of closed weeks already caught up with
+
+    def active_tables(self, database, today=None):
+        now = time.monotonic()
+        if database not in self.tables or now - self.refreshed_at[database] > self.refresh_seconds:
+            self.tables[database] = self.list_tables(database)
+            self.refreshed_at[database] = now
+        current = set(select_active_tables(self.tables[database], active_weeks(today, self.weeks_back)))
+        retired = self.retired.get(database, set())
+        return [table for table in self.tables[database]
+                if table in current or (parse_table_name(table) and table not in retired)]
+
+    def caught_up(self, database, table, today=None):
+        """Record that a table was copied up to its last row; once its week is closed it is polled no more."""
+        if table not in select_active_tables([table], active_weeks(today, self.weeks_back)):
+            self.retired.setdefault(database, set()).add(table)
+
+class ChangeBatch:
+    """Rows inserted into one table, with the binlog position right after them."""
+
+    def __init__(self, database, table, rows, position):
+        self.database = database
+        self.table = table
+        self.rows = rows
+        self.position = position
+
+    def to_json(self):
+        return json.dumps({"database": self.database, "table": self.table, "rows": self.rows,
+                           "position": self.position}, default=str)
+
+class BinlogCapture:
+    """Read row inserts of the weekly tables from the MySQL binlog.
+
+    Needs binlog_format=ROW on the source and a user with REPLICATION SLAVE and
+    REPLICATION CLIENT privileges. `position` is the (log_file, log_pos) to resume from;
+    each call to events() stops once it has caught up with the server.
+    """
+
+    def __init__(self, connection_settings, databases, server_id, position=None):
+        self.connection_settings = connection_settings
+        self.databases = databases
+        self.server_id = server_id
+        self.position = position
+
+    def events(self):
+        from pymysqlreplication import BinLogStreamReader
+        from pymysqlreplication.row_event import WriteRowsEvent
+
+        log_file, log_pos = self.position if self.position else (None, None)
+        stream = BinLogStreamReader(
+            connection_settings=self.connection_settings,
+            server_id=self.server_id,
+            only_events=[WriteRowsEvent],
+            only_schemas=self.databases,
+            log_file=log_file,
+            log_pos=log_pos,
+            resume_stream=self.position is not None,
+            blocking=False,
+        )
+        try:
+            for event in stream:
+                if not parse_table_name(event.table):
+                    continue
+                rows = [row["values"] for row in event.rows]
+                self.position = (stream.log_file, stream.log_pos)
+                yield ChangeBatch(event.schema, event.table, rows, self.position)
+        finally:
+            stream.close()
+
+class RecordedBinlog:
+    """Replay change batches recorded to a JSON lines file, for tests and benchmarks."""
+
+    def __init__(self, path):
+        self.path = path
+        self.position = None
+
+    def events(self):
+        with open(self.path, "r") as f:
+            for line in f:
+                if line.strip():
+                    event = json.loads(line)
+                    self.position = tuple(event["position"])
+                    yield ChangeBatch(event["database"], event["table"], event["rows"], self.position)
+
+# Save the first `limit` change batches of a capture to a JSON lines file
+def record_binlog(capture, path, limit):
+    with open(path, "w") as f:
+        for count, batch in enumerate(capture.events(), start=1):
+            f.write(batch.to_json() + "\n")
+            if count >= limit:
+                break
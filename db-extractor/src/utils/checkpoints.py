@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+# Checkpoint table, in SQLite or in the destination database
+CHECKPOINT_TABLE = "etl_checkpoints"
+
+class CheckpointStore(ABC):
+    """Per-table positions (key of the last extracted row, binlog position...) kept in memory.
+
+    Updates are buffered and written as one upsert transaction by flush(), which runs
+    automatically every `flush_every` updates or `flush_seconds` seconds.
+    """
+
+    def __init__(self, flush_every=100, flush_seconds=5.0):
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.positions = {}
+        self.dirty = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        return self.positions.get(key, default)
+
+    def set(self, key, position):
+        """Record a new position, written on the next flush."""
+        with self.lock:
+            self.positions[key] = position
+            self.dirty[key] = position
+            due = len(self.dirty) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+            self.last_flush = time.monotonic()
+        if dirty:
+            self.write(dirty)
+
+    @abstractmethod
+    def write(self, positions):
+        """Persist the given positions in one transaction."""
+
+    def import_json(self, path):
+        """Import the checkpoints of a legacy last_dates.json file, once."""
+        if os.path.exists(path) and not self.positions:
+            with open(path, "r") as f:
+                for key, position in json.load(f).items():
+                    self.set(key, position)
+            self.flush()
+            os.rename(path, path + ".imported")
+            print(f"✅ Checkpoints imported from {path}")
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Checkpoints in a local SQLite file; each flush is one atomic transaction."""
+
+    def __init__(self, path, **options):
+        super().__init__(**options)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} "
+            "(table_name TEXT PRIMARY KEY, position TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        for key, position in self.conn.execute(f"SELECT table_name, position FROM {CHECKPOINT_TABLE}"):
+            self.positions[key] = json.loads(position)
+
+    def write(self, positions):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {CHECKPOINT_TABLE} (table_name, position, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(table_name) DO UPDATE SET position = excluded.position, updated_at = excluded.updated_at",
+                [(key, json.dumps(position, default=str), now) for key, position in positions.items()]
+            )
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+class DestinationCheckpointStore(CheckpointStore):
+    """Checkpoints in the destination MySQL database.
+
+    stage() writes a table's checkpoint with the caller's cursor, so it commits in the
+    same transaction as the rows it covers: after a crash the checkpoint and the
+    destination rows always agree and extraction resumes exactly after the last batch.
+    """
+
+    UPSERT = (
+        f"INSERT INTO {CHECKPOINT_TABLE} (table_name, position) VALUES (%s, %s) "
+        "ON DUPLICATE KEY UPDATE position = VALUES(position)"
+    )
+
+    def __init__(self, pool, **options):
+        super().__init__(**options)
+        self.pool = pool
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+                "table_name VARCHAR(128) PRIMARY KEY, position TEXT NOT NULL, "
+                "updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP)"
+            )
+            cursor.execute(f"SELECT table_name, position FROM {CHECKPOINT_TABLE}")
+            for key, position in cursor.fetchall():
+                self.positions[key] = json.loads(position)
+            conn.commit()
+            cursor.close()
+
+    def stage(self, cursor, key, position):
+        """Write a checkpoint inside the caller's open transaction, call committed() after the commit."""
+        cursor.execute(self.UPSERT, (key, json.dumps(position, default=str)))
+
+    def committed(self, key, position):
+        """Record a checkpoint written by stage() once its transaction is committed."""
+        with self.lock:
+            self.positions[key] = position
+            self.dirty.pop(key, None)
+
+    def write(self, positions):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(self.UPSERT, [
+                (key, json.dumps(position, default=str)) for key, position in positions.items()
+            ])
+            conn.commit()
+            cursor.close()
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,97 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Source MySQL Configuration (Company Server)
+SOURCE_MYSQL_HOST: str = os.getenv("SOURCE_MYSQL_HOST")
+SOURCE_MYSQL_USER: str = os.getenv("SOURCE_MYSQL_USER")
+SOURCE_MYSQL_PASSWORD: str = os.getenv("SOURCE_MYSQL_PASSWORD")
+SOURCE_MYSQL_PORT: int = int(os.getenv("SOURCE_MYSQL_PORT", 3306))
+
+# Source databases
+FIRST_MYSQL_DB: str = os.getenv("FIRST_MYSQL_DB")
+SECOND_MYSQL_DB: str = os.getenv("SECOND_MYSQL_DB")
+
+# Destination MySQL Configuration (Target Server)
+DEST_MYSQL_HOST: str = os.getenv("DEST_MYSQL_HOST")
+DEST_MYSQL_USER: str = os.getenv("DEST_MYSQL_USER")
+DEST_MYSQL_PASSWORD: str = os.getenv("DEST_MYSQL_PASSWORD")
+DEST_MYSQL_PORT: int = int(os.getenv("DEST_MYSQL_PORT", 3306))
+DEST_MYSQL_DB: str = os.getenv("DEST_MYSQL_DB")
+
+# How new rows are found: "poll" polls every table, "watermark" polls the current and previous week's
+# tables and those of closed weeks until they are caught up with, "binlog" reads row events from the source binlog
+CAPTURE_MODE: str = os.getenv("CAPTURE_MODE", "poll")
+BINLOG_SERVER_ID: int = int(os.getenv("BINLOG_SERVER_ID", 4242))  # Must be unique among replicas
+TABLES_REFRESH_SECONDS: int = int(os.getenv("TABLES_REFRESH_SECONDS", 600))
+
+# Where checkpoints are kept: "destination" (same transaction as the inserted rows) or "sqlite"
+CHECKPOINT_STORE: str = os.getenv("CHECKPOINT_STORE", "destination")
+CHECKPOINT_SQLITE_PATH: str = os.getenv("CHECKPOINT_SQLITE_PATH", "data/checkpoints.db")
+
+# How batches are inserted: "infile" (LOAD DATA LOCAL INFILE), "multirow" or "executemany"
+LOAD_MODE: str = os.getenv("LOAD_MODE", "infile")
+
+# Rows per fetch and per insert, tuned per table from the batches already done (starting at BATCH_SIZE) so that
+# a batch takes about BATCH_TARGET_SECONDS and weighs at most BATCH_MAX_BYTES; saved to BATCH_SIZES_PATH
+BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", 5000))
+BATCH_TARGET_SECONDS: float = float(os.getenv("BATCH_TARGET_SECONDS", 1.0))
+BATCH_MAX_BYTES: int = int(os.getenv("BATCH_MAX_BYTES", 8 * 1024 * 1024))
+BATCH_MIN_ROWS: int = int(os.getenv("BATCH_MIN_ROWS", 100))
+BATCH_MAX_ROWS: int = int(os.getenv("BATCH_MAX_ROWS", 200000))
+BATCH_SIZES_PATH: str = os.getenv("BATCH_SIZES_PATH", "data/batch_sizes.json")
+
+# Batches fetched ahead while the previous ones are published and inserted (0 disables the pipeline)
+PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+# net_write_timeout of the streaming reads, held open while their batches are published and inserted
+STREAM_NET_WRITE_TIMEOUT: int = int(os.getenv("STREAM_NET_WRITE_TIMEOUT", 600))
+
+# Connection pools of db_utils (connections kept open per database), PROJ_POOL_SIZE sizes those of proj
+MYSQL_POOL_SIZE: int = int(os.getenv("MYSQL_POOL_SIZE", 5))
+
+# last.py exports: "csv" (one file per family) or "parquet" (year=/week=/family= partitions),
+# the latter streamed in chunks of EXPORT_CHUNK_SIZE rows
+EXPORT_FORMAT: str = os.getenv("EXPORT_FORMAT", "csv")
+EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", 50000))
+PARQUET_EXPORT_DIR: str = os.getenv("PARQUET_EXPORT_DIR", "./data/our_data/parquet")
+
+# Table statistics snapshot shared by size.py and new.py, re-read after CATALOG_TTL seconds
+CATALOG_TTL: int = int(os.getenv("CATALOG_TTL", 3600))
+CATALOG_CACHE_PATH: str = os.getenv("CATALOG_CACHE_PATH", "./data/our_data/catalog.json")
+
+# Hourly and daily min/max/sum/count per indicator, updated with every batch inserted into tables of these families
+# (none by default, e.g. "5min,15min,mgw"; the time, indicator and value columns named here also feed the
+# rates of KAFKA_RATES_TOPIC)
+ROLLUP_FAMILIES: list = [family for family in os.getenv("ROLLUP_FAMILIES", "").split(",") if family]
+ROLLUP_TIME_COLUMN: str = os.getenv("ROLLUP_TIME_COLUMN", "date")
+ROLLUP_INDICATOR_COLUMN: str = os.getenv("ROLLUP_INDICATOR_COLUMN", "id_indicateur")
+ROLLUP_VALUE_COLUMN: str = os.getenv("ROLLUP_VALUE_COLUMN", "value")
+
+# Destination columns read once per table and re-read after SCHEMA_TTL seconds; row keys matched
+# to them by "name", or by "position" for legacy destinations whose column names differ
+SCHEMA_TTL: int = int(os.getenv("SCHEMA_TTL", 300))
+SCHEMA_MATCH: str = os.getenv("SCHEMA_MATCH", "name")
+
+# Kafka Configuration
+KAFKA_BROKER: str = os.getenv("KAFKA_BROKER")
+KAFKA_TOPIC: str = os.getenv("KAFKA_TOPIC")
+KAFKA_LINGER_MS: int = int(os.getenv("KAFKA_LINGER_MS", 50))
+KAFKA_BATCH_SIZE: int = int(os.getenv("KAFKA_BATCH_SIZE", 512 * 1024))
+KAFKA_COMPRESSION: str = os.getenv("KAFKA_COMPRESSION", "lz4")  # gzip, snappy, lz4 or zstd
+KAFKA_KEY_BY: str = os.getenv("KAFKA_KEY_BY", "table")  # table or indicator
+KAFKA_SERIALIZER: str = os.getenv("KAFKA_SERIALIZER", "msgpack")  # json, msgpack or arrow
+
+# Per-indicator deltas and rates of every batch, published as Arrow record batches to this topic
+# (disabled when empty). Indicators of COUNTER_TYPES are counters wrapping at 2^COUNTER_WRAP_BITS: D holds
+# IP interface counters and A call, bearer and RTP counters, while G holds gauges and O derived ratios
+# (ASR, late packets...) along with the few counters listed by name (before the first dot) in COUNTER_NAMES
+KAFKA_RATES_TOPIC: str = os.getenv("KAFKA_RATES_TOPIC", "")
+COUNTER_TYPES: frozenset = frozenset(kind for kind in os.getenv("COUNTER_TYPES", "D,A").split(",") if kind)
+COUNTER_NAMES: frozenset = frozenset(name for name in os.getenv(
+    "COUNTER_NAMES", "pmRtpReceivedPkts,pmRtpReceivedPktsHi,pmRtpReceivedPktsLo").split(",") if name)
+COUNTER_WRAP_BITS: int = int(os.getenv("COUNTER_WRAP_BITS", 32))
+
+# Port of the Prometheus metrics endpoint
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", 8000))
@@ -1,95 +1,209 @@
-import mysql.connector
-import json
-import os
+import time
+from utils.proj.pool import get_pool
+from utils.proj.bulk_loader import bulk_load_chunks
+from utils.proj.streaming import ResultStream
+from utils.proj.batch_sizing import batch_sizer
+from utils.proj.metrics import observe_fetch, observe_insert
+from utils.proj.rollups import create_rollup_tables, rolled_up, update_rollups
+from utils.proj.schema_registry import SchemaRegistry, SCHEMA_ERRORS
+from utils.proj.dimensions import database_cache
+from utils.proj.transform import RateTransform, counter_mask, record_columns
+from utils.checkpoints import SQLiteCheckpointStore, DestinationCheckpointStore
 from utils.config import (
     SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, SOURCE_MYSQL_PORT,
-    DEST_MYSQL_HOST, DEST_MYSQL_USER, DEST_MYSQL_PASSWORD, DEST_MYSQL_PORT
+    DEST_MYSQL_HOST, DEST_MYSQL_USER, DEST_MYSQL_PASSWORD, DEST_MYSQL_PORT, DEST_MYSQL_DB,
+    MYSQL_POOL_SIZE, CHECKPOINT_STORE, CHECKPOINT_SQLITE_PATH, LOAD_MODE,
+    ROLLUP_FAMILIES, ROLLUP_TIME_COLUMN, ROLLUP_INDICATOR_COLUMN, ROLLUP_VALUE_COLUMN, SCHEMA_TTL, SCHEMA_MATCH,
+    COUNTER_TYPES, COUNTER_NAMES, COUNTER_WRAP_BITS, BATCH_SIZE, BATCH_TARGET_SECONDS, BATCH_MAX_BYTES, BATCH_MIN_ROWS,
+    BATCH_MAX_ROWS, BATCH_SIZES_PATH, STREAM_NET_WRITE_TIMEOUT
 )
 
-# Define batch size
-BATCH_SIZE = 5000  
+# Rows per fetch and per insert of every table, tuned from the latency and row size of its batches
+sizes = batch_sizer(BATCH_SIZES_PATH, initial_rows=BATCH_SIZE, target_seconds=BATCH_TARGET_SECONDS,
+                    max_bytes=BATCH_MAX_BYTES, min_rows=BATCH_MIN_ROWS, max_rows=BATCH_MAX_ROWS)
 
-# Path to store the last extracted timestamp
+# Tables of the destination database (DEST_MYSQL_DB) introspected once, rows aligned with their columns by name
+schemas = SchemaRegistry(SCHEMA_TTL, SCHEMA_MATCH)
+
+# Deltas and rates of every indicator, the last sample of each kept from one batch to the next
+rates = RateTransform(2 ** COUNTER_WRAP_BITS)
+
+# Legacy JSON checkpoints, imported into the checkpoint store on first start
 LAST_DATES_FILE = "data/last_dates.json"
 
-# Load the last extracted timestamps from a file
-def load_last_dates():
-    if os.path.exists(LAST_DATES_FILE):
-        with open(LAST_DATES_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-# Save the last extracted timestamps to a file
-def save_last_dates(last_dates):
-    with open(LAST_DATES_FILE, "w") as f:
-        json.dump(last_dates, f)
-
-# Get connection to source MySQL
-def get_source_connection(database):
-    return mysql.connector.connect(
-        host=SOURCE_MYSQL_HOST,
-        user=SOURCE_MYSQL_USER,
-        password=SOURCE_MYSQL_PASSWORD,
-        database=database,
-        port=SOURCE_MYSQL_PORT
-    )
-
-# Get connection to destination MySQL
-def get_destination_connection():
-    return mysql.connector.connect(
-        host=DEST_MYSQL_HOST,
-        user=DEST_MYSQL_USER,
-        password=DEST_MYSQL_PASSWORD,
-        database=DEST_MYSQL_DB,
-        port=DEST_MYSQL_PORT
-    )
+# Open the checkpoint store: in the destination database (committed with the inserted rows)
+# or in a local SQLite file
+def open_checkpoint_store():
+    if CHECKPOINT_STORE == "destination":
+        store = DestinationCheckpointStore(get_destination_pool())
+    else:
+        store = SQLiteCheckpointStore(CHECKPOINT_SQLITE_PATH)
+    store.import_json(LAST_DATES_FILE)
+    return store
+
+# Get the connection pool of a source MySQL database
+def get_source_pool(database):
+    return get_pool({
+        'host': SOURCE_MYSQL_HOST,
+        'user': SOURCE_MYSQL_USER,
+        'password': SOURCE_MYSQL_PASSWORD,
+        'port': SOURCE_MYSQL_PORT,
+        'database': database
+    }, size=MYSQL_POOL_SIZE)
+
+# Connection settings of the source server for the binlog reader
+def get_binlog_settings():
+    return {
+        'host': SOURCE_MYSQL_HOST,
+        'user': SOURCE_MYSQL_USER,
+        'passwd': SOURCE_MYSQL_PASSWORD,
+        'port': SOURCE_MYSQL_PORT
+    }
+
+# Get the connection pool of the destination MySQL
+def get_destination_pool():
+    return get_pool({
+        'host': DEST_MYSQL_HOST,
+        'user': DEST_MYSQL_USER,
+        'password': DEST_MYSQL_PASSWORD,
+        'port': DEST_MYSQL_PORT,
+        'database': DEST_MYSQL_DB
+    }, size=MYSQL_POOL_SIZE, allow_local_infile=True)
+
+# Create the hourly and daily rollup tables in the destination
+def create_destination_rollups():
+    if ROLLUP_FAMILIES:
+        with get_destination_pool().connection() as connection:
+            create_rollup_tables(connection)
 
 # Fetch all table names from source MySQL
 def get_table_names(database):
-    connection = get_source_connection(database)
-    cursor = connection.cursor()
-    cursor.execute("SHOW TABLES")
-    tables = [table[0] for table in cursor.fetchall()]
-    cursor.close()
-    connection.close()
+    with get_source_pool(database).connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SHOW TABLES")
+        tables = [table[0] for table in cursor.fetchall()]
+        cursor.close()
     return tables
 
-# Fetch new data based on `date`
-def fetch_new_data(database, table_name, last_date):
-    connection = get_source_connection(database)
-    cursor = connection.cursor(dictionary=True)
-
+# Rows of the next batch read from a table
+def batch_size(table_name):
+    return sizes.size(table_name, "fetch")
+
+# Record a fetched batch and tune the size of the next ones from its latency and row size
+def record_fetch(table_name, data, seconds):
+    sizes.observe(table_name, "fetch", len(data), seconds, observe_fetch(table_name, data, seconds))
+
+# Save the batch sizes of every table for the next run
+def save_batch_sizes():
+    sizes.save()
+
+# Rows are read in (date, id_indicateur) order and checkpointed at the key of the last row of a batch:
+# a 5-minute timestamp holds thousands of rows, so a date alone cannot tell where a batch stopped within it
+KEY_COLUMNS = ("date", "id_indicateur")
+
+# WHERE clause and parameters of the rows after a checkpoint: a [date, id_indicateur] key, or a bare date
+# (legacy checkpoints and the initial "2000-01-01") after which every row is new
+def after_checkpoint(position):
+    if isinstance(position, (list, tuple)):
+        last_date, last_id = position
+        return "date > %s OR (date = %s AND id_indicateur > %s)", (last_date, last_date, last_id)
+    return "date > %s", (position,)
+
+# Checkpoint of a batch, the key of its last row
+def batch_position(data):
+    return [data[-1][column] for column in KEY_COLUMNS]
+
+# Date of a checkpoint, for the table lag
+def checkpoint_date(position):
+    return position[0] if isinstance(position, (list, tuple)) else position
+
+# Fetch the batch of rows following a checkpoint, return it with the checkpoint of its last row
+def fetch_new_data(database, table_name, position):
+    size = batch_size(table_name)
+    condition, params = after_checkpoint(position)
     query = f"""
         SELECT * FROM {table_name} 
-        WHERE date > '{last_date}'
-        ORDER BY date ASC
-        LIMIT {BATCH_SIZE}
+        WHERE {condition}
+        ORDER BY date ASC, id_indicateur ASC
+        LIMIT {size}
     """
-    cursor.execute(query)
-
-    data = cursor.fetchall()
-    cursor.close()
-    connection.close()
-
-    return data, data[-1]["date"] if data else last_date
-
-# Bulk insert into destination MySQL
-def bulk_insert_into_destination(table_name, data):
+    start = time.perf_counter()
+    with get_source_pool(database).connection() as connection:
+        with ResultStream(connection, query, params, size, dictionary=True) as stream:
+            data = next(iter(stream), [])
+    record_fetch(table_name, data, time.perf_counter() - start)
+
+    return data, batch_position(data) if data else position
+
+# Stream every row after a checkpoint with a single query, yielding (batch, checkpoint of its last row), each batch
+# sized for the table. The source connection stays checked out until the generator is exhausted or closed, with a
+# net_write_timeout long enough for the batches to be published and inserted meanwhile.
+def stream_new_data(database, table_name, position):
+    condition, params = after_checkpoint(position)
+    query = f"""
+        SELECT * FROM {table_name} 
+        WHERE {condition}
+        ORDER BY date ASC, id_indicateur ASC
+    """
+    with get_source_pool(database).connection() as connection:
+        with ResultStream(connection, query, params, lambda: batch_size(table_name), dictionary=True,
+                          net_write_timeout=STREAM_NET_WRITE_TIMEOUT) as stream:
+            batches = iter(stream)
+            while True:
+                start = time.perf_counter()
+                data = next(batches, None)
+                if data is None:
+                    break
+                record_fetch(table_name, data, time.perf_counter() - start)
+                yield data, batch_position(data)
+
+# Columns of a batch with the delta and rate of every row (RATE_COLUMNS); batches of a table must come in order.
+# Counters are told from gauges by the type and name of their indicator in the source's indicateur_<base> table.
+def transform_batch(database, table_name, data):
+    times, indicators, values = record_columns(data, ROLLUP_TIME_COLUMN, ROLLUP_INDICATOR_COLUMN, ROLLUP_VALUE_COLUMN)
+    flags = database_cache(get_source_pool(database)).get(table_name).flags(COUNTER_TYPES, COUNTER_NAMES)
+    return rates.apply(table_name, times, indicators, values, counter_mask(flags, indicators))
+
+# Record a transformed batch once it is published and inserted
+def commit_rates(table_name, columns):
+    rates.commit(table_name, columns)
+
+# Forget the batches of a table transformed since the last committed one, they are fetched again
+def discard_rates(table_name):
+    rates.rollback(table_name)
+
+# Bulk insert into destination MySQL; chunks, rollups and the checkpoint are committed in one transaction
+def bulk_insert_into_destination(table_name, data, checkpoint=None):
     if not data:
         return
 
-    connection = get_destination_connection()
-    cursor = connection.cursor()
-
-    columns = ", ".join(data[0].keys())
-    values_placeholder = ", ".join(["%s"] * len(data[0]))
-
-    insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({values_placeholder})"
-
+    columns = list(data[0].keys())
     values = [tuple(record.values()) for record in data]
 
-    cursor.executemany(insert_query, values)
-    connection.commit()
-
-    cursor.close()
-    connection.close()
+    start = time.perf_counter()
+    with get_destination_pool().connection() as connection:
+        plan = schemas.plan(connection, table_name, columns)
+        values = plan.align(values)
+        try:
+            inserted = bulk_load_chunks(connection, table_name, plan.columns, values, LOAD_MODE,
+                             lambda: sizes.size(table_name, "insert"),
+                             lambda rows, seconds: sizes.observe(table_name, "insert", rows, seconds))
+        except Exception as e:
+            if getattr(e, 'errno', None) in SCHEMA_ERRORS:
+                schemas.invalidate(connection, table_name)
+            raise
+        cursor = connection.cursor()
+        if rolled_up(table_name, ROLLUP_FAMILIES):
+            update_rollups(cursor, table_name, plan.columns, values,
+                           ROLLUP_TIME_COLUMN, ROLLUP_INDICATOR_COLUMN, ROLLUP_VALUE_COLUMN, inserted=inserted)
+        transactional = checkpoint and isinstance(checkpoint[0], DestinationCheckpointStore)
+        if transactional:
+            checkpoint[0].stage(cursor, checkpoint[1], checkpoint[2])
+        connection.commit()
+        cursor.close()
+    observe_insert(table_name, len(values), time.perf_counter() - start)
+
+    if transactional:
+        checkpoint[0].committed(checkpoint[1], checkpoint[2])
+    elif checkpoint:
+        checkpoint[0].set(checkpoint[1], checkpoint[2])
@@ -1,16 +1,12 @@
-import re
+from proj.table_catalog import TableCatalog, base_name
 
 # Function to extract the base name (before the week number part)
 def extract_base_name(table):
-    match = re.match(r'^(.*)_S\d+_A\d{4}$', table)
-    if match:
-        return match.group(1)
-    return None
+    return base_name(table)
 
 # Function to get distinct base names from the table names
 def get_distinct_base_names(tables):
-    base_names = set(extract_base_name(table) for table in tables)
-    return list(base_names)
+    return TableCatalog(tables).bases()
 
 table_path = './data/our_data/result_mgw.txt'
 
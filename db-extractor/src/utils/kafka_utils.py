@@ -1,15 +1,107 @@
-import json
+import time
+import threading
 from kafka import KafkaProducer
-from utils.config import KAFKA_BROKER, KAFKA_TOPIC
-
-# Kafka Producer Configuration
-producer = KafkaProducer(
-    bootstrap_servers=KAFKA_BROKER,
-    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+from utils.serializers import ArrowSerializer, get_serializer
+from utils.proj.metrics import KAFKA_ERRORS, table_family
+from utils.config import (
+    KAFKA_BROKER, KAFKA_TOPIC, KAFKA_LINGER_MS, KAFKA_BATCH_SIZE, KAFKA_COMPRESSION, KAFKA_KEY_BY,
+    KAFKA_SERIALIZER, KAFKA_RATES_TOPIC
 )
 
+# Kafka Producer, created on first use
+producer = None
+
+# Message format of the pipeline (json, msgpack or arrow)
+serializer = get_serializer(KAFKA_SERIALIZER)
+
+# Transformed batches are columnar already, they are always sent as Arrow
+rates_serializer = None
+
+# Delivery counters, updated from the producer's I/O thread
+delivery_lock = threading.Lock()
+delivery_stats = {"sent": 0, "delivered": 0, "failed": 0}
+delivery_errors = []
+
+def get_producer():
+    """Create the Kafka producer on first use, tuned for batched sends."""
+    global producer
+    if producer is None:
+        producer = KafkaProducer(
+            bootstrap_servers=KAFKA_BROKER,
+            key_serializer=lambda k: k.encode("utf-8") if k is not None else None,
+            linger_ms=KAFKA_LINGER_MS,
+            batch_size=KAFKA_BATCH_SIZE,
+            compression_type=KAFKA_COMPRESSION,
+            acks=1,
+        )
+    return producer
+
+# Partition key of a record: by table, or by indicator so each series stays ordered on one partition
+def message_key(table, record):
+    if KAFKA_KEY_BY == "indicator":
+        indicator = record.get("id_indicateur")
+        return f"{table}:{indicator}" if indicator is not None else table
+    return table
+
+def on_delivered(_metadata):
+    with delivery_lock:
+        delivery_stats["delivered"] += 1
+
+def on_failed(table, error, on_error=None):
+    with delivery_lock:
+        delivery_stats["failed"] += 1
+        delivery_errors.append((table, error))
+    KAFKA_ERRORS.labels(table_family(table)).inc()
+    if on_error:
+        on_error(table, error)
+
 # Send data to Kafka
 def send_to_kafka(database, table, data):
-    message = {"database": database, "table": table, "data": data}
-    producer.send(KAFKA_TOPIC, message)
-    print(f"Sent to Kafka: {message}")
+    send_batch_to_kafka(database, table, [data])
+
+# Send a whole fetched batch to Kafka; failures are reported to `on_error(table, error)`
+def send_batch_to_kafka(database, table, records, on_error=None, kafka_producer=None):
+    kafka_producer = kafka_producer or get_producer()
+    headers = [("content-type", serializer.content_type.encode())]
+
+    # Group records by partition key, each group is encoded on its own
+    groups = {}
+    for record in records:
+        groups.setdefault(message_key(table, record), []).append(record)
+
+    sent = 0
+    for key, group in groups.items():
+        for payload in serializer.encode(database, table, group):
+            future = kafka_producer.send(KAFKA_TOPIC, value=payload, key=key, headers=headers)
+            future.add_callback(on_delivered)
+            future.add_errback(lambda error: on_failed(table, error, on_error))
+            sent += 1
+    with delivery_lock:
+        delivery_stats["sent"] += sent
+    return sent
+
+# Send the columns of a transformed batch (delta, rate...) to the rates topic as one Arrow message
+def send_rates_to_kafka(database, table, columns, on_error=None, kafka_producer=None):
+    global rates_serializer
+    if rates_serializer is None:
+        rates_serializer = ArrowSerializer()
+    kafka_producer = kafka_producer or get_producer()
+    headers = [("content-type", rates_serializer.content_type.encode())]
+    sent = 0
+    for payload in rates_serializer.encode_columns(database, table, columns):
+        future = kafka_producer.send(KAFKA_RATES_TOPIC, value=payload, key=table, headers=headers)
+        future.add_callback(on_delivered)
+        future.add_errback(lambda error: on_failed(table, error, on_error))
+        sent += 1
+    with delivery_lock:
+        delivery_stats["sent"] += sent
+    return sent
+
+# Wait until every pending message is acknowledged, return the failures since the last flush
+def flush_kafka(timeout=None, kafka_producer=None):
+    kafka_producer = kafka_producer or get_producer()
+    kafka_producer.flush(timeout=timeout)
+    with delivery_lock:
+        errors = list(delivery_errors)
+        delivery_errors.clear()
+    return errors
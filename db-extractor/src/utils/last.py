@@ -1,7 +1,17 @@
 import mysql.connector
+from proj.pool import get_pool
+from proj.dimensions import database_cache
+from proj.streaming import stream_rows
+from proj.table_catalog import parse_table_name
 import csv
+import os
 import sys
-from config import SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, FIRST_MYSQL_DB, SOURCE_MYSQL_PORT
+import pyarrow as pa
+import pyarrow.parquet as pq
+from config import (
+    SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, FIRST_MYSQL_DB, SOURCE_MYSQL_PORT,
+    EXPORT_FORMAT, EXPORT_CHUNK_SIZE, PARQUET_EXPORT_DIR
+)
 
 # Database connection details
 DB_HOST = SOURCE_MYSQL_HOST 
@@ -10,7 +20,6 @@ DB_PASSWORD = SOURCE_MYSQL_PASSWORD
 DB_NAME = FIRST_MYSQL_DB
 DB_PORT = SOURCE_MYSQL_PORT
 
-print("\U0001F680 Process started...")
 
 # File paths
 input_files = {
@@ -25,24 +34,76 @@ output_files = {
     "mgw": "./data/our_data/extracted_data_mgw.csv"
 }
 
-def extract_table_data(table_name, conn):
-    """Extracts timestamp, indicator name, and value from the given table."""
-    try:
-        cursor = conn.cursor()
-        query = f'''
-            SELECT t.time, i.nom_indicateur, t.value
-            FROM {table_name} t
-            JOIN indicateur_CALIS_APG43_5 i ON t.indicator_id = i.id;
+# Parquet columns: typed timestamps and dictionary-encoded indicator names
+PARQUET_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("s")),
+    ("indicator", pa.dictionary(pa.int32(), pa.string())),
+    ("value", pa.float64()),
+])
+
+def table_query(table_name):
+    return f'''
+            SELECT t.time, t.value, t.indicator_id
+            FROM {table_name} t;
         '''
-        cursor.execute(query)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
-    except mysql.connector.Error as err:
-        print(f"\u274C Error fetching data from table {table_name}: {err}")
-        return None
-
-def process_table_data(input_file, output_file, conn):
+
+def named_rows(table_name, rows, dimensions):
+    """Replaces indicator ids with names: (timestamp, indicator name, value)."""
+    # Indicator names come from the table's own indicateur_<base>, cached across tables
+    return [(row[0], row[4], row[1]) for row in dimensions.enrich(table_name, rows, 2)]
+
+def extract_table_data(table_name, conn, dimensions, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yields timestamp, indicator name, and value of the given table in chunks, holding one chunk in memory."""
+    for rows in stream_rows(conn, table_query(table_name), chunk_size=chunk_size):
+        yield named_rows(table_name, rows, dimensions)
+
+def partition_path(root, family, table_name):
+    """Hive-style partition of a weekly table: <root>/year=YYYY/week=WW/family=<family>/<table>.parquet"""
+    table = parse_table_name(table_name)
+    return os.path.join(root, f"year={table.year}", f"week={table.week:02d}", f"family={family}", f"{table_name}.parquet")
+
+def to_record_batch(rows):
+    times, names, values = zip(*rows)
+    return pa.record_batch([
+        pa.array(times, PARQUET_SCHEMA.field("timestamp").type),
+        pa.array(names, pa.string()).dictionary_encode(),
+        pa.array([None if value is None else float(value) for value in values], pa.float64()),
+    ], schema=PARQUET_SCHEMA)
+
+def export_table_parquet(table_name, family, conn, dimensions, root=PARQUET_EXPORT_DIR, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams a table into its Parquet partition, one row group per chunk. Returns the number of rows written."""
+    path = partition_path(root, family, table_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    rows_written = 0
+    try:
+        with pq.ParquetWriter(tmp_path, PARQUET_SCHEMA, compression="zstd") as writer:
+            for chunk in extract_table_data(table_name, conn, dimensions, chunk_size):
+                writer.write_batch(to_record_batch(chunk))
+                rows_written += len(chunk)
+        os.replace(tmp_path, path)  # Readers never see a half-written file
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows_written
+
+def process_table_data_parquet(input_file, family, conn, dimensions):
+    """Reads table names and exports each table to its Parquet partition."""
+    with open(input_file, "r") as file:
+        table_names = file.read().splitlines()
+
+    if not table_names:
+        print(f"⚠️ Warning: No tables found in {input_file}")
+        return
+
+    for table in table_names:
+        try:
+            rows = export_table_parquet(table, family, conn, dimensions)
+            print(f"✅ {rows} rows of {table} saved to {partition_path(PARQUET_EXPORT_DIR, family, table)}")
+        except mysql.connector.Error as err:
+            print(f"\u274C Error exporting table {table}: {err}")
+
+def process_table_data(input_file, output_file, conn, dimensions):
     """Reads table names, extracts data, and writes to a CSV file."""
     try:
         with open(input_file, "r") as file:
@@ -53,18 +114,16 @@ def process_table_data(input_file, output_file, conn):
             print(f"⚠️ Warning: No tables found in {input_file}")
             return
 
-        extracted_data = []
-
-        for table in table_names:
-            data = extract_table_data(table, conn)
-            if data:
-                extracted_data.extend(data)
-
-        # Write to CSV
+        # Write to CSV as the chunks arrive
         with open(output_file, "w", newline="") as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(["Timestamp", "Indicator Name", "Value"])  # Header
-            writer.writerows(extracted_data)
+            for table in table_names:
+                try:
+                    for chunk in extract_table_data(table, conn, dimensions):
+                        writer.writerows(chunk)
+                except mysql.connector.Error as err:
+                    print(f"\u274C Error fetching data from table {table}: {err}")
 
         print(f"✅ Data extracted and saved to {output_file}")
     except Exception as e:
@@ -76,13 +135,15 @@ def Mysql_process():
     print("🔄 Connecting to the database...")
 
     try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            port=DB_PORT
-        )
+        pool = get_pool({
+            'host': DB_HOST,
+            'user': DB_USER,
+            'password': DB_PASSWORD,
+            'port': DB_PORT,
+            'database': DB_NAME
+        })
+        conn = pool.acquire()
+        dimensions = database_cache(pool)
         print("✅ Connection successful!")
     except mysql.connector.Error as e:
         print(f"❌ Connection error: {e}")
@@ -92,10 +153,16 @@ def Mysql_process():
 
     for key in input_files:
         print(f"📂 Processing file: {input_files[key]}")
-        process_table_data(input_files[key], output_files[key], conn)
+        if EXPORT_FORMAT == "parquet":
+            process_table_data_parquet(input_files[key], key, conn, dimensions)
+        else:
+            process_table_data(input_files[key], output_files[key], conn, dimensions)
 
-    conn.close()
+    pool.release(conn)
+    pool.close()
     print("✅ Process completed!")
 
 # Run the process
-Mysql_process()
+if __name__ == "__main__":
+    print("\U0001F680 Process started...")
+    Mysql_process()
@@ -1,7 +1,12 @@
 import mysql.connector
+from proj.pool import get_pool
+from proj.catalog import CatalogSnapshot
 import csv
 import sys
-from config import SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, FIRST_MYSQL_DB,SOURCE_MYSQL_PORT
+from config import (
+    SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, FIRST_MYSQL_DB, SOURCE_MYSQL_PORT,
+    CATALOG_TTL, CATALOG_CACHE_PATH
+)
 
 # Database connection details
 DB_HOST = SOURCE_MYSQL_HOST 
@@ -10,12 +15,6 @@ DB_PASSWORD = SOURCE_MYSQL_PASSWORD
 DB_NAME = FIRST_MYSQL_DB
 DB_PORT = SOURCE_MYSQL_PORT
 
-print("🚀 Process started...")
-
-print(f"🔹 Host: {DB_HOST}")
-print(f"🔹 User: {DB_USER}")
-print(f"🔹 Database: {DB_NAME}")
-
 # File paths
 input_files = {
     "5min": "./data/our_data/result_5min.txt",
@@ -29,24 +28,12 @@ output_files = {
     "mgw": "./data/our_data/table_sizes_mgw.csv"
 }
 
-def get_table_size(table_name, conn):
-    """Fetch size of a single table in MB."""
-    try:
-        cursor = conn.cursor()
-        query = """
-        SELECT ROUND(((data_length + index_length) / 1024 / 1024), 2) AS size_mb
-        FROM information_schema.tables
-        WHERE table_schema = %s AND table_name = %s;
-        """
-        cursor.execute(query, (DB_NAME, table_name))
-        result = cursor.fetchone()
-        cursor.close()
-        return result[0] if result else 0  # Return 0 if table doesn't exist
-    except mysql.connector.Error as err:
-        print(f"❌ Error fetching size for table {table_name}: {err}")
-        return None
-
-def process_table_sizes(input_file, output_file, conn):
+def get_table_size(table_name, catalog):
+    """Size of a single table in MB, from the catalog snapshot."""
+    stats = catalog.snapshot().get(table_name)
+    return stats["size_mb"] if stats else 0  # Return 0 if table doesn't exist
+
+def process_table_sizes(input_file, output_file, catalog):
     """Reads table names, retrieves sizes, and writes to a CSV file."""
     try:
         with open(input_file, "r") as file:
@@ -61,7 +48,7 @@ def process_table_sizes(input_file, output_file, conn):
         total_size = 0
 
         for table in table_names:
-            size = get_table_size(table, conn)
+            size = get_table_size(table, catalog)
             if size is not None:  # Avoid writing None values
                 table_sizes.append([table, size])
                 total_size += size
@@ -83,13 +70,16 @@ def Mysql_process():
     print("🔄 Connecting to the database...")
 
     try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME,
-            port=DB_PORT
-        )
+        pool = get_pool({
+            'host': DB_HOST,
+            'user': DB_USER,
+            'password': DB_PASSWORD,
+            'port': DB_PORT,
+            'database': DB_NAME
+        })
+        # One information_schema query for every table, reused until CATALOG_TTL expires
+        catalog = CatalogSnapshot(pool.connection, DB_NAME, CATALOG_TTL, CATALOG_CACHE_PATH)
+        catalog.snapshot()
         print("✅ Connection successful!")
     
     except mysql.connector.Error as e:
@@ -151,11 +141,18 @@ def Mysql_process():
     # Process each file
     for key in input_files:
         print(f"📂 Processing file: {input_files[key]}")
-        process_table_sizes(input_files[key], output_files[key], conn)
+        process_table_sizes(input_files[key], output_files[key], catalog)
 
-    # Close the connection after all queries
-    conn.close()
+    # Close the pool after all queries
+    pool.close()
     print("✅ Process completed!")
 
 # Run the process
-Mysql_process()
+if __name__ == "__main__":
+    print("🚀 Process started...")
+
+    print(f"🔹 Host: {DB_HOST}")
+    print(f"🔹 User: {DB_USER}")
+    print(f"🔹 Database: {DB_NAME}")
+
+    Mysql_process()
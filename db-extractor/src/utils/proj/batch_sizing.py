@@ -0,0 +1,108 @@
+import os
+import json
+import threading
+from typing import Any, Dict, Optional
+try:
+    from .metrics import BATCH_ROWS, ROW_BYTES  # Imported as utils.proj.batch_sizing
+except ImportError:
+    from metrics import BATCH_ROWS, ROW_BYTES  # Imported from the proj directory
+
+# Batch sizes are tuned separately for reading from the source and writing to the destination
+OPERATIONS = ('fetch', 'insert')
+
+class BatchSizer:
+    """Rows per fetch and per insert of every table, tuned from the batches already done.
+
+    The seconds per row of each operation and the bytes per row of each table are smoothed
+    over the batches seen. The next size is the one expected to take `target_seconds` and
+    to weigh at most `max_bytes`, within [min_rows, max_rows] and at most `max_step` times
+    the current size either way: narrow MGW tables grow their batches, wide APG43 join
+    rows shrink theirs. Batches much smaller than the current size (the end of a table)
+    only update the row size, their fixed round trip cost would inflate the time per row.
+
+    Sizes and estimates are saved to a JSON file by save(), the next run starts from them.
+    """
+
+    def __init__(self, path: Optional[str] = None, initial_rows: int = 5000, target_seconds: float = 1.0,
+                 max_bytes: int = 8 * 1024 * 1024, min_rows: int = 100, max_rows: int = 200000,
+                 smoothing: float = 0.3, max_step: float = 2.0):
+        self.path = path
+        self.initial_rows = initial_rows
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.smoothing = smoothing
+        self.max_step = max_step
+        self.lock = threading.Lock()
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, 'r') as f:
+            self.tables = json.load(f)
+        for table, state in self.tables.items():
+            self._publish(table, state)
+
+    def save(self):
+        """Write the sizes of every table, replacing the previous file only once complete."""
+        if not self.path:
+            return
+        with self.lock:
+            data = json.dumps(self.tables, indent=4)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _publish(self, table: str, state: Dict[str, Any]):
+        for operation in OPERATIONS:
+            if operation in state:
+                BATCH_ROWS.labels(table, operation).set(state[operation])
+        if state.get('row_bytes'):
+            ROW_BYTES.labels(table).set(state['row_bytes'])
+
+    def _state(self, table: str) -> Dict[str, Any]:
+        if table not in self.tables:
+            self.tables[table] = {operation: self.initial_rows for operation in OPERATIONS}
+        return self.tables[table]
+
+    def _smooth(self, previous: Optional[float], sample: float) -> float:
+        return sample if previous is None else previous + self.smoothing * (sample - previous)
+
+    def size(self, table: str, operation: str) -> int:
+        """Rows of the next batch of a table ('fetch' or 'insert')."""
+        with self.lock:
+            return self._state(table)[operation]
+
+    def observe(self, table: str, operation: str, rows: int, seconds: float, nbytes: Optional[int] = None) -> int:
+        """Record a batch done with and return the size of the next one."""
+        with self.lock:
+            state = self._state(table)
+            current = state[operation]
+            if rows <= 0:
+                return current
+            if nbytes:
+                state['row_bytes'] = self._smooth(state.get('row_bytes'), nbytes / rows)
+            if rows * 2 >= current:
+                key = f"{operation}_row_seconds"
+                state[key] = self._smooth(state.get(key), seconds / rows)
+            row_seconds = state.get(f"{operation}_row_seconds")
+            wanted = self.target_seconds / row_seconds if row_seconds else current
+            if state.get('row_bytes'):
+                wanted = min(wanted, self.max_bytes / state['row_bytes'])
+            wanted = min(max(wanted, current / self.max_step), current * self.max_step)
+            state[operation] = int(min(max(wanted, self.min_rows), self.max_rows))
+            self._publish(table, state)
+            return state[operation]
+
+_sizers: Dict[Optional[str], BatchSizer] = {}
+_sizers_lock = threading.Lock()
+
+def batch_sizer(path: Optional[str] = None, **options) -> BatchSizer:
+    """Return the sizer persisted to a file, shared by every worker, creating it on first use."""
+    with _sizers_lock:
+        if path not in _sizers:
+            _sizers[path] = BatchSizer(path, **options)
+        return _sizers[path]
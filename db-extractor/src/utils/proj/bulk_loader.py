@@ -0,0 +1,247 @@
+import os
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import mysql.connector
+
+# MySQL error codes meaning LOAD DATA LOCAL is disabled on the client or the server
+LOCAL_INFILE_DISABLED = {1148, 2068, 3948}
+
+# LOAD DATA LOCAL turns errors into warnings; a duplicate key fails the load with the IntegrityError an INSERT
+# raises, any other warning (truncated or invalid value...) with the matching DatabaseError
+DUPLICATE_KEY = 1062
+
+# Servers found with LOAD DATA LOCAL disabled, loaded with multi-row inserts from then on
+_infile_disabled = set()
+
+def server_key(conn) -> tuple:
+    """Host and port of the server behind a connection."""
+    return conn.server_host, conn.server_port
+
+# Escapes of the LOAD DATA default format (fields by tab, lines by newline, escaped by backslash)
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+def tsv_value(value: Any) -> str:
+    """Format one value for LOAD DATA, NULL as \\N."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8', errors='replace')
+    elif isinstance(value, (datetime, date, timedelta)):
+        return str(value)
+    elif not isinstance(value, str):
+        return str(value)
+    return value.translate(TSV_ESCAPES)
+
+def rows_to_tsv(rows: Sequence[Sequence[Any]]) -> bytes:
+    """Encode rows in the LOAD DATA default text format."""
+    return ''.join('\t'.join(tsv_value(v) for v in row) + '\n' for row in rows).encode('utf-8')
+
+def load_data_infile(conn, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> int:
+    """Load rows with LOAD DATA LOCAL INFILE, streamed through a named pipe, and return the rows inserted.
+
+    The connection must be opened with allow_local_infile=True. Where named pipes are
+    not available the rows go through a temporary file instead. Does not commit.
+
+    LOCAL implies IGNORE, so every warning is checked: a row whose key is already in the
+    table, or any other warning, raises the matching mysql.connector error as an INSERT would.
+    """
+    directory = tempfile.mkdtemp(prefix='bulk_load_')
+    path = os.path.join(directory, f"{table}.tsv")
+    writer = None
+    try:
+        if hasattr(os, 'mkfifo'):
+            os.mkfifo(path)
+
+            def write():
+                with open(path, 'wb') as pipe:
+                    pipe.write(rows_to_tsv(rows))
+
+            writer = threading.Thread(target=write, daemon=True)
+            writer.start()
+        else:
+            with open(path, 'wb') as f:
+                f.write(rows_to_tsv(rows))
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table} "
+                f"CHARACTER SET utf8mb4 ({', '.join(columns)})"
+            )
+            inserted = cursor.rowcount
+            if cursor.warning_count:
+                check_load_warnings(cursor, table)
+            return inserted
+        finally:
+            cursor.close()
+    finally:
+        if writer is not None and writer.is_alive():
+            # The server never opened the pipe, unblock the writer so the thread ends
+            try:
+                with open(path, 'rb') as pipe:
+                    pipe.read()
+            except OSError:
+                pass
+            writer.join()
+        os.remove(path)
+        os.rmdir(directory)
+
+def check_load_warnings(cursor, table: str):
+    """Raise the first warning of the last statement, a duplicate key as an IntegrityError."""
+    cursor.execute("SHOW WARNINGS")
+    for level, code, message in cursor.fetchall():
+        error = mysql.connector.errors.IntegrityError if code == DUPLICATE_KEY else mysql.connector.errors.DatabaseError
+        raise error(msg=f"LOAD DATA into {table}: {message}", errno=code)
+
+# max_allowed_packet of each server, read once
+_packet_sizes: Dict[tuple, int] = {}
+
+def max_allowed_packet(conn) -> int:
+    """Return the server's max_allowed_packet, read once per server."""
+    key = server_key(conn)
+    if key not in _packet_sizes:
+        cursor = conn.cursor()
+        cursor.execute("SELECT @@max_allowed_packet")
+        _packet_sizes[key] = int(cursor.fetchone()[0])
+        cursor.close()
+    return _packet_sizes[key]
+
+@lru_cache(maxsize=4096)
+def insert_prefix(table: str, columns: Tuple[str, ...]) -> str:
+    """INSERT statement up to VALUES, built once per table and column list."""
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+
+@lru_cache(maxsize=4096)
+def row_placeholder(width: int) -> str:
+    return '(' + ', '.join(['%s'] * width) + ')'
+
+def multirow_insert(conn, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                    max_packet: int = None) -> int:
+    """Insert rows with multi-row INSERT ... VALUES (...),(...) statements under max_allowed_packet.
+
+    Does not commit.
+    """
+    if not rows:
+        return 0
+    max_packet = max_packet or max_allowed_packet(conn)
+    placeholder = row_placeholder(len(columns))
+    prefix = insert_prefix(table, tuple(columns))
+    # Estimate the escaped row size from a sample and keep a safety margin under the packet size
+    sample = rows[:100]
+    row_bytes = max(1, len(rows_to_tsv(sample)) // len(sample)) * 2 + 4 * len(columns)
+    chunk = max(1, int(max_packet * 0.8 - len(prefix)) // row_bytes)
+
+    cursor = conn.cursor()
+    try:
+        inserted = 0
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            params = [value for row in part for value in row]
+            cursor.execute(prefix + ', '.join([placeholder] * len(part)), params)
+            inserted += cursor.rowcount
+        return inserted
+    finally:
+        cursor.close()
+
+def executemany_insert(conn, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> int:
+    """Insert rows with cursor.executemany, the original path. Does not commit."""
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(insert_prefix(table, tuple(columns)) + row_placeholder(len(columns)), rows)
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+def bulk_load(conn, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]], mode: str = 'infile') -> int:
+    """Insert rows with the given mode ('infile', 'multirow' or 'executemany'). Does not commit.
+
+    'infile' falls back to multi-row inserts when LOAD DATA LOCAL is disabled, for good on that server.
+    """
+    if mode == 'infile' and server_key(conn) not in _infile_disabled:
+        try:
+            return load_data_infile(conn, table, columns, rows)
+        except mysql.connector.Error as e:
+            if e.errno not in LOCAL_INFILE_DISABLED:
+                raise
+            _infile_disabled.add(server_key(conn))
+            print(f"⚠️ LOAD DATA LOCAL unavailable ({e.msg}), falling back to multi-row inserts")
+    if mode == 'infile':
+        mode = 'multirow'
+    if mode == 'multirow':
+        return multirow_insert(conn, table, columns, rows)
+    return executemany_insert(conn, table, columns, rows)
+
+def secondary_indexes(conn, table: str) -> List[Dict[str, Any]]:
+    """Describe the non-primary indexes of a table, unique ones flagged."""
+    cursor = conn.cursor()
+    cursor.execute(f"SHOW INDEX FROM {table}")
+    names = [col[0] for col in cursor.description]
+    indexes: Dict[str, Dict[str, Any]] = {}
+    for row in cursor.fetchall():
+        info = dict(zip(names, row))
+        if info['Key_name'] == 'PRIMARY':
+            continue
+        index = indexes.setdefault(info['Key_name'], {'name': info['Key_name'], 'unique': not info['Non_unique'],
+                                                      'columns': []})
+        column = f"`{info['Column_name']}`" + (f"({info['Sub_part']})" if info['Sub_part'] else '')
+        index['columns'].append((info['Seq_in_index'], column))
+    cursor.close()
+    for index in indexes.values():
+        index['columns'] = [column for _, column in sorted(index['columns'])]
+    return list(indexes.values())
+
+def drop_indexes(conn, table: str, indexes: List[Dict[str, Any]]):
+    """Drop secondary indexes before a backfill."""
+    if indexes:
+        cursor = conn.cursor()
+        cursor.execute(f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX `{index['name']}`" for index in indexes))
+        cursor.close()
+
+def restore_indexes(conn, table: str, indexes: List[Dict[str, Any]]):
+    """Rebuild the secondary indexes dropped by drop_indexes, all in one ALTER TABLE.
+
+    Indexes the table still has (a drop that failed or was interrupted) are left alone.
+    """
+    existing = {index['name'] for index in secondary_indexes(conn, table)}
+    indexes = [index for index in indexes if index['name'] not in existing]
+    if indexes:
+        cursor = conn.cursor()
+        cursor.execute(f"ALTER TABLE {table} " + ', '.join(
+            f"ADD {'UNIQUE ' if index['unique'] else ''}INDEX `{index['name']}` ({', '.join(index['columns'])})"
+            for index in indexes
+        ))
+        cursor.close()
+
+@contextmanager
+def relaxed_checks(conn, unique_checks: bool = True):
+    """Skip foreign key checks on this session for the duration of a backfill, and unique checks
+    too when `unique_checks` is False (a table without unique secondary indexes)."""
+    cursor = conn.cursor()
+    cursor.execute(f"SET SESSION unique_checks = {int(unique_checks)}, SESSION foreign_key_checks = 0")
+    try:
+        yield
+    finally:
+        cursor.execute("SET SESSION unique_checks = 1, SESSION foreign_key_checks = 1")
+        cursor.close()
+
+def bulk_load_chunks(conn, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]], mode: str = 'infile',
+                     chunk_size: Optional[Callable[[], int]] = None,
+                     on_chunk: Optional[Callable[[int, float], None]] = None) -> int:
+    """bulk_load the rows in chunks of chunk_size() rows, each asked for just before it is loaded,
+    and report the (rows, seconds) of every chunk to on_chunk. Does not commit, so the chunks of a
+    batch are still committed together.
+    """
+    inserted = start = 0
+    while start < len(rows):
+        part = rows[start:start + (chunk_size() if chunk_size else len(rows))]
+        began = time.perf_counter()
+        inserted += bulk_load(conn, table, columns, part, mode)
+        if on_chunk:
+            on_chunk(len(part), time.perf_counter() - began)
+        start += len(part)
+    return inserted
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional
+
+# Statistics kept for every table, straight from information_schema.tables
+STATS_COLUMNS = ('TABLE_ROWS', 'DATA_LENGTH', 'INDEX_LENGTH', 'UPDATE_TIME', 'CREATE_TIME')
+
+def size_mb(stats: Dict[str, Any]) -> float:
+    """Data plus index size of a table in MB."""
+    return round(((stats['data_length'] or 0) + (stats['index_length'] or 0)) / 1024 / 1024, 2)
+
+class CatalogSnapshot:
+    """Size, row count and update time of every table of a schema, read with one query.
+
+    The snapshot is kept for `ttl` seconds, in memory and in an optional JSON file so
+    that separate scripts share it, then read again whole: with fresh statistics, listing
+    the changed tables costs as much as reading every table's.
+    """
+
+    def __init__(self, connection: Callable[[], ContextManager[Any]], schema: str, ttl: float = 300.0,
+                 path: Optional[str] = None):
+        self.connection = connection
+        self.schema = schema
+        self.ttl = ttl
+        self.path = path
+        self.lock = threading.Lock()
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.taken_at = 0.0
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('schema') == self.schema:
+            self.tables = cached['tables']
+            self.taken_at = cached['taken_at']
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'schema': self.schema, 'taken_at': self.taken_at, 'tables': self.tables}, f, default=str)
+        os.replace(tmp_path, self.path)
+
+    def _query(self, query: str, params: Iterable[Any]) -> List[tuple]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                try:
+                    # MySQL 8 otherwise serves statistics cached for up to a day
+                    cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+                except Exception:
+                    pass
+                cursor.execute(query, tuple(params))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def _read_stats(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._query(f"""
+            SELECT TABLE_NAME, {', '.join(STATS_COLUMNS)}
+            FROM information_schema.tables
+            WHERE TABLE_SCHEMA = %s""", (self.schema,))
+        stats = {}
+        for name, table_rows, data_length, index_length, update_time, create_time in rows:
+            entry = {
+                'rows': table_rows, 'data_length': data_length, 'index_length': index_length,
+                'update_time': str(update_time) if update_time else None,
+                'create_time': str(create_time) if create_time else None,
+            }
+            entry['size_mb'] = size_mb(entry)
+            stats[name] = entry
+        return stats
+
+    def refresh(self) -> int:
+        """Read the statistics of every table again, return how many were read."""
+        with self.lock:
+            self.tables = self._read_stats()
+            self.taken_at = time.time()
+            self._save()
+            return len(self.tables)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics of every table, refreshed first if older than the TTL."""
+        if time.time() - self.taken_at >= self.ttl:
+            print(f"🔄 Catalog of {self.schema}: {self.refresh()} tables read")
+        return self.tables
+
+    def sizes(self) -> Dict[str, float]:
+        """Size in MB of every table."""
+        return {name: stats['size_mb'] for name, stats in self.snapshot().items()}
@@ -1,7 +1,6 @@
 import os
 from dotenv import load_dotenv
-import re
-from typing import Dict, Pattern
+from typing import Dict, Tuple
 
 # Load environment variables
 load_dotenv()
@@ -43,13 +42,6 @@ DESTINATION_CONFIG = {
 KAFKA_BROKER: str = os.getenv("KAFKA_BROKER")
 KAFKA_TOPIC: str = os.getenv("KAFKA_TOPIC")
 
-# Data patterns
-patterns: Dict[str, Pattern] = {
-    '5min': re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]5_S\d+_A\d{4}$'),
-    '15min': re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]15_S\d+_A\d{4}$'),
-    'mgw': re.compile(r'^([A-Za-z0-9]+)MGW_S\d+_A\d{4}$')
-}
-
 # The year to start extracting data
 start_year: int = 2024
 
@@ -58,4 +50,69 @@ files_paths: Dict[str, str] = {
     '5min': './data/our_data/result_5min.txt',
     '15min': './data/our_data/result_15min.txt',
     'mgw': './data/our_data/result_mgw.txt'
-}
\ No newline at end of file
+}
+
+# Rows per fetch and per insert, tuned per table from the batches already done (starting at batch_size) so that
+# a batch takes about batch_target_seconds and weighs at most batch_max_bytes; saved to batch_sizes_path
+batch_size: int = int(os.getenv("BATCH_SIZE", 5000))
+batch_target_seconds: float = float(os.getenv("BATCH_TARGET_SECONDS", 1.0))
+batch_max_bytes: int = int(os.getenv("BATCH_MAX_BYTES", 8 * 1024 * 1024))
+batch_min_rows: int = int(os.getenv("BATCH_MIN_ROWS", 100))
+batch_max_rows: int = int(os.getenv("BATCH_MAX_ROWS", 200000))
+batch_sizes_path: str = './data/our_data/batch_sizes.json'
+
+# Pagination used when reading table data: 'keyset' seeks on an indexed key, 'offset' uses LIMIT/OFFSET
+pagination_mode: str = os.getenv("PAGINATION_MODE", "keyset")
+keyset_columns: Tuple[str, ...] = ('time', 'id_indicateur')
+
+# Path to store the progress made on each table, so an interrupted run can resume
+progress_path: str = './data/our_data/progress.json'
+
+# Parallel extraction: number of workers and table sizes used to start the largest tables first
+max_workers: int = int(os.getenv("MAX_WORKERS", 4))
+table_sizes_path: str = './data/our_data/tables.csv'
+
+# Largest tables are split into up to split_parts time ranges of at least split_min_rows rows each,
+# read and loaded concurrently (split_parts <= 1 reads every table with a single query)
+split_parts: int = int(os.getenv("SPLIT_PARTS", 4))
+split_min_rows: int = int(os.getenv("SPLIT_MIN_ROWS", 2000000))
+# Split tables copied at the same time, the other workers wait for one to finish before starting theirs
+concurrent_splits: int = max(1, min(int(os.getenv("CONCURRENT_SPLITS", max_workers)), max_workers))
+
+# Connections kept open per database: each worker holds one and may take a second one meanwhile (planning
+# its ranges), every split table in flight reads and loads its ranges on one each, plus the orchestrator's
+# and the one the indicator tables are read on (refreshes hold the dimension cache's lock, one at a time);
+# MYSQL_POOL_SIZE sizes the pools of db_utils instead
+pool_size: int = int(os.getenv("PROJ_POOL_SIZE", max_workers * 2 + concurrent_splits * max(split_parts, 1) + 2))
+
+# Port of the Prometheus metrics endpoint
+metrics_port: int = int(os.getenv("METRICS_PORT", 8000))
+
+# How batches are inserted: 'infile' (LOAD DATA LOCAL INFILE), 'multirow' or 'executemany'
+load_mode: str = os.getenv("LOAD_MODE", "infile")
+
+# Drop secondary indexes of a table while it is backfilled and rebuild them at the end
+defer_indexes: bool = os.getenv("DEFER_INDEXES", "false").lower() == "true"
+
+# Pipelined copy: batches fetched ahead of the loader (0 copies batch by batch)
+pipeline_queue_size: int = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+
+# Indicator names joined to the fact rows in memory: read from the source "database" or from the CSV "snapshot"s
+indicators_source: str = os.getenv("INDICATORS_SOURCE", "database")
+indicators_path = './data/indicators'
+indicators_refresh_seconds: int = int(os.getenv("INDICATORS_REFRESH_SECONDS", 300))
+indicator_column = 'id_indicateur'
+
+# Seconds the server waits for a streaming read to be consumed (backpressure can pause it)
+stream_write_timeout: int = int(os.getenv("STREAM_NET_WRITE_TIMEOUT", 600))
+
+# Hourly and daily min/max/sum/count per indicator, updated with every loaded batch of these families
+# (none by default, e.g. "5min,15min,mgw")
+rollup_families: list = [family for family in os.getenv("ROLLUP_FAMILIES", "").split(",") if family]
+time_column = 'time'
+value_column = 'value'
+
+# Destination columns read once per table and re-read after schema_ttl seconds; source columns matched
+# to them by 'name', or by 'position' for legacy destinations whose column names differ
+schema_ttl: int = int(os.getenv("SCHEMA_TTL", 300))
+schema_match: str = os.getenv("SCHEMA_MATCH", "name")
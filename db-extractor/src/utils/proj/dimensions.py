@@ -0,0 +1,164 @@
+import os
+import csv
+import time
+import threading
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+try:
+    from .table_catalog import base_name
+except ImportError:
+    from table_catalog import base_name
+
+# Columns of the indicateur_<base> tables, in the order they are appended to the fact rows
+DIMENSION_COLUMNS = ('id', 'nom_indicateur', 'type')
+MISSING = (None,) * len(DIMENSION_COLUMNS)
+
+def dimension_table(table: str) -> str:
+    """Name of the indicator table of a fact table, its name without the _SXX_AXXXX suffix."""
+    return f"indicateur_{base_name(table)}"
+
+class Dimension:
+    """Rows of an indicator table in an array indexed by id."""
+
+    def __init__(self, rows: Sequence[tuple], signature: Any = None):
+        self.signature = signature
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        size = int(ids.max()) + 1 if len(ids) else 0
+        self.rows = np.empty(size, dtype=object)
+        for id_, row in zip(ids, rows):
+            self.rows[id_] = tuple(row)
+        self.known = np.zeros(size, dtype=bool)
+        self.known[ids] = True
+        self._ids_by_name: Optional[Dict[str, int]] = None
+        self._flags: Dict[Tuple[frozenset, frozenset], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(self.known.sum())
+
+    def lookup(self, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the rows of the given ids and a mask of the ids that were found."""
+        found = np.zeros(len(ids), dtype=bool)
+        inside = (ids >= 0) & (ids < len(self.rows))
+        found[inside] = self.known[ids[inside]]
+        if not len(self.rows):
+            return np.full(len(ids), None, dtype=object), found
+        return self.rows[np.where(found, ids, 0)], found
+
+    def flags(self, types: frozenset, names: frozenset = frozenset()) -> np.ndarray:
+        """Booleans indexed by id, True for the indicators whose type is in `types` or whose
+        name, up to its first dot, is in `names`."""
+        if (types, names) not in self._flags:
+            self._flags[types, names] = np.array([
+                bool(known) and (row[2] in types or str(row[1]).split('.', 1)[0] in names)
+                for row, known in zip(self.rows, self.known)
+            ], dtype=bool)
+        return self._flags[types, names]
+
+    def ids_of(self, names: Iterable[str]) -> List[int]:
+        """Ids of the given indicator names, skipping the unknown ones."""
+        if self._ids_by_name is None:
+            self._ids_by_name = {row[1]: row[0] for row in self.rows[self.known]}
+        return [self._ids_by_name[name] for name in names if name in self._ids_by_name]
+
+class DatabaseDimensions:
+    """Read indicator tables from the source database."""
+
+    def __init__(self, connection: Callable[[], ContextManager[Any]]):
+        self.connection = connection
+
+    def _query(self, query: str) -> List[tuple]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def signature(self, table: str) -> Any:
+        # Indicators are only ever added, so the count and the last id tell when a table changed
+        return tuple(self._query(f"SELECT COUNT(*), MAX(id) FROM {table}")[0])
+
+    def rows(self, table: str) -> List[tuple]:
+        return self._query(f"SELECT {', '.join(DIMENSION_COLUMNS)} FROM {table}")
+
+class SnapshotDimensions:
+    """Read indicator tables from their CSV snapshots (data/indicators/indicateur_*.csv)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, table: str) -> str:
+        return os.path.join(self.directory, f"{table}.csv")
+
+    def signature(self, table: str) -> Any:
+        stat = os.stat(self.path(table))
+        return stat.st_mtime_ns, stat.st_size
+
+    def rows(self, table: str) -> List[tuple]:
+        with open(self.path(table), 'r', newline='') as f:
+            return [(int(row[0]), row[1], None if row[2] == 'NULL' else row[2])
+                    for row in csv.reader(f) if len(row) == 3]
+
+class DimensionCache:
+    """Indicator tables loaded once per base name and joined to fact rows in memory.
+
+    A table is reloaded when its signature changed, checked at most every `refresh_seconds`,
+    or as soon as a batch refers to an id it does not know yet.
+    """
+
+    def __init__(self, source, refresh_seconds: float = 300.0):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.tables: Dict[str, Dimension] = {}
+        self.checked: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def get(self, table: str, force: bool = False) -> Dimension:
+        """Return the dimension of a fact table, loading or refreshing it when needed."""
+        name = dimension_table(table)
+        with self.lock:
+            dimension = self.tables.get(name)
+            now = time.monotonic()
+            if dimension is not None and not force and now - self.checked[name] < self.refresh_seconds:
+                return dimension
+            signature = self.source.signature(name)
+            if dimension is None or signature != dimension.signature:
+                dimension = Dimension(self.source.rows(name), signature)
+                self.tables[name] = dimension
+                print(f"🔄 Loaded {len(dimension)} indicators from {name}")
+            self.checked[name] = now
+            return dimension
+
+    def enrich(self, table: str, rows: Sequence[tuple], id_position: int) -> List[tuple]:
+        """Append the indicator columns to each row, None for indicators still unknown after a refresh."""
+        if not rows:
+            return []
+        ids = np.fromiter((-1 if row[id_position] is None else row[id_position] for row in rows),
+                          dtype=np.int64, count=len(rows))
+        extra, found = self.get(table).lookup(ids)
+        if not found.all():
+            extra, found = self.get(table, force=True).lookup(ids)
+        if not found.all():
+            # Kept rather than dropped: an empty batch would end the extraction of the table
+            print(f"⚠️ {int((~found).sum())} rows of {table} refer to unknown indicators")
+            for i in np.flatnonzero(~found):
+                extra[i] = MISSING
+        return [row + dim for row, dim in zip(rows, extra)]
+
+_caches: Dict[Any, DimensionCache] = {}
+_caches_lock = threading.Lock()
+
+def _shared_cache(key: Any, make_source: Callable[[], Any], refresh_seconds: float) -> DimensionCache:
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = DimensionCache(make_source(), refresh_seconds)
+        return _caches[key]
+
+def database_cache(pool, refresh_seconds: float = 300.0) -> DimensionCache:
+    """Cache over the indicator tables of a pooled database, shared by every worker using that pool."""
+    return _shared_cache(('database', id(pool)), lambda: DatabaseDimensions(pool.connection), refresh_seconds)
+
+def snapshot_cache(directory: str, refresh_seconds: float = 300.0) -> DimensionCache:
+    """Cache over the CSV snapshots of a directory."""
+    return _shared_cache(('snapshot', directory), lambda: SnapshotDimensions(directory), refresh_seconds)
@@ -1,12 +1,30 @@
-from tools import connect_database, process_tables_names, store_txt, extract_table_data
-from config import patterns, start_year
+import time
+from pool import get_pool
+from metrics import observe_fetch, set_table_lag
+from dimensions import DIMENSION_COLUMNS, database_cache, snapshot_cache
+from range_split import RangeReader, plan_ranges
+from tools import (
+    batch_sizes, connect_database, process_tables_names, store_txt, extract_table_data, extract_table_data_keyset,
+    stream_table_data_keyset
+)
+from config import (
+    start_year, pagination_mode, keyset_columns,
+    indicators_source, indicators_path, indicators_refresh_seconds, indicator_column, stream_write_timeout,
+    split_parts, split_min_rows
+)
 
 class Extractor:
     def __init__(self, config):
         self.config = config
         self.db = None
         self.cursor = None
+        self.sizes = batch_sizes()
         self.connect()
+        if indicators_source == 'snapshot':
+            self.dimensions = snapshot_cache(indicators_path, indicators_refresh_seconds)
+        else:
+            self.dimensions = database_cache(get_pool(config), indicators_refresh_seconds)
+        self.columns = {}  # Column names of the rows last returned for each table, indicator columns included
 
     def connect(self):
         """Connect to the database."""
@@ -17,13 +35,32 @@ class Extractor:
             print(f"❌ Failed to connect to the database: {e}")
             raise
 
+    def ensure_connection(self):
+        """Reconnect if the server dropped the connection since the last batch."""
+        if get_pool(self.config).ensure(self.db):
+            self.cursor = self.db.cursor()
+
+    def close(self):
+        """Give the connection back to the pool."""
+        self.cursor.close()
+        get_pool(self.config).release(self.db)
+
+    def fetch_size(self, table_name):
+        """Function giving the rows of the next batch read from a table, for streaming reads."""
+        return lambda: self.sizes.size(table_name, 'fetch')
+
+    def observe_fetch(self, table_name, data, seconds):
+        """Record a fetched batch and tune the next ones from its latency and row size."""
+        nbytes = observe_fetch(table_name, data, seconds)
+        self.sizes.observe(table_name, 'fetch', len(data) if data else 0, seconds, nbytes)
+
     def extract_tables_names(self):
         """Extract all table names from the database and store them in a file."""
         try:
             self.cursor.execute("SHOW TABLES")
             tables = [table[0] for table in self.cursor.fetchall()]  # Extract table names from tuples
             tables_file_path = "./data/our_tables/tables.txt"
-            store_txt(tables_file_path, tables)
+            store_txt(tables, tables_file_path)
             return tables
         except Exception as e:
             print(f"❌ Error extracting table names: {e}")
@@ -33,16 +70,105 @@ class Extractor:
         """Process table names by filtering and sorting them."""
         try:
             tables_names = self.extract_tables_names()
-            process_tables_names(tables_names, patterns, start_year)
+            process_tables_names(tables_names, start_year)
         except Exception as e:
             print(f"❌ Error processing table names: {e}")
             raise
 
-    def extract_table_data(self, table_name, offset, batch_size=5000):
-        """Extract data from a specific table in batches."""
+    def extract_table_data(self, table_name, position=None, batch_size=None, mode=pagination_mode):
+        """Extract a batch of data from a specific table.
+
+        In keyset mode `position` is the last key read (None to start from the beginning),
+        in offset mode it is the number of rows already read. Returns the batch and the next position.
+        Batches are sized for the table unless `batch_size` is given.
+        """
         try:
-            data = extract_table_data(table_name, self.cursor, offset, batch_size)
-            return data
+            self.ensure_connection()
+            batch_size = batch_size or self.sizes.size(table_name, 'fetch')
+            start = time.perf_counter()
+            if mode == 'keyset':
+                data, position = extract_table_data_keyset(table_name, self.cursor, keyset_columns, position, batch_size)
+                if data:
+                    set_table_lag(table_name, position[0])
+            else:
+                offset = position or 0
+                data = extract_table_data(table_name, self.cursor, offset, batch_size)
+                position = offset + len(data) if data else offset
+            if data:
+                columns = [col[0] for col in self.cursor.description]
+                data = self.dimensions.enrich(table_name, data, columns.index(indicator_column))
+                self.columns[table_name] = columns + list(DIMENSION_COLUMNS)
+            self.observe_fetch(table_name, data, time.perf_counter() - start)
+            return data, position
         except Exception as e:
             print(f"❌ Error extracting data from table {table_name}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def stream_table_data(self, table_name, position=None, batch_size=None, mode=pagination_mode):
+        """Yield (batch, position) pairs for a table from `position` on.
+
+        In keyset mode the rest of the table is read with a single streaming query,
+        in offset mode batch by batch with extract_table_data.
+        """
+        if mode != 'keyset':
+            while True:
+                data, position = self.extract_table_data(table_name, position, batch_size, mode)
+                if not data:
+                    return
+                yield data, position
+
+        try:
+            self.ensure_connection()
+            batches = stream_table_data_keyset(table_name, self.db, keyset_columns, position,
+                                               batch_size or self.fetch_size(table_name), stream_write_timeout)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    batch = next(batches, None)
+                    if batch is None:
+                        return
+                    data, position, columns = batch
+                    data = self.dimensions.enrich(table_name, data, columns.index(indicator_column))
+                    self.columns[table_name] = columns + list(DIMENSION_COLUMNS)
+                    self.observe_fetch(table_name, data, time.perf_counter() - start)
+                    set_table_lag(table_name, position[0])
+                    yield data, position
+            finally:
+                batches.close()  # Frees the connection if the consumer stopped early
+        except Exception as e:
+            print(f"❌ Error streaming data from table {table_name}: {e}")
+            raise
+
+    def plan_ranges(self, table_name, parts=split_parts, min_rows=split_min_rows):
+        """Split a table into time ranges to read concurrently, a single range for the smaller ones."""
+        if parts <= 1:
+            return [(None, None)]
+        with get_pool(self.config).connection() as conn:
+            return plan_ranges(conn, table_name, keyset_columns[0], min_rows, parts)
+
+    def _enriched(self, table_name, batches):
+        start = time.perf_counter()
+        for item in batches:
+            *head, data, key, columns = item
+            data = self.dimensions.enrich(table_name, data, columns.index(indicator_column))
+            self.columns[table_name] = columns + list(DIMENSION_COLUMNS)
+            self.observe_fetch(table_name, data, time.perf_counter() - start)
+            yield (*head, data, key)
+            start = time.perf_counter()
+
+    def stream_range(self, table_name, key_range, last_key=None, batch_size=None):
+        """Yield (batch, key) pairs of one range of a table, read on a connection of its own.
+
+        Safe to run in several threads at once, one per range.
+        """
+        reader = RangeReader(get_pool(self.config).connection, table_name, keyset_columns,
+                             batch_size or self.fetch_size(table_name),
+                             net_write_timeout=stream_write_timeout)
+        yield from self._enriched(table_name, reader.read(key_range, last_key))
+
+    def stream_ranges(self, table_name, ranges, keys=None, batch_size=None):
+        """Yield (range index, batch, key) for every range, read concurrently but in key order."""
+        reader = RangeReader(get_pool(self.config).connection, table_name, keyset_columns,
+                             batch_size or self.fetch_size(table_name),
+                             net_write_timeout=stream_write_timeout)
+        yield from self._enriched(table_name, reader.stream(ranges, keys))
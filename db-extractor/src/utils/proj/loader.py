@@ -1,25 +1,74 @@
-from tools import connect_database, load_batch_into_database
+import time
+from contextlib import contextmanager
+from pool import get_pool
+from bulk_loader import secondary_indexes, drop_indexes, restore_indexes, relaxed_checks
+from metrics import observe_insert
+from tools import batch_sizes, connect_database, load_batch_into_database
+from rollups import create_rollup_tables
+from config import rollup_families
 
 class Loader:
     def __init__(self, config):
         self.config = config
         self.db = None
         self.cursor = None
+        self.sizes = batch_sizes()
         self.connect()
 
     def connect(self):
         """Connect to the database."""
         try:
-            self.db = connect_database(self.config)
+            self.db = connect_database(self.config, allow_local_infile=True)
             self.cursor = self.db.cursor()
+            if rollup_families:
+                create_rollup_tables(self.db)
         except Exception as e:
             print(f"❌ Failed to connect to the database: {e}")
             raise
 
-    def load_batch_into_database(self, table_name, data):
-        """Load a batch of data into the database."""
+    def ensure_connection(self):
+        """Reconnect if the server dropped the connection since the last batch."""
+        if get_pool(self.config, allow_local_infile=True).ensure(self.db):
+            self.cursor = self.db.cursor()
+
+    def close(self):
+        """Give the connection back to the pool."""
+        self.cursor.close()
+        get_pool(self.config, allow_local_infile=True).release(self.db)
+
+    @contextmanager
+    def backfill(self, table_name, dropped_indexes=None, on_drop=None):
+        """Load a table with its non-unique secondary indexes dropped and foreign key checks off.
+
+        Unique indexes are kept and checked, so duplicate keys fail the load as they would
+        otherwise. `dropped_indexes` are the definitions left by an interrupted backfill;
+        otherwise the current indexes are passed to `on_drop` (to be persisted) and dropped.
+        They are rebuilt when the block completes, the ones a failed drop left in place skipped.
+        """
+        indexes = dropped_indexes
+        if indexes is None:
+            indexes = [index for index in secondary_indexes(self.db, table_name) if not index['unique']]
+            if on_drop:
+                on_drop(indexes)
+            drop_indexes(self.db, table_name, indexes)
+        unique = any(index['unique'] for index in secondary_indexes(self.db, table_name))
+        with relaxed_checks(self.db, unique_checks=unique):
+            yield
+        print(f"🔄 Rebuilding {len(indexes)} indexes of {table_name}")
+        restore_indexes(self.db, table_name, indexes)
+
+    def load_batch_into_database(self, table_name, data, columns=None):
+        """Load a batch of data into the database, `columns` naming the values of its rows.
+
+        The batch is inserted in chunks sized for the table, committed together.
+        """
         try:
-            load_batch_into_database(data, self.db, table_name)
+            self.ensure_connection()
+            start = time.perf_counter()
+            load_batch_into_database(data, self.db, table_name, columns,
+                                     chunk_size=lambda: self.sizes.size(table_name, 'insert'),
+                                     on_chunk=lambda rows, seconds: self.sizes.observe(table_name, 'insert', rows, seconds))
+            observe_insert(table_name, len(data), time.perf_counter() - start)
         except Exception as e:
             print(f"❌ Error loading batch into table {table_name}: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Sequence
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+try:
+    from .table_catalog import table_family  # Imported as utils.proj.metrics
+except ImportError:
+    from table_catalog import table_family  # Imported from the proj directory
+
+# Latency buckets for a batch round trip, from a few ms to a minute
+BATCH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+ROWS_EXTRACTED = Counter("extractor_rows_extracted_total", "Rows read from the source", ["family"])
+BYTES_EXTRACTED = Counter("extractor_bytes_extracted_total", "Approximate bytes read from the source", ["family"])
+ROWS_LOADED = Counter("extractor_rows_loaded_total", "Rows inserted into the destination", ["family"])
+FETCH_SECONDS = Histogram("extractor_fetch_seconds", "Time to fetch one batch", ["family"], buckets=BATCH_BUCKETS)
+INSERT_SECONDS = Histogram("extractor_insert_seconds", "Time to insert one batch", ["family"], buckets=BATCH_BUCKETS)
+KAFKA_SEND_SECONDS = Histogram("extractor_kafka_send_seconds", "Time to publish and flush one batch",
+                               ["family"], buckets=BATCH_BUCKETS)
+KAFKA_ERRORS = Counter("extractor_kafka_errors_total", "Messages the broker failed to acknowledge", ["family"])
+TABLE_LAG = Gauge("extractor_table_lag_seconds", "Time between now and the last extracted row", ["table"])
+CYCLE_SECONDS = Gauge("extractor_poll_cycle_seconds", "Duration of the last full poll cycle")
+STAGE_SECONDS = Counter("extractor_stage_seconds_total", "Time pipeline stages spent working (busy), "
+                        "waiting for input (starved) or on a full queue (blocked)", ["stage", "state"])
+STAGE_UTILIZATION = Gauge("extractor_stage_utilization", "Busy share of the last pipeline run per stage", ["stage"])
+BATCH_ROWS = Gauge("extractor_batch_rows", "Rows of the next fetch or insert batch chosen for a table",
+                   ["table", "operation"])
+ROW_BYTES = Gauge("extractor_row_bytes", "Smoothed approximate size of a row of a table", ["table"])
+
+# Rows of a batch whose size is measured, the rest is extrapolated from them
+SIZE_SAMPLE = 100
+
+def batch_bytes(batch: Sequence[Any]) -> int:
+    """Approximate the size of a batch of tuples or dicts as the length of its values' text,
+    measured on up to SIZE_SAMPLE rows spread over the batch."""
+    if not batch:
+        return 0
+    sample = batch[::max(1, len(batch) // SIZE_SAMPLE)][:SIZE_SAMPLE]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        size += sum(len(str(value)) for value in values if value is not None)
+    return int(size * (len(batch) / len(sample)))
+
+def observe_fetch(table: str, batch, seconds: float) -> int:
+    """Record a fetched batch and return its approximate size in bytes."""
+    family = table_family(table)
+    FETCH_SECONDS.labels(family).observe(seconds)
+    if not batch:
+        return 0
+    size = batch_bytes(batch)
+    ROWS_EXTRACTED.labels(family).inc(len(batch))
+    BYTES_EXTRACTED.labels(family).inc(size)
+    return size
+
+def observe_insert(table: str, rows: int, seconds: float):
+    """Record an inserted batch."""
+    family = table_family(table)
+    INSERT_SECONDS.labels(family).observe(seconds)
+    ROWS_LOADED.labels(family).inc(rows)
+
+def set_table_lag(table: str, last_date: Any):
+    """Set the lag of a table from the timestamp of its last extracted row."""
+    if isinstance(last_date, str):
+        try:
+            last_date = datetime.fromisoformat(last_date)
+        except ValueError:
+            return
+    if isinstance(last_date, datetime):
+        TABLE_LAG.labels(table).set(max(0.0, (datetime.now() - last_date).total_seconds()))
+
+def observe_pipeline(stats: Dict[str, Dict[str, float]]):
+    """Record the per-stage statistics returned by Pipeline.run()."""
+    for stage, values in stats.items():
+        for state in ('busy', 'starved', 'blocked'):
+            STAGE_SECONDS.labels(stage, state).inc(values[state])
+        STAGE_UTILIZATION.labels(stage).set(values['utilization'])
+
+class PoolCollector:
+    """Expose the connection pool counters at scrape time."""
+
+    def __init__(self, pool_stats: Callable[[], Dict[str, Dict[str, int]]]):
+        self.pool_stats = pool_stats
+
+    def collect(self):
+        gauge = GaugeMetricFamily("extractor_pool", "Connection pool counters", labels=["pool", "stat"])
+        for name, stats in self.pool_stats().items():
+            for stat, value in stats.items():
+                gauge.add_metric([name, stat], value)
+        yield gauge
+
+_started = False
+
+def start_metrics_server(pool_stats: Callable[[], Dict[str, Dict[str, int]]], port: int = 8000):
+    """Start the Prometheus endpoint once per process, with the counters of the given pools."""
+    global _started
+    if not _started:
+        REGISTRY.register(PoolCollector(pool_stats))
+        start_http_server(port)
+        _started = True
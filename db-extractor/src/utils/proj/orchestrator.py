@@ -1,11 +1,16 @@
 from extractor import Extractor
 from loader import Loader
-from config import SOURCE_CONFIG, DESTINATION_CONFIG
+from scheduler import ProgressStore, Scheduler, copy_table
+from pool import pool_stats
+from metrics import start_metrics_server
+from config import SOURCE_CONFIG, DESTINATION_CONFIG, progress_path, max_workers, table_sizes_path, metrics_port
 
 class Orchestrator:
     def __init__(self):
         self.extractor = Extractor(SOURCE_CONFIG)
         self.loader = Loader(DESTINATION_CONFIG)
+        self.progress = ProgressStore(progress_path)
+        start_metrics_server(pool_stats, metrics_port)
 
     def process_orchestration(self):
         """Orchestrate the extraction and loading process."""
@@ -13,13 +18,25 @@ class Orchestrator:
             self.extractor.process_tables_names()
             tables = self.extractor.extract_tables_names()
             for table in tables:
-                offset = 0
-                while True:
-                    data = self.extractor.extract_table_data(table, offset)
-                    if not data:
-                        break
-                    self.loader.load_batch_into_database(table, data)
-                    offset += len(data)
+                if self.progress.is_done(table):
+                    continue
+                copy_table(self.extractor, self.loader, table, self.progress)
+                self.progress.flush()
+                self.extractor.sizes.save()
         except Exception as e:
             print(f"❌ Error during orchestration: {e}")
+            raise
+        finally:
+            self.progress.flush()
+
+    def process_parallel(self, workers=max_workers):
+        """Orchestrate the extraction and loading process with several tables in flight."""
+        try:
+            self.extractor.process_tables_names()
+            tables = self.extractor.extract_tables_names()
+            scheduler = Scheduler(SOURCE_CONFIG, DESTINATION_CONFIG, self.progress,
+                                  max_workers=workers, sizes_path=table_sizes_path)
+            scheduler.run(tables)
+        except Exception as e:
+            print(f"❌ Error during parallel orchestration: {e}")
             raise
\ No newline at end of file
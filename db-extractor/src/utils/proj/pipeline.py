@@ -0,0 +1,134 @@
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Marks the end of the stream in a queue
+END = object()
+
+class StageStats:
+    """Time a stage spent working, waiting for input and blocked on a full output queue."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+
+    def as_dict(self, wall: float) -> Dict[str, float]:
+        return {
+            'items': self.items, 'busy': self.busy, 'starved': self.starved, 'blocked': self.blocked,
+            'utilization': self.busy / wall if wall > 0 else 0.0,
+        }
+
+class Pipeline:
+    """Run a source and a chain of stages in their own threads, linked by bounded queues.
+
+    While a stage works on a batch the previous stages already prepare the next ones,
+    up to `queue_size` batches ahead (backpressure). Items keep their order, the first
+    error stops every stage and is raised by run().
+    """
+
+    def __init__(self, source: Iterable[Any], stages: List[Tuple[str, Callable[[Any], Any]]],
+                 queue_size: int = 2, source_name: str = 'fetch'):
+        self.source = source
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = [StageStats(source_name)] + [StageStats(name) for name, _ in stages]
+        self.stop = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.wall = 0.0
+
+    def _put(self, q: queue.Queue, item: Any, stats: StageStats) -> bool:
+        start = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, stats: StageStats) -> Any:
+        start = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return END
+        finally:
+            stats.starved += time.perf_counter() - start
+
+    def _fail(self, error: BaseException):
+        if self.error is None:
+            self.error = error
+        self.stop.set()
+
+    def _run_source(self, out: queue.Queue):
+        stats = self.stats[0]
+        try:
+            iterator = iter(self.source)
+            while not self.stop.is_set():
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy += time.perf_counter() - start
+                stats.items += 1
+                if not self._put(out, item, stats):
+                    return
+            self._put(out, END, stats)
+        except BaseException as e:
+            self._fail(e)
+
+    def _run_stage(self, index: int, func: Callable[[Any], Any], inp: queue.Queue, out: Optional[queue.Queue]):
+        stats = self.stats[index + 1]
+        try:
+            while True:
+                item = self._get(inp, stats)
+                if item is END:
+                    break
+                start = time.perf_counter()
+                result = func(item)
+                stats.busy += time.perf_counter() - start
+                stats.items += 1
+                if out is not None and not self._put(out, result, stats):
+                    return
+            if out is not None:
+                self._put(out, END, stats)
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        """Run the pipeline to completion and return the per-stage statistics."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = [threading.Thread(target=self._run_source, args=(queues[0],), daemon=True)]
+        for i, (_, func) in enumerate(self.stages):
+            out = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(target=self._run_stage, args=(i, func, queues[i], out), daemon=True))
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - start
+
+        if self.error is not None:
+            raise self.error
+        return self.summary()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stats.name: stats.as_dict(self.wall) for stats in self.stats}
+
+    def bottleneck(self) -> str:
+        """Name of the busiest stage."""
+        return max(self.stats, key=lambda stats: stats.busy).name
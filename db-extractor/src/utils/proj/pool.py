@@ -0,0 +1,181 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+import mysql.connector
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available before the timeout."""
+
+class ConnectionPool:
+    """Thread-safe pool of reusable MySQL connections with health checks and reconnects.
+
+    Connections idle for more than `ping_interval` seconds are pinged before being handed
+    out, and reconnected if the server dropped them.
+    """
+
+    def __init__(self, config: Dict[str, Any], size: int = 5, timeout: float = 30.0,
+                 ping_interval: float = 30.0, **connect_options):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.connect_options = connect_options
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.counters = {'hits': 0, 'misses': 0, 'waits': 0, 'reconnects': 0, 'failures': 0}
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    def _connect(self):
+        """Open a new connection to the configured server."""
+        return mysql.connector.connect(
+            host=self.config['host'],
+            user=self.config['user'],
+            password=self.config['password'],
+            port=self.config['port'],
+            database=self.config['database'],
+            **self.connect_options
+        )
+
+    def _check(self, conn, last_used: float):
+        """Make sure a pooled connection is still alive, reconnecting it if needed."""
+        if time.monotonic() - last_used < self.ping_interval:
+            return conn
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except mysql.connector.Error:
+            self._count('reconnects')
+            try:
+                conn.reconnect(attempts=3, delay=1)
+                return conn
+            except mysql.connector.Error:
+                self._discard(conn)
+                raise
+
+    def _discard(self, conn):
+        """Drop a broken connection and free its slot."""
+        with self.lock:
+            self.created -= 1
+            self.counters['failures'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """Take a connection from the pool, opening one if the pool is not full yet."""
+        try:
+            conn, last_used = self.idle.get_nowait()
+            self._count('hits')
+            return self._check(conn, last_used)
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            self._count('misses')
+            try:
+                return self._connect()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+
+        self._count('waits')
+        try:
+            conn, last_used = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No connection available to {self.config['host']} after {self.timeout}s")
+        return self._check(conn, last_used)
+
+    def ensure(self, conn) -> bool:
+        """Ping a checked-out connection and reconnect it if it was dropped, return True if it was."""
+        try:
+            conn.ping(reconnect=False)
+            return False
+        except mysql.connector.Error:
+            self._count('reconnects')
+            conn.reconnect(attempts=3, delay=1)
+            return True
+
+    def release(self, conn, broken: bool = False):
+        """Give a connection back to the pool, or drop it if it is broken."""
+        if broken or not conn.is_connected():
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+            return
+        self.idle.put((conn, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except (mysql.connector.InterfaceError, mysql.connector.OperationalError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                conn, _ = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.created -= 1
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool counters along with the current number of open and idle connections."""
+        with self.lock:
+            return dict(self.counters, open=self.created, idle=self.idle.qsize())
+
+# Pools shared by every module of the process, one per server/user/database and connection options
+_pools: Dict[tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(config: Dict[str, Any], size: Optional[int] = None, **options) -> ConnectionPool:
+    """Return the shared pool for a connection config and options, creating it on first use.
+
+    A pool opened with fewer connections than `size` is grown to it, whichever caller came first.
+    """
+    key = (config['host'], config['port'], config['user'], config['database'], tuple(sorted(options.items())))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config, size=size or 5, **options)
+        pool = _pools[key]
+    if size:
+        with pool.lock:
+            pool.size = max(pool.size, size)
+    return pool
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Return the counters of every pool, keyed by host/database (and options, if any)."""
+    with _pools_lock:
+        return {f"{key[0]}/{key[3]}" + ''.join(f"+{name}" for name, _ in key[4]): pool.stats()
+                for key, pool in _pools.items()}
+
+def close_pools():
+    """Close the idle connections of every pool."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
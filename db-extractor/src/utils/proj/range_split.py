@@ -0,0 +1,132 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from tools import stream_table_data_keyset
+
+# Marks the end of a range's rows in its queue
+END = object()
+
+def estimated_rows(conn, table: str) -> int:
+    """Row count of a table from information_schema (an InnoDB estimate, no table scan)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT TABLE_ROWS FROM information_schema.tables
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s""", (table,))
+        row = cursor.fetchone()
+        return int(row[0] or 0) if row else 0
+    finally:
+        cursor.close()
+
+def key_bounds(conn, table: str, column: str) -> Tuple[Any, Any]:
+    """Smallest and largest value of an indexed column, read from the ends of its index."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+def split_range(low: Any, high: Any, parts: int) -> List[Tuple[Any, Optional[Any]]]:
+    """Split [low, high] into `parts` disjoint [start, end) ranges of equal width, the first and
+    last ones open-ended (None) so that rows outside [low, high] are still read.
+
+    Works on numbers and datetimes; fewer ranges come back when the span is too narrow to split.
+    """
+    if low is None or parts <= 1 or high <= low:
+        return [(None, None)]
+    bounds = [low]
+    for i in range(1, parts):
+        bound = low + (high - low) * i // parts if isinstance(low, int) else low + (high - low) / parts * i
+        if isinstance(bound, datetime):
+            bound = bound.replace(microsecond=0)
+        if bound > bounds[-1] and bound <= high:
+            bounds.append(bound)
+    return list(zip([None] + bounds[1:], bounds[1:] + [None]))
+
+def plan_ranges(conn, table: str, column: str, min_rows: int, max_parts: int) -> List[Tuple[Any, Optional[Any]]]:
+    """Ranges of `column` to read a table with: one range per `min_rows` rows, at most `max_parts`."""
+    rows = estimated_rows(conn, table)
+    parts = min(max_parts, rows // max(min_rows, 1))
+    if parts <= 1:
+        return [(None, None)]
+    low, high = key_bounds(conn, table, column)
+    return split_range(low, high, parts)
+
+class RangeReader:
+    """Read the key ranges of a table concurrently, one pooled connection each, yielding their
+    batches in range order.
+
+    Ranges are disjoint and sorted on the first key column, so concatenating them keeps the
+    table's key order, which the Kafka path needs. Each range is read ahead by up to
+    `prefetch` batches while the earlier ranges are consumed.
+    """
+
+    def __init__(self, connection: Callable[[], ContextManager[Any]], table: str, key_columns: Sequence[str],
+                 batch_size: Union[int, Callable[[], int]] = 5000, prefetch: int = 4,
+                 net_write_timeout: Optional[int] = None):
+        self.connection = connection
+        self.table = table
+        self.key_columns = key_columns
+        self.batch_size = batch_size
+        self.prefetch = prefetch
+        self.net_write_timeout = net_write_timeout
+
+    def read(self, key_range: Tuple[Any, Optional[Any]], last_key: Optional[Sequence[Any]]
+             ) -> Iterator[Tuple[List[tuple], tuple, List[str]]]:
+        """Yield (batch, key of its last row, columns) for one range from `last_key` on, on its own connection."""
+        with self.connection() as conn:
+            yield from stream_table_data_keyset(self.table, conn, self.key_columns, last_key, self.batch_size,
+                                                self.net_write_timeout, tuple(key_range))
+
+    def _fill(self, key_range, last_key, out: queue.Queue, stop: threading.Event):
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            batches = self.read(key_range, last_key)
+            try:
+                for batch in batches:
+                    if not put(batch):
+                        return
+            finally:
+                batches.close()
+            put(END)
+        except BaseException as e:
+            put(e)
+
+    def stream(self, ranges: Sequence[Tuple[Any, Optional[Any]]], keys: Optional[Sequence[Optional[tuple]]] = None,
+               max_workers: Optional[int] = None) -> Iterator[Tuple[int, List[tuple], tuple, List[str]]]:
+        """Yield (range index, batch, key, columns) for every range in order, each from its key in `keys`."""
+        keys = keys or [None] * len(ranges)
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(ranges))
+        try:
+            queues = []
+            for key_range, last_key in zip(ranges, keys):
+                out = queue.Queue(maxsize=self.prefetch)
+                executor.submit(self._fill, key_range, last_key, out, stop)
+                queues.append(out)
+            for index, out in enumerate(queues):
+                item = out.get()
+                while item is not END:
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield (index, *item)
+                    item = out.get()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def range_progress(ranges: Sequence[Tuple[Any, Optional[Any]]]) -> Dict[str, Any]:
+    """Progress entry of a split table: its ranges, the last key read in each and which are done."""
+    return {'ranges': [list(key_range) for key_range in ranges], 'keys': [None] * len(ranges),
+            'done': [False] * len(ranges)}
@@ -0,0 +1,197 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+try:
+    from .table_catalog import base_name, table_family
+except ImportError:
+    from table_catalog import base_name, table_family
+
+# Rollup tables and the NumPy unit of their buckets
+GRANULARITIES = {
+    'hour': ('rollup_hourly', 'datetime64[h]'),
+    'day': ('rollup_daily', 'datetime64[D]'),
+}
+
+ROLLUP_COLUMNS = ('base', 'indicator_id', 'bucket', 'min_value', 'max_value', 'sum_value', 'sample_count')
+
+def create_rollup_tables(conn):
+    """Create the rollup tables if they do not exist yet."""
+    cursor = conn.cursor()
+    try:
+        for table, _ in GRANULARITIES.values():
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    base VARCHAR(64) NOT NULL,
+                    indicator_id INT NOT NULL,
+                    bucket DATETIME NOT NULL,
+                    min_value DOUBLE,
+                    max_value DOUBLE,
+                    sum_value DOUBLE,
+                    sample_count BIGINT NOT NULL,
+                    PRIMARY KEY (base, bucket, indicator_id)
+                )
+            """)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def upsert_sql(table: str, dialect: str = 'mysql') -> str:
+    """Insert new buckets and merge the others: min of mins, max of maxes, sums added."""
+    values = ', '.join(['%s' if dialect == 'mysql' else '?'] * len(ROLLUP_COLUMNS))
+    insert = f"INSERT INTO {table} ({', '.join(ROLLUP_COLUMNS)}) VALUES ({values}) "
+    if dialect == 'mysql':
+        return insert + (
+            "ON DUPLICATE KEY UPDATE "
+            "min_value = LEAST(COALESCE(min_value, VALUES(min_value)), COALESCE(VALUES(min_value), min_value)), "
+            "max_value = GREATEST(COALESCE(max_value, VALUES(max_value)), COALESCE(VALUES(max_value), max_value)), "
+            "sum_value = COALESCE(sum_value, 0) + COALESCE(VALUES(sum_value), 0), "
+            "sample_count = sample_count + VALUES(sample_count)"
+        )
+    return insert + (
+        "ON CONFLICT(base, bucket, indicator_id) DO UPDATE SET "
+        "min_value = min(coalesce(min_value, excluded.min_value), coalesce(excluded.min_value, min_value)), "
+        "max_value = max(coalesce(max_value, excluded.max_value), coalesce(excluded.max_value, max_value)), "
+        "sum_value = coalesce(sum_value, 0) + coalesce(excluded.sum_value, 0), "
+        "sample_count = sample_count + excluded.sample_count"
+    )
+
+def to_float(values: Sequence[Any]) -> np.ndarray:
+    """Values as float64, NaN for NULLs (Decimal and int are converted)."""
+    return np.fromiter((np.nan if value is None else float(value) for value in values),
+                       dtype=np.float64, count=len(values))
+
+def aggregate_batch(times: Sequence[Any], indicators: Sequence[int], values: Sequence[Any],
+                    unit: str) -> List[Tuple[int, datetime, Optional[float], Optional[float], Optional[float], int]]:
+    """Group a batch by (indicator, bucket) and return (indicator, bucket, min, max, sum, count) per group.
+
+    NULL values are counted as samples but left out of min, max and sum.
+    """
+    if not len(times):
+        return []
+    buckets = np.array(times, dtype='datetime64[s]').astype(unit)
+    ids = np.asarray(indicators, dtype=np.int64)
+    vals = to_float(values)
+
+    # Sort by (indicator, bucket) then reduce every run of equal keys
+    order = np.lexsort((buckets, ids))
+    ids, buckets, vals = ids[order], buckets[order], vals[order]
+    starts = np.flatnonzero(np.r_[True, (ids[1:] != ids[:-1]) | (buckets[1:] != buckets[:-1])])
+    counts = np.diff(np.r_[starts, len(ids)])
+    present = ~np.isnan(vals)
+    with np.errstate(invalid='ignore'):
+        mins = np.fmin.reduceat(vals, starts)
+        maxs = np.fmax.reduceat(vals, starts)
+    sums = np.add.reduceat(np.where(present, vals, 0.0), starts)
+    has_values = np.add.reduceat(present.astype(np.int64), starts) > 0
+
+    bucket_times = buckets[starts].astype('datetime64[s]').astype(datetime)
+    return [
+        (int(indicator), bucket, float(low) if has else None, float(high) if has else None,
+         float(total) if has else None, int(count))
+        for indicator, bucket, low, high, total, count, has
+        in zip(ids[starts], bucket_times, mins, maxs, sums, counts, has_values)
+    ]
+
+# SQL expressions of the bucket of a time column, per granularity and dialect
+BUCKET_SQL = {
+    'mysql': {'hour': "DATE({0}) + INTERVAL HOUR({0}) HOUR", 'day': "TIMESTAMP(DATE({0}))"},
+    'sqlite': {'hour': "strftime('%Y-%m-%d %H:00:00', {0})", 'day': "strftime('%Y-%m-%d 00:00:00', {0})"},
+}
+
+def rebuild_sql(rollup_table: str, granularity: str, table: str, time_column: str, indicator_column: str,
+                value_column: str, dialect: str = 'mysql') -> str:
+    """Recompute the buckets of [start, end) from the rows of a table, replacing the stored ones."""
+    mark = '%s' if dialect == 'mysql' else '?'
+    bucket = BUCKET_SQL[dialect][granularity].format(time_column)
+    select = (f"INSERT INTO {rollup_table} ({', '.join(ROLLUP_COLUMNS)}) "
+              f"SELECT {mark}, {indicator_column}, {bucket}, MIN({value_column}), MAX({value_column}), "
+              f"SUM({value_column}), COUNT(*) FROM {table} "
+              f"WHERE {time_column} >= {mark} AND {time_column} < {mark} AND {indicator_column} IS NOT NULL "
+              f"GROUP BY {indicator_column}, {bucket} ")
+    if dialect == 'mysql':
+        return select + (
+            "ON DUPLICATE KEY UPDATE min_value = VALUES(min_value), max_value = VALUES(max_value), "
+            "sum_value = VALUES(sum_value), sample_count = VALUES(sample_count)"
+        )
+    return select + (
+        "ON CONFLICT(base, bucket, indicator_id) DO UPDATE SET min_value = excluded.min_value, "
+        "max_value = excluded.max_value, sum_value = excluded.sum_value, sample_count = excluded.sample_count"
+    )
+
+# Tables whose rows lack one of the rollup columns, warned about once
+_unrolled = set()
+
+def update_rollups(cursor, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                   time_column: str = 'time', indicator_column: str = 'id_indicateur',
+                   value_column: str = 'value', dialect: str = 'mysql', inserted: Optional[int] = None) -> int:
+    """Fold a batch of raw rows of a table into the hourly and daily rollups of its base.
+
+    Run it in the transaction that inserts the rows. Only the buckets touched by the batch
+    are written, the batch's aggregates merged into them. When the insert reports fewer rows
+    than the batch (`inserted`: an insert that skipped rows loaded before, a replayed
+    batch), the buckets spanned by the batch are recomputed from the table instead, so a
+    replay is not counted twice. Rows inserted twice (a table without a unique key) are
+    counted twice, as the table holds them. Tables without the three columns are skipped
+    with a warning. Returns the number of buckets written, or recomputed.
+    """
+    if not rows:
+        return 0
+    missing = [column for column in (time_column, indicator_column, value_column) if column not in columns]
+    if missing:
+        if table not in _unrolled:
+            _unrolled.add(table)
+            print(f"⚠️ No rollups for {table}: no column {', '.join(missing)}")
+        return 0
+    base = base_name(table)
+    if isinstance(rows[0], dict):
+        rows = [tuple(row[column] for column in columns) for row in rows]
+    t, i, v = (columns.index(column) for column in (time_column, indicator_column, value_column))
+    times = [row[t] for row in rows]
+
+    written = 0
+    if inserted is not None and 0 <= inserted < len(rows):
+        stamps = np.array(times, dtype='datetime64[s]')
+        for granularity, (rollup_table, unit) in GRANULARITIES.items():
+            start, end = stamps.min().astype(unit), stamps.max().astype(unit) + 1
+            cursor.execute(rebuild_sql(rollup_table, granularity, table, time_column, indicator_column,
+                                       value_column, dialect),
+                           (base, *(bound.astype('datetime64[s]').astype(datetime) for bound in (start, end))))
+            written += max(cursor.rowcount, 0)
+        return written
+
+    indicators = [row[i] for row in rows]
+    values = [row[v] for row in rows]
+    for rollup_table, unit in GRANULARITIES.values():
+        buckets = aggregate_batch(times, indicators, values, unit)
+        cursor.executemany(upsert_sql(rollup_table, dialect),
+                           [(base, *bucket) for bucket in buckets])
+        written += len(buckets)
+    return written
+
+def rolled_up(table: str, families: Sequence[str]) -> bool:
+    """Tell whether the rows of a table are rolled up."""
+    return table_family(table) in families
+
+def read_rollup(conn, base: str, start, end, granularity: str = 'hour',
+                indicators: Optional[Sequence[int]] = None, placeholder: str = '%s') -> List[Dict[str, Any]]:
+    """Buckets of [start, end) for a base, with min, max, sum, count and average per indicator."""
+    table, _ = GRANULARITIES[granularity]
+    query = f"""
+        SELECT indicator_id, bucket, min_value, max_value, sum_value, sample_count
+        FROM {table}
+        WHERE base = {placeholder} AND bucket >= {placeholder} AND bucket < {placeholder}"""
+    params: tuple = (base, start, end)
+    if indicators:
+        query += f" AND indicator_id IN ({', '.join([placeholder] * len(indicators))})"
+        params += tuple(indicators)
+    query += " ORDER BY bucket, indicator_id"
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return [
+            {'indicator_id': indicator, 'bucket': bucket, 'min': low, 'max': high, 'sum': total,
+             'count': count, 'avg': total / count if total is not None and count else None}
+            for indicator, bucket, low, high, total, count in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
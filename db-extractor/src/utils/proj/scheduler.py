@@ -0,0 +1,221 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+from extractor import Extractor
+from loader import Loader
+from tools import batch_sizes, load_json, store_json, load_table_sizes
+from pipeline import Pipeline
+from range_split import range_progress
+from metrics import observe_pipeline
+from config import defer_indexes, pipeline_queue_size, concurrent_splits as default_concurrent_splits
+
+class ProgressStore:
+    """Per-table extraction progress persisted to a JSON file.
+
+    Positions are saved at most every `save_seconds`, finished tables and dropped indexes
+    right away; flush() saves what is left.
+    """
+
+    def __init__(self, path: str, save_seconds: float = 5.0):
+        self.path = path
+        self.save_seconds = save_seconds
+        self.lock = threading.Lock()
+        self.progress: Dict[str, Dict[str, Any]] = load_json(path) if os.path.exists(path) else {}
+        self.saved_at = time.monotonic()
+        self.dirty = False
+
+    def position(self, table: str) -> Optional[Any]:
+        """Return the last position saved for a table, None if it was never started."""
+        with self.lock:
+            return self.progress.get(table, {}).get('position')
+
+    def is_done(self, table: str) -> bool:
+        """Tell whether a table was fully extracted by a previous run."""
+        with self.lock:
+            return self.progress.get(table, {}).get('done', False)
+
+    def _save(self, now: bool = False):
+        # Called with the lock held
+        self.dirty = True
+        if now or time.monotonic() - self.saved_at >= self.save_seconds:
+            store_json(self.progress, self.path)
+            self.saved_at = time.monotonic()
+            self.dirty = False
+
+    def flush(self):
+        """Save the positions recorded since the last save."""
+        with self.lock:
+            if self.dirty:
+                self._save(now=True)
+
+    def update(self, table: str, position: Any, done: bool = False):
+        """Record the position reached in a table, saved with the next save of the progress file."""
+        with self.lock:
+            self.progress.setdefault(table, {}).update(position=position, done=done)
+            self._save(now=done)
+
+    def mark_done(self, table: str):
+        """Mark a table as fully extracted."""
+        self.update(table, self.position(table), done=True)
+
+    def indexes(self, table: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the index definitions dropped for a table's backfill and not rebuilt yet."""
+        with self.lock:
+            return self.progress.get(table, {}).get('dropped_indexes')
+
+    def set_indexes(self, table: str, indexes: Optional[List[Dict[str, Any]]]):
+        """Remember the indexes dropped for a table's backfill, None once they are rebuilt."""
+        with self.lock:
+            self.progress.setdefault(table, {})['dropped_indexes'] = indexes
+            self._save(now=True)
+
+def is_split(position: Any) -> bool:
+    """Tell whether a saved position is the one of a range-split copy."""
+    return isinstance(position, dict) and 'ranges' in position
+
+def backfill(loader, table: str, progress: ProgressStore, copy: Callable[[], None]):
+    """Run copy() with the secondary indexes of the table deferred if configured, then mark it done."""
+    if not defer_indexes:
+        copy()
+    else:
+        with loader.backfill(table, progress.indexes(table), lambda indexes: progress.set_indexes(table, indexes)):
+            copy()
+        progress.set_indexes(table, None)
+    progress.mark_done(table)
+
+def copy_table(extractor, loader, table: str, progress: ProgressStore) -> int:
+    """Extract and load a single table from its saved position, return the number of rows loaded."""
+    def batches():
+        return extractor.stream_table_data(table, progress.position(table))
+
+    rows = 0
+
+    def load(batch):
+        nonlocal rows
+        data, position = batch
+        loader.load_batch_into_database(table, data, extractor.columns.get(table))
+        progress.update(table, position)
+        rows += len(data)
+
+    def copy():
+        if pipeline_queue_size <= 0:
+            for batch in batches():
+                load(batch)
+        else:
+            # The next batches are fetched while the current one is inserted
+            observe_pipeline(Pipeline(batches(), [('load', load)], pipeline_queue_size).run())
+
+    backfill(loader, table, progress, copy)
+    return rows
+
+def copy_table_split(extractor, loader, table: str, progress: ProgressStore, open_loader: Callable[[], Any]) -> int:
+    """Extract and load the time ranges of a table concurrently, each with its own source and destination
+    connections (`open_loader` opens the latter), return the number of rows loaded.
+
+    The progress of the table holds the ranges and the last key loaded in each, so an
+    interrupted copy resumes every range where it stopped.
+    """
+    state = progress.position(table)
+    lock = threading.Lock()
+    rows = 0
+
+    def copy_range(i):
+        nonlocal rows
+        range_loader = open_loader()
+        try:
+            for data, key in extractor.stream_range(table, tuple(state['ranges'][i]), state['keys'][i]):
+                range_loader.load_batch_into_database(table, data, extractor.columns.get(table))
+                with lock:
+                    state['keys'][i] = key
+                    rows += len(data)
+                    progress.update(table, state)
+            with lock:
+                state['done'][i] = True
+                progress.update(table, state)
+        finally:
+            range_loader.close()
+
+    def copy():
+        pending = [i for i, done in enumerate(state['done']) if not done]
+        print(f"🔄 {table}: reading {len(pending)} of {len(state['ranges'])} ranges concurrently")
+        with ThreadPoolExecutor(max_workers=max(len(pending), 1)) as executor:
+            for future in [executor.submit(copy_range, i) for i in pending]:
+                future.result()
+
+    backfill(loader, table, progress, copy)
+    return rows
+
+class Scheduler:
+    """Extract and load tables concurrently, each worker with its own connections.
+
+    At most `concurrent_splits` split tables are copied at once, so that the ranges of every
+    worker never need more connections than the pools hold (config.pool_size).
+    """
+
+    def __init__(self, source_config, destination_config, progress: ProgressStore,
+                 max_workers: int = 4, sizes_path: Optional[str] = None,
+                 concurrent_splits: int = default_concurrent_splits):
+        self.source_config = source_config
+        self.destination_config = destination_config
+        self.progress = progress
+        self.max_workers = max_workers
+        self.splits = threading.BoundedSemaphore(max(concurrent_splits, 1))
+        self.table_sizes = load_table_sizes(sizes_path) if sizes_path and os.path.exists(sizes_path) else {}
+        self.local = threading.local()
+        self.workers = []
+
+    def order_tables(self, tables: List[str]) -> List[str]:
+        """Sort tables largest first so the biggest ones do not finish last."""
+        return sorted(tables, key=lambda table: self.table_sizes.get(table, 0), reverse=True)
+
+    def worker_connections(self):
+        """Return the extractor and loader owned by the current worker thread."""
+        if not hasattr(self.local, 'extractor'):
+            self.local.extractor = Extractor(self.source_config)
+            self.local.loader = Loader(self.destination_config)
+            self.workers.append((self.local.extractor, self.local.loader))
+        return self.local.extractor, self.local.loader
+
+    def process_table(self, table: str) -> int:
+        """Extract and load a single table with the current worker's connections.
+
+        A table not started yet and large enough is split into ranges copied concurrently,
+        once one of the split slots is free.
+        """
+        extractor, loader = self.worker_connections()
+        if self.progress.position(table) is None:
+            ranges = extractor.plan_ranges(table)
+            if len(ranges) > 1:
+                self.progress.update(table, range_progress(ranges))
+        if is_split(self.progress.position(table)):
+            with self.splits:
+                return copy_table_split(extractor, loader, table, self.progress,
+                                        lambda: Loader(self.destination_config))
+        return copy_table(extractor, loader, table, self.progress)
+
+    def run(self, tables: List[str]):
+        """Process all pending tables with a pool of workers."""
+        pending = [table for table in self.order_tables(tables) if not self.progress.is_done(table)]
+        print(f"🔄 {len(pending)} tables to process with {self.max_workers} workers "
+              f"({len(tables) - len(pending)} already done)")
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.process_table, table): table for table in pending}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    rows = future.result()
+                    print(f"✅ {table}: {rows} rows loaded")
+                except Exception as e:
+                    print(f"❌ Error processing table {table}: {e}")
+                    failed.append(table)
+                self.progress.flush()
+                batch_sizes().save()
+        for extractor, loader in self.workers:
+            extractor.close()
+            loader.close()
+        self.workers.clear()
+        if failed:
+            raise RuntimeError(f"{len(failed)} tables failed: {', '.join(failed)}")
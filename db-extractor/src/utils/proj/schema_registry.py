@@ -0,0 +1,175 @@
+import time
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+class SchemaMismatch(Exception):
+    """Raised when source rows cannot be aligned with the columns of their destination table."""
+
+class ColumnInfo(NamedTuple):
+    name: str
+    data_type: str  # MySQL DATA_TYPE, lower case (int, double, datetime, varchar...)
+    nullable: bool
+    has_default: bool  # DEFAULT value or auto_increment: the column may be left out of an INSERT
+
+# Kinds of values each MySQL type accepts without silent conversion
+NUMERIC_TYPES = {'tinyint', 'smallint', 'mediumint', 'int', 'integer', 'bigint', 'decimal', 'numeric',
+                 'float', 'double', 'real', 'bit', 'year', 'bool', 'boolean'}
+TEMPORAL_TYPES = {'date', 'datetime', 'timestamp', 'time'}
+
+# Server errors after which the cached schema of a table can no longer be trusted:
+# unknown column, column count mismatch, unknown table, incorrect value for a column
+SCHEMA_ERRORS = {1054, 1136, 1146, 1366}
+
+def information_schema_columns(conn, table: str) -> List[ColumnInfo]:
+    """Columns of a table of the connection's database, in table order."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_DEFAULT, EXTRA
+            FROM information_schema.columns
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION""", (table,))
+        return [
+            ColumnInfo(name, data_type.lower(), nullable == 'YES',
+                       default is not None or nullable == 'YES' or 'auto_increment' in (extra or '').lower())
+            for name, data_type, nullable, default, extra in cursor.fetchall()
+        ]
+    finally:
+        cursor.close()
+
+def accepts(data_type: str, value: Any) -> bool:
+    """Tell whether a column of this type stores the value as it is."""
+    if value is None:
+        return True
+    if data_type in NUMERIC_TYPES:
+        if isinstance(value, (int, float, Decimal)):
+            return True
+        if isinstance(value, str):
+            try:
+                float(value)
+                return True
+            except ValueError:
+                return False
+        return False
+    if data_type in TEMPORAL_TYPES:
+        return isinstance(value, (datetime, date, timedelta, str))
+    return True
+
+class InsertPlan:
+    """Destination columns of a table and where to find each of them in the source rows."""
+
+    def __init__(self, table: str, columns: Sequence[ColumnInfo], positions: Sequence[int], source_width: int):
+        self.table = table
+        self.columns = tuple(column.name for column in columns)
+        self.types = [column.data_type for column in columns]
+        self.positions = list(positions)
+        self.source_width = source_width
+        self.identity = self.positions == list(range(source_width))
+        self._get = itemgetter(*self.positions) if len(self.positions) > 1 else None
+
+    def check(self, row: Sequence[Any]):
+        """Fail if a source row does not fit the destination columns it is mapped to."""
+        if len(row) != self.source_width:
+            raise SchemaMismatch(f"{self.table}: rows have {len(row)} values, the plan expects {self.source_width}")
+        for name, data_type, position in zip(self.columns, self.types, self.positions):
+            if not accepts(data_type, row[position]):
+                raise SchemaMismatch(f"{self.table}.{name} ({data_type}) cannot store "
+                                     f"{type(row[position]).__name__} value {row[position]!r}")
+
+    def align(self, rows: Sequence[Sequence[Any]]) -> Sequence[Sequence[Any]]:
+        """Rows reordered to the destination columns, checked on their first row."""
+        if not rows:
+            return rows
+        self.check(rows[0])
+        if self.identity:
+            return rows
+        if self._get is None:
+            return [(row[self.positions[0]],) for row in rows]
+        return [self._get(row) for row in rows]
+
+class SchemaRegistry:
+    """Destination table schemas read once, and insert plans cached per (table, source columns).
+
+    Source columns are matched to destination columns by name. A source column missing
+    from the destination, or a destination column without a default that no source column
+    fills, raises SchemaMismatch instead of loading misaligned rows. Only a repeated
+    source name (the indicator `id` appended after a fact table's own `id`) may be left
+    out. With `match='position'` legacy destinations whose names differ are filled column
+    by column, as long as they have as many columns as the rows.
+
+    A table's schema is read again after `ttl` seconds or invalidate(), and its plans are
+    rebuilt if it changed. Tables are cached by name, so a registry serves a single
+    destination database: asking the connection for its database (conn.database on
+    mysql-connector) would cost a round trip on every batch.
+    """
+
+    def __init__(self, ttl: float = 300.0, match: str = 'name',
+                 reader: Callable[[Any, str], List[ColumnInfo]] = information_schema_columns):
+        self.ttl = ttl
+        self.match = match
+        self.reader = reader
+        self.lock = threading.Lock()
+        self.schemas: Dict[str, Tuple[List[ColumnInfo], float]] = {}
+        self.plans: Dict[tuple, InsertPlan] = {}
+        self.reads = 0
+
+    def columns(self, conn, table: str) -> List[ColumnInfo]:
+        """Columns of a destination table, read again once older than the TTL."""
+        with self.lock:
+            cached = self.schemas.get(table)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+        columns = self.reader(conn, table)
+        self.reads += 1
+        if not columns:
+            raise SchemaMismatch(f"Destination table {table} does not exist")
+        with self.lock:
+            if cached and cached[0] != columns:
+                print(f"🔄 Schema of {table} changed, rebuilding its insert plans")
+                self.plans = {plan_key: plan for plan_key, plan in self.plans.items() if plan_key[0] != table}
+            self.schemas[table] = (columns, time.monotonic())
+        return columns
+
+    def invalidate(self, conn, table: str):
+        """Forget a table's schema and plans, after a DDL or an error pointing at a stale schema."""
+        with self.lock:
+            self.schemas.pop(table, None)
+            self.plans = {plan_key: plan for plan_key, plan in self.plans.items() if plan_key[0] != table}
+
+    def plan(self, conn, table: str, source_columns: Optional[Sequence[str]]) -> InsertPlan:
+        """Insert plan of rows with the given column names into a table.
+
+        Without source column names the rows are taken to be in destination order.
+        """
+        columns = self.columns(conn, table)
+        source = tuple(source_columns) if source_columns is not None else tuple(column.name for column in columns)
+        plan_key = (table, source)
+        with self.lock:
+            plan = self.plans.get(plan_key)
+        if plan is None:
+            plan = self._build(table, columns, source)
+            with self.lock:
+                self.plans[plan_key] = plan
+        return plan
+
+    def _build(self, table: str, columns: List[ColumnInfo], source: Tuple[str, ...]) -> InsertPlan:
+        if self.match == 'position':
+            if len(source) != len(columns):
+                raise SchemaMismatch(f"{table} has {len(columns)} columns, rows have {len(source)}")
+            return InsertPlan(table, columns, range(len(source)), len(source))
+
+        first: Dict[str, int] = {}
+        for position, name in enumerate(source):
+            first.setdefault(name, position)
+        names = {column.name for column in columns}
+        unknown = [name for name in first if name not in names]
+        if unknown:
+            raise SchemaMismatch(f"{table} has no column {', '.join(unknown)}")
+        unfilled = [column.name for column in columns if column.name not in first and not column.has_default]
+        if unfilled:
+            raise SchemaMismatch(f"No source column for {table}.{', '.join(unfilled)}")
+        mapped = [column for column in columns if column.name in first]
+        return InsertPlan(table, mapped, [first[column.name] for column in mapped], len(source))
@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+import pyarrow as pa
+
+def unbuffered_cursor(conn, dictionary: bool = False):
+    """Open a cursor that reads rows from the socket as they are fetched instead of buffering the whole result."""
+    try:
+        return conn.cursor(buffered=False, dictionary=dictionary)
+    except TypeError:
+        # DB-API drivers without the option (sqlite3) always stream
+        return conn.cursor()
+
+class ResultStream:
+    """Rows of a query read chunk by chunk from an unbuffered cursor.
+
+    Only one chunk is held in memory at a time, whatever the size of the result. The
+    connection cannot run other statements until the stream is exhausted or closed.
+    `chunk_size` may be a function giving the size of each next chunk (adaptive batch sizing).
+    """
+
+    def __init__(self, conn, query: str, params: Optional[Sequence[Any]] = None,
+                 chunk_size: Union[int, Callable[[], int]] = 5000,
+                 dictionary: bool = False, net_write_timeout: Optional[int] = None):
+        self.conn = conn
+        self.chunk_size = chunk_size
+        self.cursor = unbuffered_cursor(conn, dictionary)
+        if net_write_timeout:
+            # The server gives up on a client that does not read for net_write_timeout seconds,
+            # which a slow consumer applying backpressure can exceed
+            self.cursor.execute(f"SET SESSION net_write_timeout = {int(net_write_timeout)}")
+        self.cursor.execute(query, params or ())
+        self.columns: List[str] = [col[0] for col in self.cursor.description]
+        self.done = False
+
+    def __enter__(self) -> 'ResultStream':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        """Yield lists of at most chunk_size rows."""
+        try:
+            while True:
+                rows = self.cursor.fetchmany(self.chunk_size() if callable(self.chunk_size) else self.chunk_size)
+                if not rows:
+                    self.done = True
+                    return
+                yield rows
+        finally:
+            if not self.done:
+                self.close()
+
+    def numpy_batches(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield chunks as one NumPy array per column."""
+        for rows in self:
+            yield {name: _column_array(values) for name, values in zip(self.columns, zip(*rows))}
+
+    def arrow_batches(self) -> Iterator[pa.RecordBatch]:
+        """Yield chunks as Arrow record batches."""
+        for rows in self:
+            yield pa.RecordBatch.from_arrays([pa.array(values) for values in zip(*rows)], names=self.columns)
+
+    def close(self):
+        """Discard the rows not read yet and close the cursor."""
+        if self.cursor is None:
+            return
+        if not self.done and hasattr(self.conn, 'consume_results'):
+            self.conn.consume_results()
+        self.cursor.close()
+        self.cursor = None
+        self.done = True
+
+def _column_array(values: Sequence[Any]) -> np.ndarray:
+    """Typed array when the values allow it (numbers, datetimes), object array otherwise."""
+    if values and isinstance(values[0], datetime):
+        try:
+            return np.array(values, dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            return np.asarray(values, dtype=object)
+    array = np.asarray(values)
+    if array.dtype.kind in 'US':
+        array = np.asarray(values, dtype=object)
+    return array
+
+def stream_rows(conn, query: str, params: Optional[Sequence[Any]] = None, chunk_size: int = 5000,
+                dictionary: bool = False) -> Iterator[List[Any]]:
+    """Yield the rows of a query in chunks, holding one chunk in memory at a time."""
+    with ResultStream(conn, query, params, chunk_size, dictionary) as stream:
+        yield from stream
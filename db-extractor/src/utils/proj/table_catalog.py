@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Every weekly table, parsed in one pass: <base>_S<week>_A<year> where the base is
+# <site>_APG43_<5|15> (5min/15min families), <site>MGW (mgw family) or anything else (other)
+TABLE_PATTERN = re.compile(r'''^(?P<base>
+        (?P<apg>CALIS|MEIND|RAIND)[-_]APG43[_-](?P<interval>5|15)
+      | (?P<mgw>[A-Za-z0-9]+)MGW
+      | .+?
+    )_S(?P<week>\d+)_A(?P<year>\d{4})$''', re.VERBOSE)
+
+FAMILIES = ('5min', '15min', 'mgw')
+
+class TableName(NamedTuple):
+    """A weekly table name split into its parts."""
+    name: str
+    family: str  # 5min, 15min, mgw or other
+    base: str  # name without the _SXX_AXXXX suffix
+    site: Optional[str]
+    week: int
+    year: int
+    interval: Optional[int]  # minutes between samples, when the family tells it
+
+    @property
+    def year_week(self) -> Tuple[int, int]:
+        return self.year, self.week
+
+@lru_cache(maxsize=65536)
+def parse_table_name(name: str) -> Optional[TableName]:
+    """Parse a weekly table name, None for any other table."""
+    match = TABLE_PATTERN.match(name)
+    if not match:
+        return None
+    base, apg, interval, mgw, week, year = match.groups()
+    if apg:
+        return TableName(name, f"{interval}min", base, apg, int(week), int(year), int(interval))
+    if mgw:
+        return TableName(name, 'mgw', base, mgw, int(week), int(year), None)
+    return TableName(name, 'other', base, None, int(week), int(year), None)
+
+def table_family(name: str) -> str:
+    """Return the family (5min, 15min, mgw) of a table, 'other' if it matches none."""
+    parsed = parse_table_name(name)
+    return parsed.family if parsed else 'other'
+
+def base_name(name: str) -> str:
+    """Name of a table without its _SXX_AXXXX suffix (the name itself for non weekly tables)."""
+    parsed = parse_table_name(name)
+    return parsed.base if parsed else name
+
+class TableCatalog:
+    """Weekly tables parsed once and indexed by family, year/week and base, each list sorted by year and week."""
+
+    def __init__(self, names: Iterable[str]):
+        self.tables: Dict[str, TableName] = {}
+        self.by_family: Dict[str, List[TableName]] = {}
+        self.by_week: Dict[Tuple[int, int], List[TableName]] = {}
+        self.by_base: Dict[str, List[TableName]] = {}
+        self.others: List[str] = []
+        for name in names:
+            parsed = parse_table_name(name)
+            if parsed is None:
+                self.others.append(name)
+            elif name not in self.tables:
+                self.tables[name] = parsed
+        for parsed in sorted(self.tables.values(), key=itemgetter(5, 4, 0)):  # year, week, name
+            self.by_family.setdefault(parsed.family, []).append(parsed)
+            self.by_week.setdefault((parsed.year, parsed.week), []).append(parsed)
+            self.by_base.setdefault(parsed.base, []).append(parsed)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'TableCatalog':
+        """Build the catalog from a file with one table name per line."""
+        with open(path, 'r') as f:
+            return cls(line.strip() for line in f if line.strip())
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tables
+
+    def get(self, name: str) -> Optional[TableName]:
+        return self.tables.get(name)
+
+    def family(self, family: str, start_year: Optional[int] = None) -> List[TableName]:
+        """Tables of a family sorted by year and week, from `start_year` on if given."""
+        tables = self.by_family.get(family, [])
+        if start_year is None:
+            return list(tables)
+        return [table for table in tables if table.year >= start_year]
+
+    def week(self, year: int, week: int, family: Optional[str] = None) -> List[TableName]:
+        """Tables of a given week, of one family if given."""
+        tables = self.by_week.get((year, week), [])
+        return [table for table in tables if family is None or table.family == family]
+
+    def base(self, base: str) -> List[TableName]:
+        """Weekly tables sharing a base (and an indicator table), sorted by year and week."""
+        return list(self.by_base.get(base, []))
+
+    def bases(self, family: Optional[str] = None) -> List[str]:
+        """Distinct base names, of one family if given."""
+        return sorted(base for base, tables in self.by_base.items() if family is None or tables[0].family == family)
+
+    def weeks(self) -> List[Tuple[int, int]]:
+        """(year, week) pairs that have at least one table, in order."""
+        return sorted(self.by_week)
@@ -0,0 +1,176 @@
+import heapq
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, ContextManager, Iterator, List, Optional, Sequence, Tuple, Union
+try:
+    from .streaming import ResultStream
+    from .table_catalog import TableCatalog, TableName
+except ImportError:
+    from streaming import ResultStream
+    from table_catalog import TableCatalog, TableName
+
+# Marks the end of a table's rows in its queue
+END = object()
+
+def as_datetime(value: Union[str, date, datetime]) -> datetime:
+    """Datetime of a date, datetime or ISO string."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value if isinstance(value, datetime) else datetime(value.year, value.month, value.day)
+
+def week_bounds(year: int, week: int) -> Tuple[datetime, datetime]:
+    """First instant of an ISO week and of the week after it."""
+    monday = datetime.fromisocalendar(year, week, 1)
+    return monday, monday + timedelta(weeks=1)
+
+def iso_weeks(start: Union[str, date, datetime], end: Union[str, date, datetime]) -> List[Tuple[int, int]]:
+    """(ISO year, ISO week) of every week overlapping [start, end), in order."""
+    start, end = as_datetime(start), as_datetime(end)
+    weeks = []
+    monday = datetime(start.year, start.month, start.day) - timedelta(days=start.weekday())
+    while monday < end:
+        year, week, _ = monday.isocalendar()
+        weeks.append((year, week))
+        monday += timedelta(weeks=1)
+    return weeks
+
+def resolve_tables(catalog: TableCatalog, start: Union[str, date, datetime], end: Union[str, date, datetime],
+                   family: Optional[str] = None, base: Optional[str] = None) -> List[TableName]:
+    """Weekly tables holding [start, end), of one family and/or base if given, in week order."""
+    tables = []
+    for year, week in iso_weeks(start, end):
+        tables += [table for table in catalog.week(year, week, family) if base is None or table.base == base]
+    return tables
+
+class RangeQuery:
+    """Rows of a time range read from the weekly tables that hold it, merged in time order.
+
+    The tables are read in parallel, each on its own pooled connection, and buffered up to
+    `prefetch` chunks ahead of the consumer. Tables of the same week overlap in time
+    (one per base), so they are all read together and merged; later weeks are read ahead
+    while earlier ones are consumed. `connection` must therefore be able to hand out one
+    connection per table of a week (up to 9 for the mgw family).
+    """
+
+    def __init__(self, connection: Callable[[], ContextManager[Any]], catalog: TableCatalog,
+                 time_column: str = 'time', indicator_column: str = 'id_indicateur', dimensions=None,
+                 max_workers: int = 4, chunk_size: int = 5000, prefetch: int = 4, placeholder: str = '%s'):
+        self.connection = connection
+        self.catalog = catalog
+        self.time_column = time_column
+        self.indicator_column = indicator_column
+        self.dimensions = dimensions
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self.placeholder = placeholder
+        self.columns: Optional[List[str]] = None
+
+    def tables(self, start, end, family: Optional[str] = None, base: Optional[str] = None) -> List[TableName]:
+        return resolve_tables(self.catalog, start, end, family, base)
+
+    def _indicator_ids(self, table: str, indicators: Optional[Sequence[Union[int, str]]]) -> Optional[List[int]]:
+        if indicators is None:
+            return None
+        ids = [indicator for indicator in indicators if not isinstance(indicator, str)]
+        names = [indicator for indicator in indicators if isinstance(indicator, str)]
+        if names:
+            # Indicator ids are per base, so names are resolved for each table
+            ids += self.dimensions.get(table).ids_of(names)
+        return ids
+
+    def build_query(self, table: str, start, end, ids: Optional[List[int]]) -> Tuple[str, tuple]:
+        where = f"{self.time_column} >= {self.placeholder} AND {self.time_column} < {self.placeholder}"
+        params: tuple = (start, end)
+        if ids is not None:
+            where += f" AND {self.indicator_column} IN ({', '.join([self.placeholder] * len(ids))})"
+            params += tuple(ids)
+        return f"SELECT * FROM {table} WHERE {where} ORDER BY {self.time_column}", params
+
+    def _read(self, table: str, query: str, params: tuple, out: queue.Queue, stop: threading.Event):
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            with self.connection() as conn:
+                with ResultStream(conn, query, params, self.chunk_size) as stream:
+                    if not put(tuple(stream.columns)):
+                        return
+                    for chunk in stream:
+                        if not put(chunk):
+                            return
+            put(END)
+        except BaseException as e:
+            put(e)
+
+    def _rows(self, table: str, out: queue.Queue) -> Iterator[Tuple[str, tuple]]:
+        item = out.get()
+        while item is not END:
+            if isinstance(item, BaseException):
+                raise item
+            if isinstance(item, tuple):
+                self.columns = list(item)  # Column names come first, rows come in lists
+            else:
+                for row in item:
+                    yield table, row
+            item = out.get()
+
+    def stream(self, start, end, family: Optional[str] = None, base: Optional[str] = None,
+               indicators: Optional[Sequence[Union[int, str]]] = None) -> Iterator[Tuple[str, tuple]]:
+        """Yield (table, row) for every row of [start, end) in time order.
+
+        `indicators` filters on indicator ids, or on names resolved through `dimensions`.
+        """
+        tables = self.tables(start, end, family, base)
+        if not tables:
+            return
+        weeks: List[List[TableName]] = []
+        for table in tables:
+            if weeks and weeks[-1][0].year_week == table.year_week:
+                weeks[-1].append(table)
+            else:
+                weeks.append([table])
+
+        # Every table of a week must be open at once for the merge, whatever max_workers says
+        workers = max(self.max_workers, max(len(group) for group in weeks))
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            queues = []
+            for group in weeks:
+                group_queues = []
+                for table in group:
+                    ids = self._indicator_ids(table.name, indicators)
+                    if ids == []:
+                        continue  # None of the indicators exist in this base
+                    query, params = self.build_query(table.name, start, end, ids)
+                    out = queue.Queue(maxsize=self.prefetch)
+                    executor.submit(self._read, table.name, query, params, out, stop)
+                    group_queues.append((table.name, out))
+                if group_queues:
+                    queues.append(group_queues)
+
+            for group_queues in queues:
+                readers = [self._rows(table, out) for table, out in group_queues]
+                if len(readers) == 1:
+                    yield from readers[0]
+                    continue
+                first = [next(reader, None) for reader in readers]
+                position = self.columns.index(self.time_column) if self.columns else 0
+                heads = [_prepend(item, reader) for item, reader in zip(first, readers) if item is not None]
+                yield from heapq.merge(*heads, key=lambda item: item[1][position])
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+def _prepend(item, iterator: Iterator) -> Iterator:
+    yield item
+    yield from iterator
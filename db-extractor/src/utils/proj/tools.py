@@ -1,29 +1,44 @@
 import mysql.connector
-import re
 import sys
 import json
-from typing import List, Dict, Any, Optional
-from config import files_paths as output_paths
-
-def connect_database(config: Dict[str, Any]):
-    """Connect to the database."""
+import os
+import csv
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple, Union
+from config import (
+    files_paths as output_paths, pool_size, load_mode, rollup_families, time_column, indicator_column, value_column,
+    schema_ttl, schema_match, batch_size as initial_batch_size, batch_target_seconds, batch_max_bytes, batch_min_rows,
+    batch_max_rows, batch_sizes_path
+)
+from pool import get_pool
+from bulk_loader import bulk_load_chunks
+from streaming import ResultStream
+from batch_sizing import BatchSizer, batch_sizer
+from table_catalog import TableCatalog
+from rollups import rolled_up, update_rollups
+from schema_registry import SchemaRegistry, SCHEMA_ERRORS
+
+# Tables of the destination database introspected once and shared by every loader
+schemas = SchemaRegistry(schema_ttl, schema_match)
+
+def batch_sizes() -> BatchSizer:
+    """Fetch and insert batch sizes of every table, shared by the extractors and loaders of the process."""
+    return batch_sizer(batch_sizes_path, initial_rows=initial_batch_size, target_seconds=batch_target_seconds,
+                       max_bytes=batch_max_bytes, min_rows=batch_min_rows, max_rows=batch_max_rows)
+
+def connect_database(config: Dict[str, Any], **options):
+    """Take a connection to the database from the shared pool."""
     try:
-        conn = mysql.connector.connect(
-            host=config['host'],
-            user=config['user'],
-            password=config['password'],
-            port=config['port'],
-            database=config['database']
-        )
-        return conn
+        return get_pool(config, size=pool_size, **options).acquire()
     except mysql.connector.Error as e:
         print(f"❌ Connection error: {e}")
         sys.exit(1)
 
 def store_json(data: Any, filename: str):
-    """Store data in a JSON file."""
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
+    """Store data in a JSON file, replacing the previous one only once complete."""
+    tmp_path = filename + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=4, default=str)
+    os.replace(tmp_path, filename)
 
 def load_json(filename: str) -> Any:
     """Load data from a JSON file."""
@@ -44,6 +59,18 @@ def load_csv(filename: str) -> List[List[str]]:
             data.append(line.strip().split(','))
     return data
 
+def load_table_sizes(filename: str) -> Dict[str, float]:
+    """Load table sizes in MB from a "name","size" CSV file."""
+    table_sizes = {}
+    with open(filename, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) == 2:
+                try:
+                    table_sizes[row[0]] = float(row[1])
+                except ValueError:
+                    continue
+    return table_sizes
+
 def store_txt(data: List[str], filename: str):
     """Store data in a text file."""
     with open(filename, 'w') as f:
@@ -54,34 +81,12 @@ def load_txt(filename: str) -> List[str]:
     with open(filename, 'r') as f:
         return f.read().splitlines()
 
-def filter_tables(table_names: List[str], pattern: re.Pattern) -> List[str]:
-    """Filter table names based on a regex pattern."""
-    return [table for table in table_names if re.match(pattern, table)]
-
-def filter_by_year(tables: List[str], start_year: int) -> List[str]:
-    """Filter tables by year (2024 or greater)."""
-    return [table for table in tables if int(re.search(r'_A(\d{4})$', table).group(1)) >= start_year]
-
-def sort_by_year_and_week(tables: List[str]) -> List[str]:
-    """Sort tables by year and week."""
-    return sorted(tables, key=lambda x: (
-        int(re.search(r'_A(\d{4})$', x).group(1)),  # Extract year
-        int(re.search(r'_S(\d+)_', x).group(1))    # Extract week number
-    ))
-
-def process_tables_names(table_names: List[str], patterns: Dict[str, re.Pattern], start_year: int):
+def process_tables_names(table_names: List[str], start_year: int):
     """Process table names by filtering and sorting them."""
-    filtered_5min = filter_tables(table_names, patterns['5min'])
-    filtered_15min = filter_tables(table_names, patterns['15min'])
-    filtered_mgw = filter_tables(table_names, patterns['mgw'])
-
-    filtered_5min_by_year = filter_by_year(filtered_5min, start_year)
-    filtered_15min_by_year = filter_by_year(filtered_15min, start_year)
-    filtered_mgw_by_year = filter_by_year(filtered_mgw, start_year)
-
-    sorted_5min = sort_by_year_and_week(filtered_5min_by_year)
-    sorted_15min = sort_by_year_and_week(filtered_15min_by_year)
-    sorted_mgw = sort_by_year_and_week(filtered_mgw_by_year)
+    catalog = TableCatalog(table_names)
+    sorted_5min = [table.name for table in catalog.family('5min', start_year)]
+    sorted_15min = [table.name for table in catalog.family('15min', start_year)]
+    sorted_mgw = [table.name for table in catalog.family('mgw', start_year)]
 
     store_txt(sorted_5min, output_paths['5min'])
     store_txt(sorted_15min, output_paths['15min'])
@@ -94,18 +99,11 @@ def process_tables_names(table_names: List[str], patterns: Dict[str, re.Pattern]
     total_tables = len(sorted_5min) + len(sorted_15min) + len(sorted_mgw)
     print(f"✅ Total tables found: {total_tables}")
 
-def join_table(table: str) -> str:
-    """Derive the join table name by removing the _SXX_AXXXX suffix."""
-    base_table_name = re.sub(r'_S\d+_A\d{4}$', '', table)
-    return f"indicateur_{base_table_name}"
-
 def extract_table_data(table: str, cursor, offset: int, batch_size: int = 5000) -> Optional[List[tuple]]:
     """Extract a single batch of data from the specified table."""
     query = f"""
         SELECT *
         FROM {table} t1 
-        JOIN {join_table(table)} t2 
-        ON t1.id_indicateur = t2.id 
         LIMIT {batch_size} 
         OFFSET {offset}
     """
@@ -113,19 +111,92 @@ def extract_table_data(table: str, cursor, offset: int, batch_size: int = 5000)
     batch = cursor.fetchall()
     return batch if batch else None
 
-def load_batch_into_database(batch: List[tuple], target_db, target_table: str):
-    """Load a batch of data into the target database."""
+def build_keyset_query(table: str, key_columns: Sequence[str], last_key: Optional[Sequence[Any]],
+                       batch_size: Optional[int] = 5000, bounds: Optional[Tuple[Any, Any]] = None) -> Tuple[str, tuple]:
+    """Build a seek query returning the batch that follows `last_key` in key order, every following row if batch_size is None.
+
+    `bounds` (low, high) keeps the rows whose first key column is in [low, high), None for no bound.
+    """
+    order_by = ', '.join(f"t1.{col}" for col in key_columns)
+    conditions, params = [], ()
+    low, high = bounds or (None, None)
+    if low is not None:
+        conditions.append(f"t1.{key_columns[0]} >= %s")
+        params += (low,)
+    if high is not None:
+        conditions.append(f"t1.{key_columns[0]} < %s")
+        params += (high,)
+    if last_key is not None:
+        # (a, b) > (x, y) written as a >= x AND (a > x OR (a = x AND b > y)):
+        # the leading bound lets MySQL range-scan the index instead of filtering every row
+        clauses = []
+        params += (last_key[0],)
+        for i, col in enumerate(key_columns):
+            equals = [f"t1.{prev} = %s" for prev in key_columns[:i]]
+            clauses.append("(" + " AND ".join(equals + [f"t1.{col} > %s"]) + ")")
+            params += tuple(last_key[:i + 1])
+        conditions.append(f"t1.{key_columns[0]} >= %s AND (" + " OR ".join(clauses) + ")")
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    query = f"""
+        SELECT *
+        FROM {table} t1 
+        {where}
+        ORDER BY {order_by} 
+        {f"LIMIT {batch_size}" if batch_size else ""}
+    """
+    return query, params
+
+def extract_table_data_keyset(table: str, cursor, key_columns: Sequence[str], last_key: Optional[Sequence[Any]],
+                              batch_size: int = 5000) -> Tuple[Optional[List[tuple]], Optional[tuple]]:
+    """Extract the batch following `last_key` and return it with the key of its last row."""
+    query, params = build_keyset_query(table, key_columns, last_key, batch_size)
+    cursor.execute(query, params)
+    batch = cursor.fetchall()
+    if not batch:
+        return None, last_key
+    columns = [col[0] for col in cursor.description]
+    positions = [columns.index(col) for col in key_columns]
+    return batch, tuple(batch[-1][pos] for pos in positions)
+
+def stream_table_data_keyset(table: str, conn, key_columns: Sequence[str], last_key: Optional[Sequence[Any]],
+                             batch_size: Union[int, Callable[[], int]] = 5000, net_write_timeout: Optional[int] = None,
+                             bounds: Optional[Tuple[Any, Any]] = None) -> Iterator[Tuple[List[tuple], tuple, List[str]]]:
+    """Read the rows following `last_key` with a single query, yielding batches with the key of their last row and the column names.
+
+    `batch_size` may be a function giving the size of each next batch.
+    """
+    query, params = build_keyset_query(table, key_columns, last_key, None, bounds)
+    with ResultStream(conn, query, params, batch_size, net_write_timeout=net_write_timeout) as stream:
+        positions = [stream.columns.index(col) for col in key_columns]
+        for batch in stream:
+            yield batch, tuple(batch[-1][pos] for pos in positions), stream.columns
+
+def load_batch_into_database(batch: List[tuple], target_db, target_table: str,
+                             source_columns: Optional[Sequence[str]] = None, mode: str = load_mode,
+                             chunk_size: Optional[Callable[[], int]] = None,
+                             on_chunk: Optional[Callable[[int, float], None]] = None):
+    """Load a batch of data into the target database, and its rollups in the same transaction.
+
+    Rows are aligned with the destination columns by the names in `source_columns`
+    (destination order if None); SchemaMismatch is raised before anything is inserted
+    if they do not fit. The rows are inserted in chunks of chunk_size() rows, the time of
+    each reported to on_chunk(rows, seconds).
+    """
     cursor = target_db.cursor()
     try:
-        cursor.execute(f"SELECT * FROM {target_table} LIMIT 0")
-        columns = [col[0] for col in cursor.description]
-        placeholders = ', '.join(['%s'] * len(batch[0]))
-        insert_query = f"INSERT INTO {target_table} ({', '.join(columns)}) VALUES ({placeholders})"
-        cursor.executemany(insert_query, batch)
+        plan = schemas.plan(target_db, target_table, source_columns)
+        rows = plan.align(batch)
+        inserted = bulk_load_chunks(target_db, target_table, plan.columns, rows, mode, chunk_size, on_chunk)
+        if rolled_up(target_table, rollup_families):
+            update_rollups(cursor, target_table, plan.columns, rows, time_column, indicator_column, value_column,
+                           inserted=inserted)
         target_db.commit()
         print(f"✅ Successfully loaded {len(batch)} rows into {target_table}")
     except Exception as e:
         print(f"❌ Error loading batch into {target_table}: {e}")
         target_db.rollback()
+        if getattr(e, 'errno', None) in SCHEMA_ERRORS:
+            schemas.invalidate(target_db, target_table)
+        raise
     finally:
-        cursor.close()
\ No newline at end of file
+        cursor.close()
@@ -0,0 +1,170 @@
+import threading
+from typing import Any, Dict, Sequence, Tuple
+import numpy as np
+try:
+    from .table_catalog import base_name
+    from .rollups import to_float
+except ImportError:
+    from table_catalog import base_name
+    from rollups import to_float
+
+# Indicator types (the type column of indicateur_<base>) holding cumulative counters: D (IP interface
+# counters) and A (call, bearer and RTP counters); G holds gauges and O derived ratios, along with the
+# RTP received packets counters named in COUNTER_NAMES. Every other indicator is a gauge
+COUNTER_TYPES = frozenset({'D', 'A'})
+COUNTER_NAMES = frozenset({'pmRtpReceivedPkts', 'pmRtpReceivedPktsHi', 'pmRtpReceivedPktsLo'})
+
+def is_counter(row: Sequence[Any], types: frozenset = COUNTER_TYPES, names: frozenset = COUNTER_NAMES) -> bool:
+    """Tell whether an (id, name, type) indicator row is a cumulative counter."""
+    return row[2] in types or str(row[1]).split('.', 1)[0] in names
+
+# Time of an indicator never seen yet
+NO_TIME = np.iinfo(np.int64).min
+
+# Columns of a transformed batch
+RATE_COLUMNS = ('time', 'indicator', 'value', 'counter', 'delta', 'rate', 'normalized')
+
+def record_columns(records: Sequence[Any], time_column: str, indicator_column: str, value_column: str,
+                   columns: Sequence[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Times (datetime64[s]), indicator ids (-1 for NULL) and values (NaN for NULL) of dict or tuple rows."""
+    if records and not isinstance(records[0], dict):
+        t, i, v = (columns.index(column) for column in (time_column, indicator_column, value_column))
+    else:
+        t, i, v = time_column, indicator_column, value_column
+    # A batch holds a few distinct times, so only those go through numpy's slow datetime conversion
+    raw = [record[t] for record in records]
+    distinct = {value: position for position, value in enumerate(dict.fromkeys(raw))}
+    times = np.array(list(distinct), dtype='datetime64[s]')[
+        np.fromiter(map(distinct.__getitem__, raw), dtype=np.int64, count=len(raw))]
+    indicators = np.fromiter((-1 if record[i] is None else record[i] for record in records),
+                             dtype=np.int64, count=len(records))
+    return times, indicators, to_float([record[v] for record in records])
+
+def counter_mask(flags: np.ndarray, indicators: np.ndarray) -> np.ndarray:
+    """Tell which rows are counters from flags indexed by indicator id (unknown ids are gauges)."""
+    inside = (indicators >= 0) & (indicators < len(flags))
+    mask = np.zeros(len(indicators), dtype=bool)
+    mask[inside] = flags[indicators[inside]]
+    return mask
+
+class RateTransform:
+    """Deltas and per-second rates of every indicator, computed a whole batch at a time.
+
+    The last sample of each indicator is kept per table base, so the first rows of a batch
+    (or of the next weekly table) are diffed against the end of the previous one. NULL
+    values are skipped: the next sample is diffed against the last known one.
+
+    A counter going down wrapped if it was in the top `wrap_margin` of its range and is now
+    in the bottom one; otherwise it was reset and counts from zero. `normalized` is the rate
+    of counters and the value of gauges.
+
+    apply() moves on from the batches transformed so far, so the next batch can be transformed
+    before this one is delivered; commit() records a batch once it is published and inserted,
+    and rollback() goes back to the last committed batch when one is not, so that the batches
+    fetched again are diffed against the samples before them rather than against themselves.
+    """
+
+    def __init__(self, wrap: float = 2 ** 32, wrap_margin: float = 0.1):
+        self.wrap = float(wrap)
+        self.wrap_margin = wrap_margin
+        self.lock = threading.Lock()
+        self.last: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # base -> (times, values) indexed by indicator id
+        self.committed: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}  # Same, as of the last committed batch
+        self.wraps = 0
+        self.resets = 0
+
+    def _state(self, base: str, size: int, states: Dict[str, Tuple[np.ndarray, np.ndarray]] = None
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        states = self.last if states is None else states
+        times, values = states.get(base, (np.empty(0, np.int64), np.empty(0)))
+        if len(times) < size:
+            grow = size - len(times)
+            times = np.concatenate([times, np.full(grow, NO_TIME, np.int64)])
+            values = np.concatenate([values, np.full(grow, np.nan)])
+            states[base] = (times, values)
+        return times, values
+
+    def commit(self, table: str, columns: Dict[str, np.ndarray]):
+        """Record the last sample of each indicator of a transformed batch, once it is delivered."""
+        ids, values = columns['indicator'], columns['value']
+        valid = (ids >= 0) & ~np.isnan(values)
+        if not valid.any():
+            return
+        ids, values = ids[valid], values[valid]
+        seconds = columns['time'][valid].astype('datetime64[s]').astype(np.int64)
+        order = np.lexsort((seconds, ids))
+        ids, seconds, values = ids[order], seconds[order], values[order]
+        ends = np.r_[ids[1:] != ids[:-1], True]
+        ids, seconds, values = ids[ends], seconds[ends], values[ends]
+        with self.lock:
+            last_times, last_values = self._state(base_name(table), int(ids[-1]) + 1, self.committed)
+            newer = seconds > last_times[ids]
+            last_times[ids[newer]] = seconds[newer]
+            last_values[ids[newer]] = values[newer]
+
+    def rollback(self, table: str):
+        """Forget the batches transformed since the last committed one."""
+        base = base_name(table)
+        with self.lock:
+            if base in self.committed:
+                times, values = self.committed[base]
+                self.last[base] = (times.copy(), values.copy())
+            else:
+                self.last.pop(base, None)
+
+    def apply(self, table: str, times: np.ndarray, indicators: np.ndarray, values: np.ndarray,
+              counters: np.ndarray) -> Dict[str, np.ndarray]:
+        """Columns of a batch (RATE_COLUMNS), in the order of its rows."""
+        n = len(times)
+        times = times.astype('datetime64[s]')
+        if not n:
+            return {'time': times, 'indicator': indicators, 'value': values, 'counter': counters,
+                    'delta': np.empty(0), 'rate': np.empty(0), 'normalized': np.empty(0)}
+        # Rows grouped by indicator, in time order within each group (unknown indicators, -1, first)
+        seconds = times.astype(np.int64)
+        order = np.lexsort((seconds, indicators))
+        ids, ts, vs, cs = indicators[order], seconds[order], values[order], counters[order]
+        rows = np.arange(n)
+        known = ids >= 0
+        valid = known & ~np.isnan(vs)
+        starts = np.r_[True, ids[1:] != ids[:-1]]
+        ends = np.r_[starts[1:], True]
+        group_start = np.maximum.accumulate(np.where(starts, rows, 0))
+        last_valid = np.maximum.accumulate(np.where(valid, rows, -1))
+        # Previous valid sample of each row in its group, the saved one for the first rows
+        previous = np.r_[-1, last_valid[:-1]]
+        in_batch = previous >= group_start
+        slots = np.where(known, ids, 0)
+
+        with self.lock:
+            last_times, last_values = self._state(base_name(table), max(int(ids[-1]) + 1, 1))
+            prev_t = np.where(in_batch, ts[previous], last_times[slots])
+            prev_v = np.where(in_batch, vs[previous], last_values[slots])
+            # The last valid sample of each indicator is saved, unless an older batch is replayed
+            final = last_valid[ends]
+            saved = (final >= group_start[ends]) & known[ends]
+            final, final_ids = final[saved], ids[ends][saved]
+            newer = ts[final] > last_times[final_ids]
+            last_times[final_ids[newer]] = ts[final[newer]]
+            last_values[final_ids[newer]] = vs[final[newer]]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = np.where(known, vs - prev_v, np.nan)
+            down = cs & (delta < 0)
+            wrapped = down & (prev_v >= self.wrap * (1 - self.wrap_margin)) & (vs < self.wrap * self.wrap_margin)
+            reset = down & ~wrapped
+            delta = np.where(wrapped, delta + self.wrap, np.where(reset, vs, delta))
+            # Rows not newer than the sample they are diffed against (a batch fetched again) get no delta
+            elapsed = np.where(prev_t == NO_TIME, np.nan, (ts - prev_t).astype(np.float64))
+            delta = np.where(elapsed > 0, delta, np.nan)
+            rate = delta / elapsed
+        with self.lock:
+            self.wraps += int(wrapped.sum())
+            self.resets += int(reset.sum())
+
+        columns = {'time': times, 'indicator': indicators, 'value': values, 'counter': counters}
+        for name, column in (('delta', delta), ('rate', rate)):
+            columns[name] = np.empty(n)
+            columns[name][order] = column
+        columns['normalized'] = np.where(counters, columns['rate'], values)
+        return columns
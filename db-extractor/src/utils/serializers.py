@@ -0,0 +1,196 @@
+import json
+import calendar
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from utils.proj.table_catalog import parse_table_name
+
+# Message formats understood by the stream processor, sent in the "content-type" Kafka header
+JSON = "application/json"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+EPOCH = datetime(1970, 1, 1)
+
+# Table families sharing the same columns, so a schema is derived once per family
+# (tables of no known family get a schema of their own)
+def table_family(table):
+    parsed = parse_table_name(table)
+    return parsed.family if parsed and parsed.family != "other" else table
+
+# Type name stored in the schema for a Python value coming from MySQL
+def value_type(value):
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, (float, Decimal)):
+        return "float"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    if isinstance(value, timedelta):
+        return "float"
+    if isinstance(value, (bytes, bytearray)):
+        return "bytes"
+    return "str"
+
+# Schemas cached by (family, columns)
+schemas = {}
+
+# Values that still fit each numeric kind, any other one widens the column
+NUMERIC_KINDS = {"int": (int,), "float": (int, float, Decimal, timedelta)}
+
+def get_schema(table, records):
+    """Return the [(column, type)] schema of a batch, derived once per table family.
+
+    Columns that were all NULL so far ("null") and numeric columns are checked against every batch,
+    the cached schema is widened when a value does not fit (a Decimal in an int column, a str in a
+    float one).
+    """
+    columns = tuple(records[0].keys())
+    key = (table_family(table), columns)
+    schema = schemas.get(key) or [(column, "null") for column in columns]
+    widened = list(schema)
+    for position, (column, kind) in enumerate(schema):
+        if kind == "null":
+            sample = next((r[column] for r in records if r[column] is not None), None)
+            if sample is not None:
+                kind = value_type(sample)
+        if kind in NUMERIC_KINDS:
+            fits = NUMERIC_KINDS[kind]
+            other = next((r[column] for r in records if r[column] is not None and not isinstance(r[column], fits)), None)
+            if other is not None:
+                kind = "float" if value_type(other) == "float" else "str"
+        widened[position] = (column, kind)
+    if widened != schemas.get(key):
+        schemas[key] = widened
+    return schemas[key]
+
+def encode_value(value, kind):
+    if value is None:
+        return None
+    if kind == "datetime":
+        return calendar.timegm(value.timetuple())
+    if kind == "date":
+        return value.toordinal()
+    if kind == "float":
+        return value.total_seconds() if isinstance(value, timedelta) else float(value)
+    if kind == "int":
+        return int(value)
+    if kind == "bytes":
+        return bytes(value)
+    return str(value)
+
+def decode_value(value, kind):
+    if value is None:
+        return None
+    if kind == "datetime":
+        return EPOCH + timedelta(seconds=value)
+    if kind == "date":
+        return date.fromordinal(value)
+    return value
+
+class JsonSerializer:
+    """One JSON message per row, the original {"database", "table", "data"} format."""
+    content_type = JSON
+
+    def encode(self, database, table, records):
+        return [
+            json.dumps({"database": database, "table": table, "data": record}, default=str).encode("utf-8")
+            for record in records
+        ]
+
+    def decode(self, payload):
+        message = json.loads(payload)
+        return message["database"], message["table"], [message["data"]]
+
+class MsgPackSerializer:
+    """One MessagePack message per batch: the schema once, then rows as plain lists."""
+    content_type = MSGPACK
+
+    def __init__(self):
+        import msgpack
+        self.msgpack = msgpack
+
+    def encode(self, database, table, records):
+        schema = get_schema(table, records)
+        rows = [[encode_value(record[column], kind) for column, kind in schema] for record in records]
+        message = {"database": database, "table": table, "schema": schema, "rows": rows}
+        return [self.msgpack.packb(message, use_bin_type=True)]
+
+    def decode(self, payload):
+        message = self.msgpack.unpackb(payload, raw=False)
+        schema = message["schema"]
+        rows = [
+            {column: decode_value(value, kind) for (column, kind), value in zip(schema, row)}
+            for row in message["rows"]
+        ]
+        return message["database"], message["table"], rows
+
+class ArrowSerializer:
+    """One Arrow IPC stream per batch holding a single columnar record batch."""
+    content_type = ARROW
+
+    def __init__(self):
+        import pyarrow
+        self.pa = pyarrow
+        self.types = {
+            "int": pyarrow.int64(), "float": pyarrow.float64(), "datetime": pyarrow.timestamp("s"),
+            "date": pyarrow.date32(), "bytes": pyarrow.binary(), "str": pyarrow.string(), "null": pyarrow.null(),
+        }
+        self.arrow_schemas = {}
+
+    def arrow_schema(self, schema):
+        key = tuple(schema)
+        if key not in self.arrow_schemas:
+            self.arrow_schemas[key] = self.pa.schema([(column, self.types[kind]) for column, kind in schema])
+        return self.arrow_schemas[key]
+
+    def encode(self, database, table, records):
+        schema = get_schema(table, records)
+        arrow_schema = self.arrow_schema(schema).with_metadata({"database": database, "table": table})
+        # A column widened to float or str may still hold ints, or numbers, in later batches
+        columns = [
+            [encode_value(r[column], kind) if kind in ("float", "str") else r[column] for r in records]
+            for column, kind in schema
+        ]
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, arrow_schema)],
+            schema=arrow_schema
+        )
+        sink = self.pa.BufferOutputStream()
+        with self.pa.ipc.new_stream(sink, arrow_schema) as writer:
+            writer.write_batch(batch)
+        return [sink.getvalue().to_pybytes()]
+
+    def encode_columns(self, database, table, columns):
+        """One Arrow IPC stream of a batch already held as NumPy columns (datetime64, int, float or bool arrays)."""
+        batch = self.pa.RecordBatch.from_pydict({name: self.pa.array(values) for name, values in columns.items()},
+                                                metadata={"database": database, "table": table})
+        sink = self.pa.BufferOutputStream()
+        with self.pa.ipc.new_stream(sink, batch.schema) as writer:
+            writer.write_batch(batch)
+        return [sink.getvalue().to_pybytes()]
+
+    def decode(self, payload):
+        table = self.pa.ipc.open_stream(payload).read_all()
+        metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        return metadata.get("database"), metadata.get("table"), table.to_pylist()
+
+serializer_classes = {"json": JsonSerializer, "msgpack": MsgPackSerializer, "arrow": ArrowSerializer}
+content_types = {cls.content_type: cls for cls in serializer_classes.values()}
+decoders = {}
+
+def get_serializer(name):
+    """Return the serializer registered under `name` (json, msgpack or arrow)."""
+    if name not in serializer_classes:
+        raise ValueError(f"Unknown serializer '{name}', expected one of {', '.join(serializer_classes)}")
+    return serializer_classes[name]()
+
+def decode_message(payload, headers=None):
+    """Decode a Kafka message into (database, table, rows) using its content-type header."""
+    content_type = dict(headers or []).get("content-type", JSON.encode())
+    if isinstance(content_type, bytes):
+        content_type = content_type.decode()
+    if content_type not in decoders:
+        decoders[content_type] = content_types[content_type]()
+    return decoders[content_type].decode(payload)
@@ -1,6 +1,13 @@
 import csv
 import sys
-import re
+import mysql.connector
+from proj.pool import get_pool
+from proj.catalog import CatalogSnapshot
+from proj.table_catalog import parse_table_name, FAMILIES
+from config import (
+    SOURCE_MYSQL_HOST, SOURCE_MYSQL_USER, SOURCE_MYSQL_PASSWORD, FIRST_MYSQL_DB, SOURCE_MYSQL_PORT,
+    CATALOG_TTL, CATALOG_CACHE_PATH
+)
 
 # File paths
 input_files = {
@@ -12,11 +19,6 @@ input_files = {
 # Path to the table.csv file
 table_csv_path = "./data/our_data/tables.csv"
 
-# Define the patterns for 5-minute, 15-minute, and MGW tables
-pattern_5min = re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]5_S(\d+)_A(\d{4})$')
-pattern_15min = re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]15_S(\d+)_A(\d{4})$')
-pattern_mgw = re.compile(r'^([A-Za-z0-9]+)MGW_S(\d+)_A(\d{4})$')
-
 def load_table_sizes(csv_path):
     """Load table sizes from a CSV file into a dictionary."""
     table_sizes = {}
@@ -33,26 +35,35 @@ def load_table_sizes(csv_path):
         print(f"❌ Error loading table sizes from {csv_path}: {e}")
         sys.exit(1)
 
+def load_catalog_sizes():
+    """Load table sizes from the catalog snapshot, falling back to the CSV file if the database is unreachable."""
+    pool = get_pool({
+        'host': SOURCE_MYSQL_HOST,
+        'user': SOURCE_MYSQL_USER,
+        'password': SOURCE_MYSQL_PASSWORD,
+        'port': SOURCE_MYSQL_PORT,
+        'database': FIRST_MYSQL_DB
+    })
+    try:
+        table_sizes = CatalogSnapshot(pool.connection, FIRST_MYSQL_DB, CATALOG_TTL, CATALOG_CACHE_PATH).sizes()
+        print("✅ Table sizes loaded from the catalog snapshot!")
+        return table_sizes
+    except mysql.connector.Error as e:
+        print(f"⚠️ Catalog unavailable ({e}), using {table_csv_path}")
+        return load_table_sizes(table_csv_path)
+    finally:
+        pool.close()
+
 def get_table_size(table_name, table_sizes):
     """Fetch size of a single table from the loaded dictionary."""
     return table_sizes.get(table_name, 0)  # Return 0 if the table is not found
 
 def extract_year_week_and_type(table_name):
-    """Extract year, week, and type (5min, 15min, MGW) from the table name using regex patterns."""
-    if pattern_5min.match(table_name):
-        week = pattern_5min.match(table_name).group(2)
-        year = pattern_5min.match(table_name).group(3)
-        return year, week, "5min"
-    elif pattern_15min.match(table_name):
-        week = pattern_15min.match(table_name).group(2)
-        year = pattern_15min.match(table_name).group(3)
-        return year, week, "15min"
-    elif pattern_mgw.match(table_name):
-        week = pattern_mgw.match(table_name).group(2)
-        year = pattern_mgw.match(table_name).group(3)
-        return year, week, "mgw"
-    else:
-        return None, None, None
+    """Extract year, week, and type (5min, 15min, MGW) from the table name, parsed once by the table catalog."""
+    table = parse_table_name(table_name)
+    if table and table.family in FAMILIES:
+        return str(table.year), f"{table.week:02d}", table.family
+    return None, None, None
 
 def read_input_files(input_files):
     """Read table names from input files and return a set of all tables."""
@@ -134,8 +145,8 @@ def main():
     """Main function to load table sizes, process global summary, and write to CSV."""
     print("🚀 Process started...")
 
-    # Load table sizes from the CSV file
-    table_sizes = load_table_sizes(table_csv_path)
+    # Load table sizes from the catalog snapshot
+    table_sizes = load_catalog_sizes()
 
     # Read tables from input files
     input_tables = read_input_files(input_files)
@@ -1,37 +1,13 @@
-import re
+from proj.table_catalog import TableCatalog
 
 # Read table names from the file
 def read_table_names(file_path):
     with open(file_path, 'r') as file:
         return [line.strip() for line in file.readlines()]
 
-# Filter tables based on the patterns
-def filter_tables(table_names, pattern):
-    return [table for table in table_names if re.match(pattern, table)]
-
-# Define the patterns for 5-minute, 15-minute, and MGW tables
-pattern_5min = re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]5_S\d+_A\d{4}$')
-pattern_15min = re.compile(r'^(CALIS|MEIND|RAIND)[-_]APG43[_-]15_S\d+_A\d{4}$')
-pattern_mgw = re.compile(r'^([A-Za-z0-9]+)MGW_S\d+_A\d{4}$')
-
-# Function to filter tables by year (2024 or greater)
-def filter_by_year(tables, start_year):
-    filtered = []
-    for table in tables:
-        # Extract the year from the table name
-        year_match = re.search(r'_A(\d{4})$', table)
-        if year_match:
-            year = int(year_match.group(1))
-            if year >= start_year:
-                filtered.append(table)
-    return filtered
-
-# Function to sort tables by year and week
-def sort_by_year_and_week(tables):
-    return sorted(tables, key=lambda x: (
-        int(re.search(r'_A(\d{4})$', x).group(1)),  # Extract year
-        int(re.search(r'_S(\d+)_', x).group(1))    # Extract week number
-    ))
+# Filter tables of a family (5min, 15min, mgw) from a given year, sorted by year and week
+def filter_family(catalog, family, start_year):
+    return [table.name for table in catalog.family(family, start_year)]
 
 # Function to save results to a file
 def save_results(file_path, results):
@@ -48,21 +24,13 @@ output_mgw_path = './data/our_data/result_mgw.txt'
 # Read table names from the file
 table_names = read_table_names(input_file_path)
 
-# Filter tables for 5-minute, 15-minute, and MGW intervals
-filtered_5min = filter_tables(table_names, pattern_5min)
-filtered_15min = filter_tables(table_names, pattern_15min)
-filtered_mgw = filter_tables(table_names, pattern_mgw)
-
-# Filter for year 2024 or greater
+# Filter tables for 5-minute, 15-minute, and MGW intervals from 2024 on, sorted by year and week
+# (each name is parsed once by the catalog)
+catalog = TableCatalog(table_names)
 start_year = 2024
-filtered_5min_by_year = filter_by_year(filtered_5min, start_year)
-filtered_15min_by_year = filter_by_year(filtered_15min, start_year)
-filtered_mgw_by_year = filter_by_year(filtered_mgw, start_year)
-
-# Sort the filtered tables by year and week
-sorted_5min = sort_by_year_and_week(filtered_5min_by_year)
-sorted_15min = sort_by_year_and_week(filtered_15min_by_year)
-sorted_mgw = sort_by_year_and_week(filtered_mgw_by_year)
+sorted_5min = filter_family(catalog, "5min", start_year)
+sorted_15min = filter_family(catalog, "15min", start_year)
+sorted_mgw = filter_family(catalog, "mgw", start_year)
 
 # Save the sorted results to separate files
 save_results(output_5min_path, sorted_5min)
@@ -0,0 +1,87 @@
+import json
+import math
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakePowerBI:
+    """Local stand-in for the push dataset REST API and its limits.
+
+    POST /datasets/<id>/tables/<table>/rows accepts {"rows": [...]}. More than `max_rows`
+    rows is a 400, more than `max_requests` POSTs in `window` seconds a 429 with a
+    Retry-After header, and `fail_every` makes one request in that many a 500.
+    """
+
+    def __init__(self, max_rows=10000, max_requests=120, window=60.0, fail_every=0):
+        self.max_rows = max_rows
+        self.max_requests = max_requests
+        self.window = window
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.requests = deque()
+        self.rows = {}  # table -> rows received
+        self.statuses = {}
+        self.connections = 0
+        self.posts = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _respond(self, table, rows):
+        now = time.monotonic()
+        with self.lock:
+            self.posts += 1
+            while self.requests and self.requests[0] <= now - self.window:
+                self.requests.popleft()
+            if len(self.requests) >= self.max_requests:
+                return 429, {"Retry-After": str(math.ceil(self.requests[0] + self.window - now))}
+            self.requests.append(now)
+            if len(rows) > self.max_rows:
+                return 400, {}
+            if self.fail_every and self.posts % self.fail_every == 0:
+                return 500, {}
+            self.rows.setdefault(table, []).extend(rows)
+            return 200, {}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, as the real service
+
+            def setup(self):
+                super().setup()
+                with fake.lock:
+                    fake.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                parts = self.path.strip("/").split("/")
+                if len(parts) != 5 or parts[0] != "datasets" or parts[2] != "tables" or parts[4] != "rows":
+                    status, headers = 404, {}
+                else:
+                    status, headers = fake._respond(parts[3], json.loads(body)["rows"])
+                with fake.lock:
+                    fake.statuses[status] = fake.statuses.get(status, 0) + 1
+                payload = b"{}"
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
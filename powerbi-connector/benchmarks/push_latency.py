@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "utils"))
+from ratelimit import TokenBucket
+from retry_queue import RetryQueue
+from push import PushClient, Pusher
+from fake_powerbi import FakePowerBI
+
+# Limits scaled down from the service's (10000 rows per POST, 120 POSTs per minute) so the run takes seconds
+MAX_ROWS = 1000
+MAX_REQUESTS = 20
+WINDOW = 2.0
+
+# Workload: window aggregates of every indicator arrive in bursts, some re-emitted before they are pushed
+INDICATORS = 2000
+WINDOWS = ("5min", "15min", "1h", "1h_sliding")
+BURSTS = 6
+BURST_INTERVAL = 1.0
+REEMITTED = 0.1
+POLL_INTERVAL = 0.05
+
+def workload():
+    """(due time, key, row) of every row, in arrival order."""
+    random.seed(0)
+    rows = []
+    for burst in range(BURSTS):
+        start = 1718000000 + burst * 300
+        batch = [((f"CALIS_APG43_5:{i}", window, start), {"indicator": f"CALIS_APG43_5:{i}", "window": window,
+                                                           "start": start, "avg": random.random()})
+                 for i in range(INDICATORS) for window in WINDOWS]
+        batch += random.sample(batch, int(len(batch) * REEMITTED))
+        rows += [(burst * BURST_INTERVAL, key, row) for key, row in batch]
+    return rows
+
+def drive(pusher, rows, begin, stop_after=None):
+    """Feed rows as a poll loop would, pumping after every poll; stop early `stop_after` seconds after `begin`."""
+    position = 0
+    while position < len(rows):
+        now = time.time() - begin
+        if stop_after is not None and now >= stop_after:
+            return position
+        while position < len(rows) and rows[position][0] <= now:
+            _, key, row = rows[position]
+            pusher.add("Aggregates", key, row, begin + rows[position][0])
+            position += 1
+        pusher.pump()
+        time.sleep(POLL_INTERVAL)
+    return position
+
+def run(label, request_bucket, max_rows, linger, fail_every=0, restart_at=None):
+    rows = workload()
+    latencies = []
+
+    def on_delivered(table, received, now):
+        latencies.extend(now - t for t in received)
+
+    with FakePowerBI(MAX_ROWS, MAX_REQUESTS, WINDOW, fail_every) as server, tempfile.TemporaryDirectory() as path:
+        def pusher():
+            client = PushClient(server.url, "dataset")
+            return Pusher(client, RetryQueue(path), request_bucket, TokenBucket(1e9, 1e9), max_rows, linger,
+                          on_delivered=on_delivered, max_backoff=1.0)
+
+        start = time.perf_counter()
+        begin = time.time()
+        first = pusher()
+        fed = drive(first, rows, begin, restart_at)
+        if restart_at is not None:
+            # Crash: what is buffered goes to disk, a new process picks the queue up
+            first.spill()
+            first.client.close()
+            queued = first.queue.rows()
+            second = pusher()
+            assert second.queue.rows() == queued
+            drive(second, rows[fed:], begin)
+            first = second
+        assert first.flush(timeout=60), "rows left undelivered"
+        elapsed = time.perf_counter() - start
+
+        delivered = {(row["indicator"], row["window"], row["start"]) for row in server.rows["Aggregates"]}
+        assert delivered == {key for _, key, _ in rows}, "rows lost"
+        pushed = len(server.rows["Aggregates"])
+        ok = server.statuses.get(200, 0)
+        lat = np.array(latencies)
+        print(f"{label:<28} {len(rows):>6} rows in {elapsed:5.1f} s, {pushed:>6} pushed in {ok:>3} POSTs "
+              f"({pushed / max(ok, 1):6.0f} rows/POST), 429: {server.statuses.get(429, 0):>3}, "
+              f"500: {server.statuses.get(500, 0):>2}, connections: {server.connections}, "
+              f"latency p50 {np.percentile(lat, 50):.2f} s, p99 {np.percentile(lat, 99):.2f} s")
+
+def main():
+    print(f"Fake service: {MAX_ROWS} rows per POST, {MAX_REQUESTS} POSTs per {WINDOW:.0f} s")
+    run("unlimited, 500 rows, no wait", TokenBucket(1e9, 1e9), 500, 0.0)
+    run("token bucket, coalescing", TokenBucket(MAX_REQUESTS / WINDOW * 0.95, 5), MAX_ROWS, 0.2)
+    run("same, 1 POST in 7 fails", TokenBucket(MAX_REQUESTS / WINDOW * 0.95, 5), MAX_ROWS, 0.2, fail_every=7)
+    run("same, restart mid-run", TokenBucket(MAX_REQUESTS / WINDOW * 0.95, 5), MAX_ROWS, 0.2, restart_at=2.5)
+    print("✅ Benchmark completed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Kafka Configuration
+KAFKA_BROKER: str = os.getenv("KAFKA_BROKER")
+KAFKA_GROUP_ID: str = os.getenv("KAFKA_GROUP_ID", "powerbi-connector")
+
+# Topics pushed to Power BI: topic -> (push dataset table, columns identifying a row).
+# A row arriving again with the same key before it is pushed replaces the buffered one.
+TOPICS = {
+    os.getenv("KAFKA_AGGREGATES_TOPIC", "kpi-aggregates"): ("Aggregates", ("indicator", "window", "start")),
+    os.getenv("KAFKA_ALERTS_TOPIC", "kpi-alerts"): ("Alerts", ("indicator", "time")),
+}
+
+# Epoch-second fields sent to Power BI as ISO datetimes
+TIME_FIELDS = ("start", "end", "time")
+
+# Power BI push dataset: rows are posted to {POWERBI_API_URL}/datasets/{POWERBI_DATASET_ID}/tables/<table>/rows
+POWERBI_API_URL: str = os.getenv("POWERBI_API_URL", "https://api.powerbi.com/v1.0/myorg")
+POWERBI_DATASET_ID: str = os.getenv("POWERBI_DATASET_ID")
+POWERBI_TOKEN: str = os.getenv("POWERBI_TOKEN")
+POWERBI_TIMEOUT: float = float(os.getenv("POWERBI_TIMEOUT", 30))
+
+# Service limits of push datasets: rows per POST, POSTs per hour and rows per hour
+POWERBI_MAX_ROWS: int = int(os.getenv("POWERBI_MAX_ROWS", 10000))
+POWERBI_REQUESTS_PER_HOUR: int = int(os.getenv("POWERBI_REQUESTS_PER_HOUR", 7200))
+POWERBI_ROWS_PER_HOUR: int = int(os.getenv("POWERBI_ROWS_PER_HOUR", 1000000))
+POWERBI_BURST_REQUESTS: int = int(os.getenv("POWERBI_BURST_REQUESTS", 5))  # POSTs allowed back to back
+
+# Rows are held up to POWERBI_LINGER_SECONDS to fill a request, longer while the rate limit holds them back
+POWERBI_LINGER_SECONDS: float = float(os.getenv("POWERBI_LINGER_SECONDS", 1.0))
+POWERBI_MAX_BUFFERED_ROWS: int = int(os.getenv("POWERBI_MAX_BUFFERED_ROWS", 100000))  # Beyond, rows go to disk
+
+# Batches not delivered yet, kept on disk across restarts; rejected batches go to its "rejected" subdirectory
+POWERBI_QUEUE_PATH: str = os.getenv("POWERBI_QUEUE_PATH", "./data/powerbi_queue")
+POWERBI_MAX_BACKOFF: float = float(os.getenv("POWERBI_MAX_BACKOFF", 300))
+
+# Kafka offsets are committed once the buffered rows are delivered or on disk, every this many seconds
+COMMIT_INTERVAL: float = float(os.getenv("COMMIT_INTERVAL", 10))
+
+# Hourly and daily rollups of the destination database (db-extractor ROLLUP_FAMILIES), pushed to the
+# ROLLUP_TABLE table instead of raw rows; off while ROLLUP_DB_HOST is unset
+ROLLUP_DB_HOST: str = os.getenv("ROLLUP_DB_HOST")
+ROLLUP_DB_PORT: int = int(os.getenv("ROLLUP_DB_PORT", 3306))
+ROLLUP_DB_USER: str = os.getenv("ROLLUP_DB_USER")
+ROLLUP_DB_PASSWORD: str = os.getenv("ROLLUP_DB_PASSWORD")
+ROLLUP_DB_NAME: str = os.getenv("ROLLUP_DB_NAME")
+ROLLUP_TABLE: str = os.getenv("ROLLUP_TABLE", "Rollups")
+ROLLUP_GRANULARITIES: list = [g for g in os.getenv("ROLLUP_GRANULARITIES", "hour,day").split(",") if g]
+ROLLUP_DELAY: float = float(os.getenv("ROLLUP_DELAY", 3600))  # A bucket is pushed this long after it ends
+ROLLUP_INTERVAL: float = float(os.getenv("ROLLUP_INTERVAL", 300))
+ROLLUP_BACKFILL: float = float(os.getenv("ROLLUP_BACKFILL", 86400))  # How far back the first run starts
+ROLLUP_STATE_PATH: str = os.getenv("ROLLUP_STATE_PATH", "./data/rollup_watermarks.json")
+
+# Port of the Prometheus metrics endpoint
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", 8000))
@@ -0,0 +1,112 @@
+import json
+import time
+from datetime import datetime, timezone
+from kafka import KafkaConsumer
+from prometheus_client import start_http_server
+from ratelimit import TokenBucket
+from retry_queue import RetryQueue
+from push import PushClient, Pusher
+from rollups import RollupSource
+from config import (
+    KAFKA_BROKER, KAFKA_GROUP_ID, TOPICS, TIME_FIELDS, POWERBI_API_URL, POWERBI_DATASET_ID, POWERBI_TOKEN,
+    POWERBI_TIMEOUT, POWERBI_MAX_ROWS, POWERBI_REQUESTS_PER_HOUR, POWERBI_ROWS_PER_HOUR, POWERBI_BURST_REQUESTS,
+    POWERBI_LINGER_SECONDS, POWERBI_MAX_BUFFERED_ROWS, POWERBI_QUEUE_PATH, POWERBI_MAX_BACKOFF,
+    COMMIT_INTERVAL, METRICS_PORT, ROLLUP_DB_HOST, ROLLUP_DB_PORT, ROLLUP_DB_USER, ROLLUP_DB_PASSWORD, ROLLUP_DB_NAME,
+    ROLLUP_TABLE, ROLLUP_GRANULARITIES, ROLLUP_DELAY, ROLLUP_INTERVAL, ROLLUP_BACKFILL, ROLLUP_STATE_PATH
+)
+
+def to_powerbi_row(record):
+    """Row of a push dataset table: epoch-second fields become ISO datetimes."""
+    row = dict(record)
+    for field in TIME_FIELDS:
+        if isinstance(row.get(field), (int, float)):
+            row[field] = datetime.fromtimestamp(row[field], tz=timezone.utc).isoformat()
+    return row
+
+def create_pusher(client, queue_path=POWERBI_QUEUE_PATH, on_delivered=None):
+    """Pusher limited to the configured requests and rows per hour."""
+    request_bucket = TokenBucket(POWERBI_REQUESTS_PER_HOUR / 3600, POWERBI_BURST_REQUESTS)
+    row_bucket = TokenBucket(POWERBI_ROWS_PER_HOUR / 3600, max(POWERBI_MAX_ROWS, POWERBI_ROWS_PER_HOUR / 60))
+    return Pusher(client, RetryQueue(queue_path), request_bucket, row_bucket, POWERBI_MAX_ROWS,
+                  POWERBI_LINGER_SECONDS, POWERBI_MAX_BUFFERED_ROWS, POWERBI_MAX_BACKOFF, on_delivered)
+
+def add_records(pusher, records):
+    """Buffer the rows of a poll, each stamped with the time it was produced."""
+    for record in records:
+        table, key_columns = TOPICS[record.topic]
+        row = to_powerbi_row(record.value)
+        key = tuple(row.get(column) for column in key_columns)
+        pusher.add(table, key, row, record.timestamp / 1000)
+
+def create_rollup_source():
+    """Reader of the destination's rollup tables, None when no database is configured."""
+    if not ROLLUP_DB_HOST:
+        return None
+    import mysql.connector
+
+    def connect():
+        return mysql.connector.connect(host=ROLLUP_DB_HOST, port=ROLLUP_DB_PORT, user=ROLLUP_DB_USER,
+                                       password=ROLLUP_DB_PASSWORD, database=ROLLUP_DB_NAME)
+
+    return RollupSource(connect, ROLLUP_GRANULARITIES, ROLLUP_DELAY, ROLLUP_INTERVAL, ROLLUP_BACKFILL,
+                        ROLLUP_STATE_PATH)
+
+def add_rollups(pusher, rollups):
+    """Buffer the rollup buckets closed since the last read."""
+    now = time.time()
+    for _, key, row in rollups.read():
+        pusher.add(ROLLUP_TABLE, key, row, now)
+
+def run(consumer, pusher, max_polls=None, rollups=None):
+    """Read the topics, and the rollup tables if given, and push their rows.
+
+    Offsets and rollup watermarks are committed every COMMIT_INTERVAL seconds, once the
+    buffered rows are delivered or spilled to the disk queue, so a crash loses no row.
+    """
+    polls = 0
+    uncommitted = False
+    last_commit = time.monotonic()
+    while max_polls is None or polls < max_polls:
+        timeout = min(max(pusher.next_attempt(), 0.05), 1.0)
+        batches = consumer.poll(timeout_ms=int(timeout * 1000), max_records=5000)
+        polls += 1
+        for records in batches.values():
+            add_records(pusher, records)
+            uncommitted = True
+        if rollups is not None and rollups.due():
+            add_rollups(pusher, rollups)
+            uncommitted = True
+        pusher.pump()
+        if uncommitted and time.monotonic() - last_commit >= COMMIT_INTERVAL:
+            pusher.spill()
+            consumer.commit()
+            if rollups is not None:
+                rollups.commit()
+            uncommitted = False
+            last_commit = time.monotonic()
+    pusher.spill()
+    consumer.commit()
+    if rollups is not None:
+        rollups.commit()
+
+def main():
+    print("🚀 Power BI connector started...")
+    start_http_server(METRICS_PORT)
+    consumer = KafkaConsumer(
+        *TOPICS,
+        bootstrap_servers=KAFKA_BROKER,
+        group_id=KAFKA_GROUP_ID,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+        value_deserializer=lambda v: json.loads(v),
+    )
+    client = PushClient(POWERBI_API_URL, POWERBI_DATASET_ID, POWERBI_TOKEN, POWERBI_TIMEOUT)
+    pusher = create_pusher(client)
+    try:
+        run(consumer, pusher, rollups=create_rollup_source())
+    finally:
+        pusher.flush(timeout=POWERBI_TIMEOUT)
+        client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import json
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from prometheus_client import Counter, Gauge, Histogram
+from ratelimit import TokenBucket
+from retry_queue import RetryQueue
+
+# Metrics
+ROWS_PUSHED = Counter("powerbi_rows_pushed_total", "Rows accepted by Power BI", ["table"])
+REQUESTS = Counter("powerbi_requests_total", "POST requests to Power BI", ["table", "outcome"])
+ROWS_COALESCED = Counter("powerbi_rows_coalesced_total", "Buffered rows replaced by a newer row with the same key")
+PUSH_LATENCY = Histogram("powerbi_push_latency_seconds", "Time from a row being produced to Power BI accepting it",
+                         buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 900, 3600))
+BATCH_ROWS = Histogram("powerbi_batch_rows", "Rows per POST request",
+                       buckets=(1, 10, 100, 500, 1000, 2500, 5000, 10000))
+BUFFERED_ROWS = Gauge("powerbi_buffered_rows", "Rows waiting in memory")
+QUEUED_ROWS = Gauge("powerbi_queued_rows", "Rows waiting in the disk retry queue")
+
+DELIVERED, RETRY, REJECTED = "delivered", "retry", "rejected"
+
+class PushClient:
+    """POST rows to the tables of a Power BI push dataset over a keep-alive session."""
+
+    def __init__(self, api_url: str, dataset_id: str, token: Optional[str] = None, timeout: float = 30.0,
+                 session: Optional[requests.Session] = None):
+        self.base_url = f"{api_url.rstrip('/')}/datasets/{dataset_id}/tables"
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        # One pooled connection is reused for every request instead of a TLS handshake each time
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.headers["Content-Type"] = "application/json"
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def post_rows(self, table: str, rows: List[Dict[str, Any]]) -> requests.Response:
+        return self.session.post(f"{self.base_url}/{table}/rows", data=json.dumps({"rows": rows}),
+                                 timeout=self.timeout)
+
+    def close(self):
+        self.session.close()
+
+class Pusher:
+    """Buffer rows per table and push them in batches within the service limits.
+
+    A table is pushed once it has `max_rows` rows or its oldest row waited `linger`
+    seconds, and only when both token buckets (requests and rows) allow it: during a
+    burst rows keep coalescing into fuller requests instead of being sent one by one.
+    Rows that could not be delivered (429, 5xx, network errors) and rows spilled from
+    memory wait in the disk queue, which is always drained first so rows keep their order.
+    """
+
+    def __init__(self, client: PushClient, queue: RetryQueue, request_bucket: TokenBucket, row_bucket: TokenBucket,
+                 max_rows: int = 10000, linger: float = 1.0, max_buffered: int = 100000, max_backoff: float = 300.0,
+                 on_delivered: Optional[Callable[[str, List[float], float], None]] = None, clock=time.time):
+        self.client = client
+        self.queue = queue
+        self.request_bucket = request_bucket
+        self.row_bucket = row_bucket
+        self.max_rows = max_rows
+        self.linger = linger
+        self.max_buffered = max_buffered
+        self.max_backoff = max_backoff
+        self.on_delivered = on_delivered
+        self.clock = clock
+        self.buffers: Dict[str, Dict[Hashable, tuple]] = {}  # table -> key -> (row, received), oldest first
+        self.buffered = 0
+        self.backoff = 0.0
+        self.retry_at = 0.0
+        QUEUED_ROWS.set(queue.rows())
+
+    def add(self, table: str, key: Hashable, row: Dict[str, Any], received: float):
+        """Buffer a row; a buffered row with the same key is replaced but keeps its place and receive time."""
+        buffer = self.buffers.setdefault(table, {})
+        if key in buffer:
+            buffer[key] = (row, buffer[key][1])
+            ROWS_COALESCED.inc()
+        else:
+            buffer[key] = (row, received)
+            self.buffered += 1
+        if self.buffered > self.max_buffered:
+            self.spill()
+        BUFFERED_ROWS.set(self.buffered)
+
+    def _take(self, table: str):
+        buffer = self.buffers[table]
+        keys = list(buffer)[:self.max_rows]
+        entries = [buffer.pop(key) for key in keys]
+        if not buffer:
+            del self.buffers[table]
+        self.buffered -= len(entries)
+        BUFFERED_ROWS.set(self.buffered)
+        return [row for row, _ in entries], [received for _, received in entries]
+
+    def spill(self):
+        """Move every buffered row to the disk queue."""
+        for table in list(self.buffers):
+            while table in self.buffers:
+                self.queue.append(table, *self._take(table))
+        QUEUED_ROWS.set(self.queue.rows())
+
+    def _due_table(self, force: bool) -> Optional[str]:
+        now = self.clock()
+        for table, buffer in self.buffers.items():
+            if force or len(buffer) >= self.max_rows or now - next(iter(buffer.values()))[1] >= self.linger:
+                return table
+        return None
+
+    def _post(self, table: str, rows: List[Dict[str, Any]]) -> str:
+        try:
+            response = self.client.post_rows(table, rows)
+        except requests.RequestException as e:
+            print(f"⚠️ Push of {len(rows)} rows to {table} failed: {e}")
+            return self._retry_later(table)
+        if response.status_code < 300:
+            self.backoff = 0.0
+            REQUESTS.labels(table, DELIVERED).inc()
+            return DELIVERED
+        if response.status_code == 429:
+            # Throttled: nothing is sent until the service says so
+            retry_after = float(response.headers.get("Retry-After", 60))
+            self.request_bucket.pause(retry_after)
+            self.row_bucket.pause(retry_after)
+            self.retry_at = self.clock() + retry_after
+            REQUESTS.labels(table, "throttled").inc()
+            return RETRY
+        if response.status_code >= 500 or response.status_code == 408:
+            return self._retry_later(table)
+        print(f"❌ Power BI rejected {len(rows)} rows for {table}: {response.status_code} {response.text[:200]}")
+        REQUESTS.labels(table, REJECTED).inc()
+        return REJECTED
+
+    def _retry_later(self, table: str) -> str:
+        self.backoff = min(self.max_backoff, max(1.0, self.backoff * 2))
+        self.retry_at = self.clock() + self.backoff
+        REQUESTS.labels(table, "failed").inc()
+        return RETRY
+
+    def _delivered(self, table: str, rows: List[Dict[str, Any]], received: List[float]):
+        now = self.clock()
+        ROWS_PUSHED.labels(table).inc(len(rows))
+        BATCH_ROWS.observe(len(rows))
+        for produced in received:
+            PUSH_LATENCY.observe(now - produced)
+        if self.on_delivered:
+            self.on_delivered(table, received, now)
+
+    def pump(self, force: bool = False) -> int:
+        """Push every batch that is due and allowed by the rate limits, return the rows delivered.
+
+        With `force`, tables are pushed without waiting for their linger time.
+        """
+        delivered = 0
+        while self.clock() >= self.retry_at:
+            queued = self.queue.peek(self.max_rows)
+            if queued:
+                table, rows, received, files = queued
+            else:
+                table = self._due_table(force)
+                if table is None:
+                    break
+                rows = list(self.buffers[table].values())[:self.max_rows]
+            if self.request_bucket.wait_time(1) > 0 or self.row_bucket.wait_time(len(rows)) > 0 \
+                    or not self.request_bucket.try_acquire(1):
+                break
+            self.row_bucket.try_acquire(len(rows))
+            if not queued:
+                rows, received = self._take(table)
+
+            outcome = self._post(table, rows)
+            if outcome == DELIVERED:
+                self._delivered(table, rows, received)
+                delivered += len(rows)
+                if queued:
+                    self.queue.remove(files)
+            elif queued:
+                if outcome == REJECTED:
+                    self.queue.reject(files)
+            else:
+                name = self.queue.append(table, rows, received)
+                if outcome == REJECTED:
+                    self.queue.reject([name])
+            QUEUED_ROWS.set(self.queue.rows())
+        return delivered
+
+    def pending(self) -> int:
+        """Rows not delivered yet, in memory or on disk."""
+        return self.buffered + self.queue.rows()
+
+    def next_attempt(self) -> float:
+        """Seconds until pump() may send something again."""
+        if not self.pending():
+            return self.linger
+        rows = min(self.max_rows, self.pending())
+        return max(self.retry_at - self.clock(), self.request_bucket.wait_time(1), self.row_bucket.wait_time(rows), 0.0)
+
+    def flush(self, timeout: float) -> bool:
+        """Push everything pending, waiting on the rate limits for at most `timeout` seconds.
+
+        Returns whether nothing is left; rows still in memory are spilled to disk otherwise.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            if not self.pump(force=True):
+                time.sleep(min(max(self.next_attempt(), 0.01), max(0.0, deadline - time.monotonic())))
+        self.spill()
+        return not self.pending()
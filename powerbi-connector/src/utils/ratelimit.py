@@ -0,0 +1,44 @@
+import time
+import threading
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, at most `capacity` saved up for bursts."""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` are available, 0 if they already are."""
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            missing = min(tokens, self.capacity) - self.tokens
+            return max(0.0, self.updated - now) + max(0.0, missing / self.rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take `tokens` if they are all available."""
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self.updated or self.tokens < min(tokens, self.capacity):
+                return False
+            self.tokens -= tokens
+            return True
+
+    def pause(self, seconds: float):
+        """Empty the bucket and refill nothing for `seconds`, as asked by a 429 Retry-After."""
+        with self.lock:
+            now = self.clock()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now + seconds)
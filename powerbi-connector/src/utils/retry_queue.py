@@ -0,0 +1,87 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+class RetryQueue:
+    """Batches waiting to be pushed, one JSON file each, delivered in the order they were queued.
+
+    Files are written to a temporary name then renamed, so a crash never leaves a partial
+    batch behind, and the queue is read back from the directory on start.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rejected_path = os.path.join(path, "rejected")
+        os.makedirs(self.rejected_path, exist_ok=True)
+        self.lock = threading.Lock()
+        self.entries: List[Tuple[str, str, int]] = []  # (file, table, rows), oldest first
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                with open(os.path.join(path, name), "r") as f:
+                    batch = json.load(f)
+                self.entries.append((name, batch["table"], len(batch["rows"])))
+        self.sequence = int(self.entries[-1][0].split(".")[0]) + 1 if self.entries else 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def rows(self) -> int:
+        """Rows waiting in the queue."""
+        with self.lock:
+            return sum(rows for _, _, rows in self.entries)
+
+    def _write(self, directory: str, name: str, batch: Dict[str, Any]):
+        tmp_path = os.path.join(directory, name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(batch, f)
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    def append(self, table: str, rows: List[Dict[str, Any]], received: List[float]) -> Optional[str]:
+        """Queue a batch of rows, with the time each one was received; return its file."""
+        if not rows:
+            return None
+        with self.lock:
+            name = f"{self.sequence:012d}.json"
+            self.sequence += 1
+            self._write(self.path, name, {"table": table, "rows": rows, "received": received, "queued": time.time()})
+            self.entries.append((name, table, len(rows)))
+        return name
+
+    def peek(self, max_rows: int) -> Optional[Tuple[str, List[Dict[str, Any]], List[float], List[str]]]:
+        """Oldest batch merged with the next ones of the same table, up to max_rows rows.
+
+        Returns (table, rows, received, files), the files to remove() once the rows are delivered.
+        """
+        with self.lock:
+            if not self.entries:
+                return None
+            table = self.entries[0][1]
+            files, count = [], 0
+            for name, entry_table, rows in self.entries:
+                if entry_table != table or (files and count + rows > max_rows):
+                    break
+                files.append(name)
+                count += rows
+        rows, received = [], []
+        for name in files:
+            with open(os.path.join(self.path, name), "r") as f:
+                batch = json.load(f)
+            rows += batch["rows"]
+            received += batch["received"]
+        return table, rows, received, files
+
+    def remove(self, files: List[str]):
+        """Drop delivered batches."""
+        with self.lock:
+            for name in files:
+                os.remove(os.path.join(self.path, name))
+            self.entries = [entry for entry in self.entries if entry[0] not in files]
+
+    def reject(self, files: List[str]):
+        """Move batches the service refused out of the queue, kept for inspection."""
+        with self.lock:
+            for name in files:
+                os.replace(os.path.join(self.path, name), os.path.join(self.rejected_path, name))
+            self.entries = [entry for entry in self.entries if entry[0] not in files]
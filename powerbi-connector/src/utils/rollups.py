@@ -0,0 +1,93 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Rollup tables kept by the db-extractor loader in the destination database, and their bucket length
+GRANULARITIES = {
+    'hour': ('rollup_hourly', timedelta(hours=1)),
+    'day': ('rollup_daily', timedelta(days=1)),
+}
+
+def bucket_floor(moment: datetime, granularity: str) -> datetime:
+    """Start of the bucket a moment falls in."""
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def to_powerbi_row(granularity: str, row: tuple) -> Dict[str, Any]:
+    base, indicator_id, bucket, low, high, total, count = row
+    if isinstance(bucket, str):
+        bucket = datetime.fromisoformat(bucket)
+    return {"base": base, "indicator_id": indicator_id, "granularity": granularity, "bucket": bucket.isoformat(),
+            "min": low, "max": high, "sum": total, "count": count,
+            "avg": total / count if total is not None and count else None}
+
+class RollupSource:
+    """Closed buckets of the destination's rollup tables, read once each instead of the raw rows.
+
+    A bucket is read once it ended `delay` seconds ago, leaving the loader time to land its
+    late batches; buckets updated after that are not pushed again. Every `interval` seconds
+    the buckets closed since the last read are fetched, from `backfill` seconds back on the
+    first run. The end of the last read of each granularity is saved to `state_path` by
+    commit(), once the rows are delivered or on disk.
+    """
+
+    def __init__(self, connect: Callable[[], Any], granularities=('hour', 'day'), delay: float = 3600.0,
+                 interval: float = 300.0, backfill: float = 86400.0, state_path: Optional[str] = None,
+                 placeholder: str = '%s', clock: Callable[[], datetime] = datetime.now):
+        self.connect = connect
+        self.granularities = granularities
+        self.delay = timedelta(seconds=delay)
+        self.interval = timedelta(seconds=interval)
+        self.backfill = timedelta(seconds=backfill)
+        self.state_path = state_path
+        self.placeholder = placeholder
+        self.clock = clock
+        self.last_read: Optional[datetime] = None
+        self.watermarks: Dict[str, datetime] = {}  # granularity -> end of the buckets committed
+        self.pending: Dict[str, datetime] = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r') as f:
+                self.watermarks = {granularity: datetime.fromisoformat(end) for granularity, end in json.load(f).items()}
+
+    def due(self) -> bool:
+        return self.last_read is None or self.clock() - self.last_read >= self.interval
+
+    def read(self) -> List[Tuple[str, tuple, Dict[str, Any]]]:
+        """(granularity, key, row) of every bucket closed since the last read, oldest first."""
+        now = self.clock()
+        self.last_read = now
+        rows = []
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            for granularity in self.granularities:
+                table, length = GRANULARITIES[granularity]
+                end = bucket_floor(now - self.delay, granularity)
+                start = self.pending.get(granularity, self.watermarks.get(granularity,
+                                                                          bucket_floor(end - self.backfill, granularity)))
+                if start >= end:
+                    continue
+                cursor.execute(
+                    f"SELECT base, indicator_id, bucket, min_value, max_value, sum_value, sample_count FROM {table} "
+                    f"WHERE bucket >= {self.placeholder} AND bucket < {self.placeholder} "
+                    f"ORDER BY bucket, base, indicator_id", (start, end))
+                for row in cursor.fetchall():
+                    rows.append((granularity, (row[0], row[1], granularity, str(row[2])), to_powerbi_row(granularity, row)))
+                self.pending[granularity] = end
+            cursor.close()
+        finally:
+            conn.close()
+        return rows
+
+    def commit(self):
+        """Save the end of the buckets read so far, to be called once they are delivered or on disk."""
+        self.watermarks.update(self.pending)
+        self.pending.clear()
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({granularity: end.isoformat() for granularity, end in self.watermarks.items()}, f)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Kafka Configuration
+KAFKA_BROKER: str = os.getenv("KAFKA_BROKER")
+KAFKA_TOPIC: str = os.getenv("KAFKA_TOPIC")  # Rows published by the db-extractor
+KAFKA_GROUP_ID: str = os.getenv("KAFKA_GROUP_ID", "stream-processor")
+KAFKA_AGGREGATES_TOPIC: str = os.getenv("KAFKA_AGGREGATES_TOPIC", "kpi-aggregates")
+
+# Columns of the extracted rows
+TIME_COLUMN: str = os.getenv("TIME_COLUMN", "date")
+INDICATOR_COLUMN: str = os.getenv("INDICATOR_COLUMN", "id_indicateur")
+VALUE_COLUMN: str = os.getenv("VALUE_COLUMN", "value")
+
+# Windows as (name, size in seconds, slide in seconds); size == slide is a tumbling window
+WINDOWS = [
+    ("5min", 300, 300),
+    ("15min", 900, 900),
+    ("1h", 3600, 3600),
+    ("1h_sliding", 3600, 300),
+]
+
+# How late a row may arrive (in event time) and still be counted in its window
+ALLOWED_LATENESS: int = int(os.getenv("ALLOWED_LATENESS", 600))
+
+# Samples kept per indicator at first, to cover the largest window plus the lateness (rings too small are doubled)
+RING_CAPACITY: int = int(os.getenv("RING_CAPACITY", 32))
+
+# Port of the Prometheus metrics endpoint
+METRICS_PORT: int = int(os.getenv("METRICS_PORT", 8000))
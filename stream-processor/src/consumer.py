@@ -0,0 +1,93 @@
+import time
+import calendar
+import numpy as np
+from kafka import KafkaConsumer
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from serializers import decode_columns
+from windows import TableAggregators, base_pattern
+from producer import AggregatePublisher
+from config import (
+    KAFKA_BROKER, KAFKA_TOPIC, KAFKA_GROUP_ID, TIME_COLUMN, INDICATOR_COLUMN, VALUE_COLUMN,
+    WINDOWS, ALLOWED_LATENESS, RING_CAPACITY, METRICS_PORT
+)
+
+# Metrics
+ROWS_CONSUMED = Counter("stream_rows_consumed_total", "Rows read from the extractor topic")
+ROWS_LATE = Counter("stream_rows_late_total", "Rows dropped because their window was already emitted")
+AGGREGATES_PUBLISHED = Counter("stream_aggregates_published_total", "Window aggregates published")
+INDICATORS = Gauge("stream_indicators", "Indicators tracked in the ring buffers")
+RING_GROWTHS = Counter("stream_ring_growths_total", "Ring buffers doubled because a poll held more samples "
+                       "of an indicator than they could keep")
+WATERMARK = Gauge("stream_watermark_seconds", "Current event-time watermark of a table base", ["base"])
+POLL_SECONDS = Histogram("stream_poll_processing_seconds", "Time spent processing one poll")
+
+def to_epoch(value):
+    """Convert a timestamp column (datetime, ISO string or number) to epoch seconds."""
+    if hasattr(value, "timetuple"):
+        return calendar.timegm(value.timetuple())
+    if isinstance(value, str):
+        return int(np.datetime64(value.replace(" ", "T"), "s").astype(np.int64))
+    return int(value)
+
+def columns_to_arrays(table, columns):
+    """Turn decoded columns into (keys, times, values), skipping rows without a value."""
+    values = np.array(columns[VALUE_COLUMN], dtype=np.float64)
+    times = np.asarray(columns[TIME_COLUMN])
+    if not np.issubdtype(times.dtype, np.integer):
+        times = np.array([to_epoch(value) for value in times], dtype=np.int64)
+    indicators = columns[INDICATOR_COLUMN]
+    valid = ~np.isnan(values)
+    # Indicator ids are only unique within a dimension, so keys include the table base name
+    base = base_pattern.sub("", table)
+    keys = [f"{base}:{indicator}" for indicator, ok in zip(indicators, valid) if ok]
+    return keys, times[valid], values[valid]
+
+def process_records(records, aggregators, publisher):
+    """Aggregate a poll's worth of messages, advancing the watermark of their table base after each
+    one, and publish the windows they close."""
+    aggregates = []
+    for record in records:
+        _, table, columns = decode_columns(record.value, record.headers)
+        keys, times, values = columns_to_arrays(table, columns)
+        aggregates.extend(aggregators.process(base_pattern.sub("", table), keys, times, values))
+        ROWS_CONSUMED.inc(len(columns[VALUE_COLUMN]))
+    if aggregates:
+        publisher.publish(aggregates)
+        AGGREGATES_PUBLISHED.inc(len(aggregates))
+    return len(aggregates)
+
+def run(consumer, aggregators, publisher, max_polls=None):
+    """Poll the extractor topic, committing offsets once the aggregates are published."""
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        batches = consumer.poll(timeout_ms=1000, max_records=500)
+        polls += 1
+        if not batches:
+            continue
+        start = time.perf_counter()
+        late_before, growths_before = aggregators.late_rows, aggregators.ring_growths
+        records = [record for partition_records in batches.values() for record in partition_records]
+        process_records(records, aggregators, publisher)
+        consumer.commit()
+        POLL_SECONDS.observe(time.perf_counter() - start)
+        ROWS_LATE.inc(aggregators.late_rows - late_before)
+        RING_GROWTHS.inc(aggregators.ring_growths - growths_before)
+        INDICATORS.set(aggregators.indicators())
+        for base, watermark in aggregators.watermarks().items():
+            WATERMARK.labels(base).set(watermark)
+
+def main():
+    print("🚀 Stream processor started...")
+    start_http_server(METRICS_PORT)
+    consumer = KafkaConsumer(
+        KAFKA_TOPIC,
+        bootstrap_servers=KAFKA_BROKER,
+        group_id=KAFKA_GROUP_ID,
+        enable_auto_commit=False,
+        auto_offset_reset="earliest",
+    )
+    aggregators = TableAggregators(WINDOWS, ALLOWED_LATENESS, RING_CAPACITY)
+    run(consumer, aggregators, AggregatePublisher())
+
+if __name__ == "__main__":
+    main()
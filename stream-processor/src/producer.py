@@ -0,0 +1,24 @@
+import json
+from kafka import KafkaProducer
+from config import KAFKA_BROKER, KAFKA_AGGREGATES_TOPIC
+
+class AggregatePublisher:
+    """Publish window aggregates to the output topic, keyed by indicator."""
+
+    def __init__(self, producer=None, topic=KAFKA_AGGREGATES_TOPIC):
+        self.topic = topic
+        self.producer = producer or KafkaProducer(
+            bootstrap_servers=KAFKA_BROKER,
+            value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+            key_serializer=lambda k: k.encode("utf-8"),
+            linger_ms=50,
+            compression_type="lz4",
+        )
+        self.published = 0
+
+    def publish(self, aggregates):
+        """Send a list of aggregates and wait until the broker has them."""
+        for aggregate in aggregates:
+            self.producer.send(self.topic, value=aggregate, key=aggregate["indicator"])
+        self.producer.flush()
+        self.published += len(aggregates)
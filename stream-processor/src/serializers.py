@@ -0,0 +1,83 @@
+import json
+from datetime import datetime, date, timedelta
+
+# Message formats produced by the db-extractor, read from the "content-type" Kafka header
+JSON = "application/json"
+MSGPACK = "application/x-msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+EPOCH = datetime(1970, 1, 1)
+
+def decode_value(value, kind):
+    if value is None:
+        return None
+    if kind == "datetime":
+        return EPOCH + timedelta(seconds=value)
+    if kind == "date":
+        return date.fromordinal(value)
+    return value
+
+def decode_json(payload):
+    """One row per message: {"database", "table", "data"}."""
+    message = json.loads(payload)
+    return message["database"], message["table"], [message["data"]]
+
+def decode_msgpack(payload):
+    """One batch per message: the [(column, type)] schema, then rows as plain lists."""
+    import msgpack
+    message = msgpack.unpackb(payload, raw=False)
+    schema = message["schema"]
+    rows = [
+        {column: decode_value(value, kind) for (column, kind), value in zip(schema, row)}
+        for row in message["rows"]
+    ]
+    return message["database"], message["table"], rows
+
+def decode_arrow(payload):
+    """One Arrow IPC stream per message, database and table in the schema metadata."""
+    import pyarrow
+    table = pyarrow.ipc.open_stream(payload).read_all()
+    metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    return metadata.get("database"), metadata.get("table"), table.to_pylist()
+
+def columns_json(payload):
+    database, table, rows = decode_json(payload)
+    return database, table, {column: [value] for column, value in rows[0].items()}
+
+def columns_msgpack(payload):
+    """Columns of a msgpack batch, datetimes left as epoch seconds."""
+    import msgpack
+    message = msgpack.unpackb(payload, raw=False)
+    columns = list(zip(*message["rows"])) or [()] * len(message["schema"])
+    return message["database"], message["table"], {
+        column: values for (column, _), values in zip(message["schema"], columns)
+    }
+
+def columns_arrow(payload):
+    """Columns of an Arrow batch as NumPy arrays, timestamps as epoch seconds."""
+    import pyarrow
+    table = pyarrow.ipc.open_stream(payload).read_all()
+    metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    columns = {}
+    for field, column in zip(table.schema, table.columns):
+        if pyarrow.types.is_timestamp(field.type):
+            column = column.cast(pyarrow.timestamp("s")).cast(pyarrow.int64())
+        columns[field.name] = column.to_numpy(zero_copy_only=False)
+    return metadata.get("database"), metadata.get("table"), columns
+
+decoders = {JSON: decode_json, MSGPACK: decode_msgpack, ARROW: decode_arrow}
+column_decoders = {JSON: columns_json, MSGPACK: columns_msgpack, ARROW: columns_arrow}
+
+def decode_message(payload, headers=None):
+    """Decode a Kafka message into (database, table, rows) using its content-type header."""
+    content_type = dict(headers or []).get("content-type", JSON.encode())
+    if isinstance(content_type, bytes):
+        content_type = content_type.decode()
+    return decoders[content_type](payload)
+
+def decode_columns(payload, headers=None):
+    """Decode a Kafka message into (database, table, {column: values}) without building row dicts."""
+    content_type = dict(headers or []).get("content-type", JSON.encode())
+    if isinstance(content_type, bytes):
+        content_type = content_type.decode()
+    return column_decoders[content_type](payload)
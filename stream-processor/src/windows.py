@@ -0,0 +1,220 @@
+import re
+import numpy as np
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+class RingStore:
+    """Fixed-size ring buffers of (timestamp, value) samples, one row per indicator.
+
+    All indicators share two 2-D NumPy arrays, so memory is bounded by
+    indicators x capacity whatever the input rate.
+    """
+
+    def __init__(self, capacity: int, initial_indicators: int = 1024):
+        self.capacity = capacity
+        self.slots: Dict[Hashable, int] = {}
+        self.keys: List[Hashable] = []
+        self.times = np.full((initial_indicators, capacity), np.iinfo(np.int64).min, dtype=np.int64)
+        self.values = np.zeros((initial_indicators, capacity), dtype=np.float64)
+        self.heads = np.zeros(initial_indicators, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def slot_indices(self, keys: Sequence[Hashable]) -> np.ndarray:
+        """Map indicator keys to their ring slot, registering new indicators."""
+        slots = self.slots
+        indices = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys):
+            slot = slots.get(key)
+            if slot is None:
+                slot = slots[key] = len(self.keys)
+                self.keys.append(key)
+            indices[i] = slot
+        if len(self.keys) > len(self.heads):
+            self._grow(len(self.keys))
+        return indices
+
+    def _grow(self, needed: int):
+        size = len(self.heads)
+        while size < needed:
+            size *= 2
+        extra = size - len(self.heads)
+        self.times = np.vstack([self.times, np.full((extra, self.capacity), np.iinfo(np.int64).min, dtype=np.int64)])
+        self.values = np.vstack([self.values, np.zeros((extra, self.capacity), dtype=np.float64)])
+        self.heads = np.concatenate([self.heads, np.zeros(extra, dtype=np.int64)])
+
+    def _widen(self):
+        """Double the capacity of every ring, its samples moved to the start oldest first."""
+        n = len(self.heads)
+        unrolled = (self.heads[:, None] + np.arange(self.capacity)) % self.capacity
+        rows = np.arange(n)[:, None]
+        self.times = np.hstack([self.times[rows, unrolled],
+                                np.full((n, self.capacity), np.iinfo(np.int64).min, dtype=np.int64)])
+        self.values = np.hstack([self.values[rows, unrolled], np.zeros((n, self.capacity), dtype=np.float64)])
+        self.heads = np.full(n, self.capacity, dtype=np.int64)
+        self.capacity *= 2
+
+    def append(self, slots: np.ndarray, times: np.ndarray, values: np.ndarray, keep_from: int = None) -> int:
+        """Write samples into their indicator's ring, overwriting the oldest ones when full.
+
+        Samples at or after `keep_from` (all of them if None) are still needed: rings that
+        would overwrite one are doubled first. Returns how many times they were.
+        """
+        order = np.argsort(slots, kind="stable")
+        slots, times, values = slots[order], times[order], values[order]
+        # Rank of each sample among the samples of the same indicator in this batch
+        starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+        counts = np.diff(np.r_[starts, len(slots)])
+        ranks = np.arange(len(slots)) - np.repeat(starts, counts)
+        keep = np.iinfo(np.int64).min + 1 if keep_from is None else keep_from
+        grown = 0
+        while True:
+            positions = (self.heads[slots] + ranks) % self.capacity
+            if counts.max() <= self.capacity and not (self.times[slots, positions] >= keep).any():
+                break
+            self._widen()
+            grown += 1
+        self.times[slots, positions] = times
+        self.values[slots, positions] = values
+        np.add.at(self.heads, slots[starts], counts)
+        return grown
+
+    def aggregate(self, start: int, end: int):
+        """Compute count/min/max/sum over [start, end) for every indicator at once."""
+        n = len(self.keys)
+        times, values = self.times[:n], self.values[:n]
+        mask = (times >= start) & (times < end)
+        count = mask.sum(axis=1)
+        total = np.where(mask, values, 0.0).sum(axis=1)
+        minimum = np.where(mask, values, np.inf).min(axis=1)
+        maximum = np.where(mask, values, -np.inf).max(axis=1)
+        return count, minimum, maximum, total
+
+class WindowAggregator:
+    """Tumbling and sliding window aggregates per indicator, driven by an event-time watermark.
+
+    A window [start, end) is emitted once the watermark (latest event time seen minus
+    the allowed lateness) passes its end; rows older than an emitted window are dropped
+    and counted as late. Rings too small for the samples of the open windows are grown
+    (and counted) rather than overwritten.
+    """
+
+    def __init__(self, windows: Sequence[Tuple[str, int, int]], allowed_lateness: int, capacity: int):
+        self.windows = list(windows)
+        self.allowed_lateness = allowed_lateness
+        self.store = RingStore(capacity)
+        self.max_event_time = None
+        self.next_end: Dict[str, int] = {}
+        self.closed_until = None  # Rows before this time can no longer reach any window
+        self.late_rows = 0
+        self.ring_growths = 0
+
+    @property
+    def watermark(self):
+        if self.max_event_time is None:
+            return None
+        return self.max_event_time - self.allowed_lateness
+
+    def add(self, keys: Sequence[Hashable], times: np.ndarray, values: np.ndarray):
+        """Add a batch of samples (epoch seconds, float values)."""
+        if len(keys) == 0:
+            return
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        if self.closed_until is not None:
+            on_time = times >= self.closed_until
+            self.late_rows += int(len(times) - on_time.sum())
+            if not on_time.all():
+                keys = [key for key, keep in zip(keys, on_time) if keep]
+                times, values = times[on_time], values[on_time]
+                if len(times) == 0:
+                    return
+        self.ring_growths += self.store.append(self.store.slot_indices(keys), times, values, self.closed_until)
+        batch_max = int(times.max())
+        if self.max_event_time is None or batch_max > self.max_event_time:
+            self.max_event_time = batch_max
+        for name, size, slide in self.windows:
+            if name not in self.next_end:
+                first = int(times.min())
+                self.next_end[name] = first - first % slide + size
+
+    def process(self, keys: Sequence[Hashable], times: np.ndarray, values: np.ndarray) -> List[dict]:
+        """Add a batch and emit the windows it closes, a slice of the smallest slide at a time in
+        event-time order, so that the rings only ever hold the samples of the open windows."""
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        step = min(slide for _, _, slide in self.windows)
+        slices = times // step
+        order = np.argsort(slices, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, slices[order][1:] != slices[order][:-1], True])
+        results = []
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            part = order[first:last]
+            self.add([keys[i] for i in part], times[part], values[part])
+            results.extend(self.advance())
+        return results
+
+    def advance(self) -> List[dict]:
+        """Emit every window whose end the watermark has passed."""
+        watermark = self.watermark
+        if watermark is None:
+            return []
+        results = []
+        for name, size, slide in self.windows:
+            while self.next_end[name] <= watermark:
+                end = self.next_end[name]
+                results.extend(self.emit(name, end - size, end))
+                self.next_end[name] = end + slide
+        self.closed_until = min(self.next_end[name] - size for name, size, _ in self.windows)
+        return results
+
+    def emit(self, name: str, start: int, end: int) -> List[dict]:
+        count, minimum, maximum, total = self.store.aggregate(start, end)
+        present = np.flatnonzero(count)
+        count, minimum, maximum = count[present], minimum[present], maximum[present]
+        average = total[present] / count
+        keys = self.store.keys
+        return [
+            {"indicator": keys[i], "window": name, "start": start, "end": end,
+             "count": c, "min": lo, "max": hi, "avg": avg}
+            for i, c, lo, hi, avg in zip(present.tolist(), count.tolist(), minimum.tolist(),
+                                         maximum.tolist(), average.tolist())
+        ]
+
+class TableAggregators:
+    """A WindowAggregator per table base, each with its own watermark, so that a base being
+    backfilled or running ahead does not make the rows of the others late."""
+
+    def __init__(self, windows: Sequence[Tuple[str, int, int]], allowed_lateness: int, capacity: int):
+        self.windows = list(windows)
+        self.allowed_lateness = allowed_lateness
+        self.capacity = capacity
+        self.aggregators: Dict[str, WindowAggregator] = {}
+
+    def process(self, base: str, keys: Sequence[Hashable], times: np.ndarray, values: np.ndarray) -> List[dict]:
+        """Add a batch of a table base and emit the windows it closes."""
+        if base not in self.aggregators:
+            self.aggregators[base] = WindowAggregator(self.windows, self.allowed_lateness, self.capacity)
+        return self.aggregators[base].process(keys, times, values)
+
+    @property
+    def late_rows(self) -> int:
+        return sum(aggregator.late_rows for aggregator in self.aggregators.values())
+
+    @property
+    def ring_growths(self) -> int:
+        return sum(aggregator.ring_growths for aggregator in self.aggregators.values())
+
+    def indicators(self) -> int:
+        return sum(len(aggregator.store) for aggregator in self.aggregators.values())
+
+    def ring_bytes(self) -> int:
+        return sum(aggregator.store.times.nbytes + aggregator.store.values.nbytes
+                   for aggregator in self.aggregators.values())
+
+    def watermarks(self) -> Dict[str, int]:
+        return {base: aggregator.watermark for base, aggregator in self.aggregators.items()
+                if aggregator.watermark is not None}
+
+# Weekly suffix of a table name, removed to get the base name of its indicator dimension
+base_pattern = re.compile(r'_S\d+_A\d{4}$')